@@ -8,8 +8,127 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
 
+# Shared LLM HTTP client (src/generators/llm_gateway.py). HTTP/2 is used only
+# when the optional `h2` package is installed.
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "180"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "True").lower() == "true"
+
+# max_tokens planning (src/generators/token_planner.py): output sizes are
+# learned per endpoint and question type after TOKEN_PLANNER_MIN_SAMPLES
+# responses (last TOKEN_PLANNER_WINDOW kept) and reserved with a margin
+LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", "128000"))
+LLM_MAX_OUTPUT_TOKENS = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "16000"))
+TOKEN_PLANNER_ENABLED = os.getenv("TOKEN_PLANNER_ENABLED", "True").lower() == "true"
+TOKEN_PLANNER_MARGIN = float(os.getenv("TOKEN_PLANNER_MARGIN", "0.15"))
+TOKEN_PLANNER_MIN_SAMPLES = int(os.getenv("TOKEN_PLANNER_MIN_SAMPLES", "10"))
+TOKEN_PLANNER_WINDOW = int(os.getenv("TOKEN_PLANNER_WINDOW", "200"))
+
+# Gap analysis fan-out: LLM calls in flight per /analyze-gaps request and
+# seconds allowed per gap before it is reported as failed
+GAP_ANALYSIS_CONCURRENCY = int(os.getenv("GAP_ANALYSIS_CONCURRENCY", "5"))
+GAP_ANALYSIS_TIMEOUT = float(os.getenv("GAP_ANALYSIS_TIMEOUT", "60"))
+# Batched mode packs up to GAP_ANALYSIS_BATCH_SIZE gaps into one prompt
+# (default for requests that do not set batch_mode)
+GAP_ANALYSIS_BATCH_MODE = os.getenv("GAP_ANALYSIS_BATCH_MODE", "False").lower() == "true"
+GAP_ANALYSIS_BATCH_SIZE = int(os.getenv("GAP_ANALYSIS_BATCH_SIZE", "8"))
+
+# Bulk grading (/grade-answers:batch): AI-graded answers in flight per
+# submission and seconds allowed per answer
+GRADING_BATCH_CONCURRENCY = int(os.getenv("GRADING_BATCH_CONCURRENCY", "8"))
+GRADING_BATCH_TIMEOUT = float(os.getenv("GRADING_BATCH_TIMEOUT", "90"))
+
+# Question generation planner: requests above GENERATION_CHUNK_SIZE questions
+# are split per type into chunks generated GENERATION_CONCURRENCY at a time
+GENERATION_CHUNK_SIZE = int(os.getenv("GENERATION_CHUNK_SIZE", "10"))
+GENERATION_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", "4"))
+
+# Generation prompt: skill levels within PROMPT_LEVEL_NEIGHBOURS of the target
+# levels are included in full, the rest summarized; the skill section is
+# compacted to PROMPT_SKILL_CONTEXT_TOKENS (0 = no limit)
+PROMPT_SKILL_CONTEXT_TOKENS = int(os.getenv("PROMPT_SKILL_CONTEXT_TOKENS", "1500"))
+PROMPT_LEVEL_NEIGHBOURS = int(os.getenv("PROMPT_LEVEL_NEIGHBOURS", "1"))
+
+# Generated questions whose content words + options overlap an accepted
+# question by at least this Jaccard similarity are dropped and replaced
+DUPLICATE_SIMILARITY_THRESHOLD = float(os.getenv("DUPLICATE_SIMILARITY_THRESHOLD", "0.7"))
+
+# Generated questions that are malformed, truncated, off-schema or of an
+# unrequested type are repaired in one small call per chunk (up to
+# OUTPUT_REPAIR_MAX_ITEMS; the rest are regenerated)
+OUTPUT_REPAIR_ENABLED = os.getenv("OUTPUT_REPAIR_ENABLED", "True").lower() == "true"
+OUTPUT_REPAIR_MAX_ITEMS = int(os.getenv("OUTPUT_REPAIR_MAX_ITEMS", "5"))
+
+# Grading result cache (src/generators/grading_cache.py); GRADING_CACHE_PATH
+# enables SQLite persistence, GRADING_CACHE_TTL=0 keeps entries until evicted
+GRADING_CACHE_ENABLED = os.getenv("GRADING_CACHE_ENABLED", "True").lower() == "true"
+GRADING_CACHE_MAX_ENTRIES = int(os.getenv("GRADING_CACHE_MAX_ENTRIES", "10000"))
+GRADING_CACHE_TTL = float(os.getenv("GRADING_CACHE_TTL", "604800"))
+GRADING_CACHE_PATH = os.getenv("GRADING_CACHE_PATH", "")
+
+# Pre-generated question bank (create_question_bank.sql): stock per
+# (skill, target levels, type, language, difficulty) is refilled in the
+# background up to QUESTION_BANK_TARGET_STOCK when it drops below
+# QUESTION_BANK_LOW_WATER
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "False").lower() == "true"
+QUESTION_BANK_TARGET_STOCK = int(os.getenv("QUESTION_BANK_TARGET_STOCK", "30"))
+QUESTION_BANK_LOW_WATER = int(os.getenv("QUESTION_BANK_LOW_WATER", "10"))
+QUESTION_BANK_WORKERS = int(os.getenv("QUESTION_BANK_WORKERS", "1"))
+
 # Database settings
 DB_CONNECT_STRING = os.getenv("DB_CONNECT_STRING")
 
+# Connection pool settings
+# DB_MAX_CONNECTIONS is the budget for the whole service; it is split across
+# WEB_CONCURRENCY worker processes and the sync/async pools inside each one.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "40"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "10"))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+DB_POOL_HEALTH_CHECK_AFTER = float(os.getenv("DB_POOL_HEALTH_CHECK_AFTER", "30"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+
+# Read replicas (listed under "Replicas" in DB_CONNECT_STRING)
+# Reads go to a replica only while its replay lag is below DB_REPLICA_MAX_LAG
+# seconds; lag is re-measured at most every DB_REPLICA_LAG_CHECK_INTERVAL seconds
+# and an unreachable replica is skipped for DB_REPLICA_RETRY_AFTER seconds.
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "10"))
+DB_REPLICA_ACQUIRE_TIMEOUT = float(os.getenv("DB_REPLICA_ACQUIRE_TIMEOUT", "2"))
+DB_REPLICA_RETRY_AFTER = float(os.getenv("DB_REPLICA_RETRY_AFTER", "30"))
+
+# Queries at or above this duration (ms) are logged as slow (0 disables)
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+
+# Rows fetched per round-trip by server-side (streaming) cursors
+DB_STREAM_ITERSIZE = int(os.getenv("DB_STREAM_ITERSIZE", "2000"))
+
+# Skill catalog cache (seconds between background refreshes, 0 disables)
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "300"))
+
+# Binary catalog snapshot file (see export_catalog_snapshot.py). When set and
+# present, the catalog is served from it at startup while the database loads
+# in the background; with autosave the file is rewritten after each DB load.
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "")
+CATALOG_SNAPSHOT_AUTOSAVE = os.getenv("CATALOG_SNAPSHOT_AUTOSAVE", "True").lower() == "true"
+
+# Catalog invalidation via Postgres LISTEN/NOTIFY (see create_skill_catalog_notify.sql).
+# The triggers send on the channel they were installed with: after changing
+# CATALOG_NOTIFY_CHANNEL, re-apply the SQL with -v notify_channel=<channel>
+CATALOG_LISTEN_ENABLED = os.getenv("CATALOG_LISTEN_ENABLED", "True").lower() == "true"
+CATALOG_NOTIFY_CHANNEL = os.getenv("CATALOG_NOTIFY_CHANNEL", "skill_catalog_changed")
+CATALOG_NOTIFY_DEBOUNCE = float(os.getenv("CATALOG_NOTIFY_DEBOUNCE", "0.5"))
+CATALOG_NOTIFY_MAX_PATCH = int(os.getenv("CATALOG_NOTIFY_MAX_PATCH", "50"))
+# Refresh the SkillSummary view (create_skill_summary_view.sql) from the
+# listener after each debounced batch of changes; disable when it is
+# refreshed on a schedule (pg_cron) instead
+CATALOG_SUMMARY_REFRESH_ENABLED = os.getenv("CATALOG_SUMMARY_REFRESH_ENABLED", "True").lower() == "true"
+
 # Other settings
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
\ No newline at end of file
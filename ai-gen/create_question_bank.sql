@@ -0,0 +1,29 @@
+-- Pre-generated question bank
+-- Stock of validated AI-generated questions per combination of skill, target
+-- levels, question type, language and difficulty ("BankKey", built by
+-- src/generators/question_bank.py). /api/v2/generate-questions serves
+-- matching requests from here; served rows are deleted and a background
+-- worker refills combinations whose stock falls below the low-water mark.
+--
+-- Apply with: psql -f create_question_bank.sql
+
+CREATE TABLE IF NOT EXISTS public."QuestionBank" (
+    "Id" BIGSERIAL PRIMARY KEY,
+    "BankKey" TEXT NOT NULL,
+    "SkillId" UUID,
+    "SkillName" TEXT,
+    "SkillCode" TEXT,
+    "TargetLevels" TEXT NOT NULL DEFAULT '',
+    "QuestionType" TEXT NOT NULL,
+    "Language" TEXT NOT NULL,
+    "Difficulty" TEXT NOT NULL DEFAULT '',
+    "ContentHash" TEXT NOT NULL,
+    "Question" JSONB NOT NULL,
+    "CreatedAt" TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- One copy of a question per combination
+CREATE UNIQUE INDEX IF NOT EXISTS idx_questionbank_key_hash ON public."QuestionBank" ("BankKey", "ContentHash");
+
+-- Oldest-first claims per combination
+CREATE INDEX IF NOT EXISTS idx_questionbank_key_created ON public."QuestionBank" ("BankKey", "CreatedAt");
@@ -0,0 +1,62 @@
+-- Skill catalog change notifications
+-- Publishes a NOTIFY whenever a row in Skills or SkillLevelDefinitions is
+-- inserted, updated or deleted, so the ai-gen service can patch its
+-- in-memory catalog (src/catalog/listener.py).
+--
+-- The channel is the trigger argument and must match CATALOG_NOTIFY_CHANNEL
+-- (default "skill_catalog_changed"). Re-apply this file after changing it.
+--
+-- Payload (JSON): {"table": "<table>", "op": "INSERT|UPDATE|DELETE", "skill_id": "<uuid>"}
+-- Apply with: psql -f create_skill_catalog_notify.sql
+--         or: psql -v notify_channel=<channel> -f create_skill_catalog_notify.sql
+
+\if :{?notify_channel}
+\else
+    \set notify_channel skill_catalog_changed
+\endif
+
+CREATE OR REPLACE FUNCTION public.notify_skill_catalog_changed()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    channel text := coalesce(TG_ARGV[0], 'skill_catalog_changed');
+    new_skill_id uuid;
+    old_skill_id uuid;
+BEGIN
+    IF TG_TABLE_NAME = 'Skills' THEN
+        IF TG_OP <> 'DELETE' THEN new_skill_id := NEW."Id"; END IF;
+        IF TG_OP <> 'INSERT' THEN old_skill_id := OLD."Id"; END IF;
+    ELSE
+        IF TG_OP <> 'DELETE' THEN new_skill_id := NEW."SkillId"; END IF;
+        IF TG_OP <> 'INSERT' THEN old_skill_id := OLD."SkillId"; END IF;
+    END IF;
+
+    IF new_skill_id IS NOT NULL THEN
+        PERFORM pg_notify(
+            channel,
+            json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'skill_id', new_skill_id)::text
+        );
+    END IF;
+
+    -- A definition moved to another skill: the old skill changed too
+    IF old_skill_id IS NOT NULL AND old_skill_id IS DISTINCT FROM new_skill_id THEN
+        PERFORM pg_notify(
+            channel,
+            json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'skill_id', old_skill_id)::text
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_skills_notify_catalog ON public."Skills";
+CREATE TRIGGER trg_skills_notify_catalog
+    AFTER INSERT OR UPDATE OR DELETE ON public."Skills"
+    FOR EACH ROW EXECUTE FUNCTION public.notify_skill_catalog_changed(:'notify_channel');
+
+DROP TRIGGER IF EXISTS trg_skill_level_definitions_notify_catalog ON public."SkillLevelDefinitions";
+CREATE TRIGGER trg_skill_level_definitions_notify_catalog
+    AFTER INSERT OR UPDATE OR DELETE ON public."SkillLevelDefinitions"
+    FOR EACH ROW EXECUTE FUNCTION public.notify_skill_catalog_changed(:'notify_channel');
@@ -0,0 +1,48 @@
+-- Skill summary materialized view
+-- One row per active skill with its number of level definitions, so
+-- getDistinctSkillsWithLevels() and the /stats totals read a table sized by
+-- the number of skills instead of joining and grouping every definition.
+--
+-- Writers never refresh it: the ai-gen catalog listener (src/catalog/listener.py)
+-- calls refresh_skill_summary() after the debounced catalog notifications of
+-- create_skill_catalog_notify.sql, outside the writing transaction. Without
+-- the listener, refresh on a schedule instead, e.g. with pg_cron:
+--   SELECT cron.schedule('refresh-skill-summary', '*/5 * * * *', 'SELECT public.refresh_skill_summary()');
+--
+-- Apply with: psql -f create_skill_summary_view.sql
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public."SkillSummary" AS
+SELECT
+    s."Id" AS "SkillId",
+    s."Name" AS "SkillName",
+    s."Code" AS "SkillCode",
+    COUNT(sld."Id")::int AS "LevelCount"
+FROM public."Skills" s
+JOIN public."SkillLevelDefinitions" sld ON s."Id" = sld."SkillId"
+WHERE NOT s."IsDeleted"
+    AND NOT sld."IsDeleted"
+    AND s."IsActive" = true
+GROUP BY s."Id", s."Name", s."Code";
+
+-- Required by REFRESH ... CONCURRENTLY (readers are never blocked)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_skillsummary_skillid ON public."SkillSummary" ("SkillId");
+CREATE INDEX IF NOT EXISTS idx_skillsummary_name ON public."SkillSummary" ("SkillName");
+
+-- SECURITY DEFINER: runs as the view owner, so the service role that
+-- refreshes it does not need to own the view.
+CREATE OR REPLACE FUNCTION public.refresh_skill_summary()
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY public."SkillSummary";
+END;
+$$;
+
+-- Earlier versions refreshed the view from triggers inside every writing
+-- transaction; remove them
+DROP TRIGGER IF EXISTS trg_skills_refresh_summary ON public."Skills";
+DROP TRIGGER IF EXISTS trg_skill_level_definitions_refresh_summary ON public."SkillLevelDefinitions";
+DROP FUNCTION IF EXISTS public.refresh_skill_summary_trigger();
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Async database access for the QuestionBank table (create_question_bank.sql).
+Claims run on the primary so a question is never served twice.
+"""
+
+import psycopg
+from psycopg.types.json import Jsonb
+
+from src.db.async_pool import getAsyncConn, LOGGER
+from src.db.metrics import named_query
+
+
+# Claim the oldest `count` questions of one combination; rows locked by a
+# concurrent claim are skipped instead of waited for
+TAKE_QUESTIONS_SQL = """
+    DELETE FROM public."QuestionBank"
+    WHERE "Id" IN (
+        SELECT "Id"
+        FROM public."QuestionBank"
+        WHERE "BankKey" = %s
+        ORDER BY "CreatedAt", "Id"
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING "Question"
+"""
+
+QUESTION_STOCK_SQL = """
+    SELECT "BankKey", COUNT(*)
+    FROM public."QuestionBank"
+    WHERE "BankKey" = ANY(%s)
+    GROUP BY "BankKey"
+"""
+
+QUESTION_BANK_COMBINATIONS_SQL = """
+    SELECT
+        "BankKey",
+        MIN("SkillId"::text),
+        MIN("SkillName"),
+        MIN("SkillCode"),
+        MIN("TargetLevels"),
+        MIN("QuestionType"),
+        MIN("Language"),
+        MIN("Difficulty"),
+        COUNT(*)
+    FROM public."QuestionBank"
+    GROUP BY "BankKey"
+"""
+
+INSERT_QUESTION_SQL = """
+    INSERT INTO public."QuestionBank" (
+        "BankKey", "SkillId", "SkillName", "SkillCode", "TargetLevels",
+        "QuestionType", "Language", "Difficulty", "ContentHash", "Question"
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT ("BankKey", "ContentHash") DO NOTHING
+"""
+
+
+@named_query
+async def takeBankQuestions(counts):
+    """
+    Claim questions for several combinations in one transaction.
+
+    Args:
+        counts (dict): BankKey -> number of questions needed
+
+    Returns:
+        dict: BankKey -> list of question dicts, or None (nothing claimed)
+              if any combination has too few questions in stock
+    """
+    taken = {}
+    async with getAsyncConn() as conn:
+        async with conn.transaction():
+            for bank_key, count in counts.items():
+                cur = await conn.execute(TAKE_QUESTIONS_SQL, (bank_key, count))
+                rows = await cur.fetchall()
+                if len(rows) < count:
+                    LOGGER.debug(f"Question bank short for {bank_key}: {len(rows)}/{count}")
+                    raise psycopg.Rollback()
+                taken[bank_key] = [row[0] for row in rows]
+            return taken
+    return None
+
+
+@named_query
+async def getBankStock(bank_keys):
+    """
+    Count the questions in stock per combination.
+
+    Args:
+        bank_keys (list): BankKeys to count
+
+    Returns:
+        dict: BankKey -> count (0 for combinations without stock)
+    """
+    stock = {bank_key: 0 for bank_key in bank_keys}
+    async with getAsyncConn() as conn:
+        cur = await conn.execute(QUESTION_STOCK_SQL, (list(bank_keys),))
+        for bank_key, count in await cur.fetchall():
+            stock[bank_key] = count
+    return stock
+
+
+@named_query
+async def getBankCombinations():
+    """
+    Get every combination in the bank with its stock.
+
+    Returns:
+        list: List of tuples (BankKey, SkillId, SkillName, SkillCode, TargetLevels,
+              QuestionType, Language, Difficulty, Count)
+    """
+    async with getAsyncConn() as conn:
+        cur = await conn.execute(QUESTION_BANK_COMBINATIONS_SQL)
+        return await cur.fetchall()
+
+
+@named_query
+async def insertBankQuestions(rows):
+    """
+    Add questions to the bank, skipping ones already stocked.
+
+    Args:
+        rows (list): Tuples (BankKey, SkillId, SkillName, SkillCode, TargetLevels,
+                     QuestionType, Language, Difficulty, ContentHash, Question dict)
+
+    Returns:
+        int: Number of questions inserted
+    """
+    inserted = 0
+    async with getAsyncConn() as conn:
+        async with conn.transaction():
+            async with conn.cursor() as cur:
+                for row in rows:
+                    await cur.execute(INSERT_QUESTION_SQL, (*row[:-1], Jsonb(row[-1])))
+                    inserted += cur.rowcount
+    LOGGER.debug(f"Inserted {inserted} of {len(rows)} questions into the question bank")
+    return inserted
@@ -2,11 +2,287 @@
 """
 Database reader for SkillLevelDefinitions table.
 Provides functions to query and retrieve skill level definition data from PostgreSQL.
+All functions are read-only and are served by a read replica when one is
+configured (see src/db/replicas.py).
 """
 
-from src.custom import getConn, LOGGER
+import psycopg2.errors
+
+from config.settings import DB_STREAM_ITERSIZE
+from src.custom import getReadConn, LOGGER
+from src.db.metrics import named_query, query_name
+from src.db.records import SkillLevel
+
+
+# SQL shared with the async reader (db_skill_reader_async.py)
+SKILL_LEVEL_DEFINITIONS_SQL = """
+    SELECT
+        sld."Id",
+        sld."SkillId",
+        s."Name" as "SkillName",
+        s."Code" as "SkillCode",
+        sld."Level",
+        sld."Description",
+        sld."Autonomy",
+        sld."Influence",
+        sld."Complexity",
+        sld."BusinessSkills",
+        sld."Knowledge",
+        sld."BehavioralIndicators",
+        sld."EvidenceExamples",
+        sld."IsDeleted",
+        sld."CreatedAt",
+        sld."UpdatedAt"
+    FROM public."SkillLevelDefinitions" sld
+    JOIN public."Skills" s ON sld."SkillId" = s."Id"
+    WHERE NOT sld."IsDeleted"
+        AND NOT s."IsDeleted"
+        AND s."IsActive" = true
+"""
+
+# Keyset order used by the streaming and paginated readers
+SKILL_LEVEL_DEFINITIONS_KEYSET_ORDER = ' ORDER BY sld."SkillId", sld."Level"'
+
+SKILL_LEVELS_BY_SKILL_ID_SQL = """
+    SELECT
+        sld."Level",
+        sld."Description",
+        sld."Autonomy",
+        sld."Influence",
+        sld."Complexity",
+        sld."BusinessSkills",
+        sld."Knowledge",
+        sld."BehavioralIndicators",
+        sld."EvidenceExamples"
+    FROM public."SkillLevelDefinitions" sld
+    JOIN public."Skills" s ON sld."SkillId" = s."Id"
+    WHERE NOT sld."IsDeleted"
+        AND NOT s."IsDeleted"
+        AND s."IsActive" = true
+        AND sld."SkillId" = %s
+    ORDER BY sld."Level"
+"""
+
+SKILL_LEVELS_BY_SKILL_IDS_SQL = """
+    SELECT
+        s."Id",
+        s."Name",
+        s."Code",
+        sld."Level",
+        sld."Description",
+        sld."Autonomy",
+        sld."Influence",
+        sld."Complexity",
+        sld."BusinessSkills",
+        sld."Knowledge",
+        sld."BehavioralIndicators",
+        sld."EvidenceExamples"
+    FROM public."SkillLevelDefinitions" sld
+    JOIN public."Skills" s ON sld."SkillId" = s."Id"
+    WHERE NOT sld."IsDeleted"
+        AND NOT s."IsDeleted"
+        AND s."IsActive" = true
+        AND sld."SkillId" = ANY(%s::uuid[])
+    ORDER BY sld."SkillId", sld."Level"
+"""
+
+SKILL_DEFINITIONS_BY_LEVEL_SQL = """
+    SELECT
+        s."Name" as "SkillName",
+        s."Code" as "SkillCode",
+        sld."Description",
+        sld."Autonomy",
+        sld."Influence",
+        sld."Complexity",
+        sld."BusinessSkills",
+        sld."Knowledge"
+    FROM public."SkillLevelDefinitions" sld
+    JOIN public."Skills" s ON sld."SkillId" = s."Id"
+    WHERE NOT sld."IsDeleted"
+        AND NOT s."IsDeleted"
+        AND s."IsActive" = true
+        AND sld."Level" = %s
+    ORDER BY s."Name"
+"""
+
+SKILL_LEVEL_COUNT_SQL = """
+    SELECT COUNT(*)
+    FROM public."SkillLevelDefinitions"
+    WHERE NOT "IsDeleted"
+"""
+
+DISTINCT_SKILLS_WITH_LEVELS_SQL = """
+    SELECT
+        s."Id",
+        s."Name",
+        s."Code",
+        COUNT(sld."Id") as "LevelCount"
+    FROM public."Skills" s
+    JOIN public."SkillLevelDefinitions" sld ON s."Id" = sld."SkillId"
+    WHERE NOT s."IsDeleted"
+        AND NOT sld."IsDeleted"
+        AND s."IsActive" = true
+    GROUP BY s."Id", s."Name", s."Code"
+    ORDER BY s."Name"
+"""
+
+# Live-aggregate equivalent of SKILL_SUMMARY_TOTALS_SQL
+SKILL_SUMMARY_TOTALS_LIVE_SQL = """
+    SELECT
+        COUNT(DISTINCT s."Id"),
+        COUNT(sld."Id")
+    FROM public."Skills" s
+    JOIN public."SkillLevelDefinitions" sld ON s."Id" = sld."SkillId"
+    WHERE NOT s."IsDeleted"
+        AND NOT sld."IsDeleted"
+        AND s."IsActive" = true
+"""
+
+# Served by the SkillSummary materialized view (create_skill_summary_view.sql);
+# same results as DISTINCT_SKILLS_WITH_LEVELS_SQL / SKILL_SUMMARY_TOTALS_LIVE_SQL
+SKILL_SUMMARY_SQL = """
+    SELECT
+        "SkillId",
+        "SkillName",
+        "SkillCode",
+        "LevelCount"
+    FROM public."SkillSummary"
+    ORDER BY "SkillName"
+"""
+
+SKILL_SUMMARY_TOTALS_SQL = """
+    SELECT
+        COUNT(*),
+        COALESCE(SUM("LevelCount"), 0)
+    FROM public."SkillSummary"
+"""
+
+SKILL_CATALOG_SQL = """
+    SELECT
+        s."Id",
+        s."Name",
+        s."Code",
+        sld."Level",
+        sld."Description",
+        sld."Autonomy",
+        sld."Influence",
+        sld."Complexity",
+        sld."BusinessSkills",
+        sld."Knowledge",
+        sld."BehavioralIndicators",
+        sld."EvidenceExamples",
+        sld."UpdatedAt"
+    FROM public."Skills" s
+    JOIN public."SkillLevelDefinitions" sld ON s."Id" = sld."SkillId"
+    WHERE NOT s."IsDeleted"
+        AND NOT sld."IsDeleted"
+        AND s."IsActive" = true
+    ORDER BY s."Name", s."Id", sld."Level"
+"""
+
+SKILL_CATALOG_BY_SKILL_IDS_SQL = """
+    SELECT
+        s."Id",
+        s."Name",
+        s."Code",
+        sld."Level",
+        sld."Description",
+        sld."Autonomy",
+        sld."Influence",
+        sld."Complexity",
+        sld."BusinessSkills",
+        sld."Knowledge",
+        sld."BehavioralIndicators",
+        sld."EvidenceExamples",
+        sld."UpdatedAt"
+    FROM public."Skills" s
+    JOIN public."SkillLevelDefinitions" sld ON s."Id" = sld."SkillId"
+    WHERE NOT s."IsDeleted"
+        AND NOT sld."IsDeleted"
+        AND s."IsActive" = true
+        AND s."Id" = ANY(%s::uuid[])
+    ORDER BY s."Name", s."Id", sld."Level"
+"""
+
+SKILL_LEVEL_DEFINITION_BY_ID_SQL = """
+    SELECT
+        sld."Id",
+        sld."SkillId",
+        s."Name" as "SkillName",
+        sld."Level",
+        sld."Description",
+        sld."Autonomy",
+        sld."Influence",
+        sld."Complexity",
+        sld."BusinessSkills",
+        sld."Knowledge",
+        sld."BehavioralIndicators",
+        sld."EvidenceExamples"
+    FROM public."SkillLevelDefinitions" sld
+    JOIN public."Skills" s ON sld."SkillId" = s."Id"
+    WHERE NOT sld."IsDeleted"
+        AND NOT s."IsDeleted"
+        AND s."IsActive" = true
+        AND sld."Id" = %s
+"""
+
+
+def buildSkillLevelDefinitionsQuery(skill_id=None, level=None):
+    """
+    Build the filtered SKILL_LEVEL_DEFINITIONS_SQL query (without ORDER BY).
+
+    Args:
+        skill_id (str, optional): Filter by specific skill ID
+        level (int, optional): Filter by specific proficiency level (1-7)
+
+    Returns:
+        tuple: (query, params)
+    """
+    query = SKILL_LEVEL_DEFINITIONS_SQL
+
+    params = []
+    if skill_id:
+        query += ' AND sld."SkillId" = %s'
+        params.append(skill_id)
 
+    if level is not None:
+        query += ' AND sld."Level" = %s'
+        params.append(level)
+
+    return query, params
+
+
+def buildSkillLevelDefinitionsPageQuery(after_skill_id=None, after_level=None, limit=500):
+    """
+    Build a keyset-paginated SKILL_LEVEL_DEFINITIONS_SQL query.
+
+    Pages are ordered by (SkillId, Level) and resume strictly after the given
+    key, so every page costs one index range scan regardless of its depth.
+
+    Args:
+        after_skill_id (str, optional): SkillId of the last row of the previous page
+        after_level (int, optional): Level of the last row of the previous page
+        limit (int): Maximum number of rows to return
 
+    Returns:
+        tuple: (query, params)
+    """
+    query, params = buildSkillLevelDefinitionsQuery()
+
+    if after_skill_id:
+        if after_level is None:
+            query += ' AND sld."SkillId" > %s::uuid'
+            params.append(after_skill_id)
+        else:
+            query += ' AND (sld."SkillId", sld."Level") > (%s::uuid, %s)'
+            params.extend([after_skill_id, after_level])
+
+    query += SKILL_LEVEL_DEFINITIONS_KEYSET_ORDER + ' LIMIT %s'
+    params.append(limit)
+    return query, params
+
+
+@named_query
 def getSkillLevelDefinitions(skill_id=None, level=None):
     """
     Get skill level definitions from database.
@@ -18,43 +294,9 @@ def getSkillLevelDefinitions(skill_id=None, level=None):
     Returns:
         list: List of tuples containing skill level definition data
     """
-    with getConn() as conn:
+    with getReadConn() as conn:
         with conn.cursor() as cur:
-            # Build query dynamically based on filters
-            query = """
-                SELECT
-                    sld."Id",
-                    sld."SkillId",
-                    s."Name" as "SkillName",
-                    s."Code" as "SkillCode",
-                    sld."Level",
-                    sld."Description",
-                    sld."Autonomy",
-                    sld."Influence",
-                    sld."Complexity",
-                    sld."BusinessSkills",
-                    sld."Knowledge",
-                    sld."BehavioralIndicators",
-                    sld."EvidenceExamples",
-                    sld."IsDeleted",
-                    sld."CreatedAt",
-                    sld."UpdatedAt"
-                FROM public."SkillLevelDefinitions" sld
-                JOIN public."Skills" s ON sld."SkillId" = s."Id"
-                WHERE NOT sld."IsDeleted"
-                    AND NOT s."IsDeleted"
-                    AND s."IsActive" = true
-            """
-
-            params = []
-            if skill_id:
-                query += ' AND sld."SkillId" = %s'
-                params.append(skill_id)
-
-            if level is not None:
-                query += ' AND sld."Level" = %s'
-                params.append(level)
-
+            query, params = buildSkillLevelDefinitionsQuery(skill_id, level)
             query += ' ORDER BY s."Name", sld."Level"'
 
             cur.execute(query, params if params else None)
@@ -64,6 +306,65 @@ def getSkillLevelDefinitions(skill_id=None, level=None):
     return results
 
 
+def iterSkillLevelDefinitions(skill_id=None, level=None, itersize=DB_STREAM_ITERSIZE):
+    """
+    Stream skill level definitions through a server-side cursor.
+
+    Rows are fetched `itersize` at a time, so memory use stays constant no
+    matter how many definitions the catalog holds. The pooled connection is
+    held until the generator is exhausted or closed.
+
+    Args:
+        skill_id (str, optional): Filter by specific skill ID
+        level (int, optional): Filter by specific proficiency level (1-7)
+        itersize (int): Rows fetched per round-trip
+
+    Yields:
+        tuple: Rows shaped like getSkillLevelDefinitions(), ordered by
+               SkillId and Level
+    """
+    query, params = buildSkillLevelDefinitionsQuery(skill_id, level)
+    query += SKILL_LEVEL_DEFINITIONS_KEYSET_ORDER
+
+    with getReadConn() as conn:
+        # Named cursors live inside a transaction; the pool rolls it back on release
+        with conn.cursor(name="skill_level_definitions_stream") as cur:
+            cur.itersize = itersize
+            with query_name("iterSkillLevelDefinitions"):
+                cur.execute(query, params if params else None)
+            count = 0
+            for row in cur:
+                count += 1
+                yield row
+            LOGGER.debug(f"Streamed {count} skill level definitions from database.")
+
+
+@named_query
+def getSkillLevelDefinitionsPage(after_skill_id=None, after_level=None, limit=500):
+    """
+    Get one keyset page of skill level definitions.
+
+    Args:
+        after_skill_id (str, optional): SkillId of the last row of the previous page
+        after_level (int, optional): Level of the last row of the previous page
+        limit (int): Maximum number of rows to return
+
+    Returns:
+        list: List of tuples shaped like getSkillLevelDefinitions(), ordered by
+              SkillId and Level
+    """
+    query, params = buildSkillLevelDefinitionsPageQuery(after_skill_id, after_level, limit)
+
+    with getReadConn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            results = cur.fetchall()
+            LOGGER.debug(f"Retrieved page of {len(results)} skill level definitions")
+
+    return results
+
+
+@named_query
 def getSkillLevelsBySkillId(skill_id):
     """
     Get all level definitions for a specific skill.
@@ -72,36 +373,63 @@ def getSkillLevelsBySkillId(skill_id):
         skill_id (str): The skill ID to query
 
     Returns:
-        list: List of tuples with level definitions ordered by level
+        list: List of SkillLevel records ordered by level
     """
-    with getConn() as conn:
+    with getReadConn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT
-                    sld."Level",
-                    sld."Description",
-                    sld."Autonomy",
-                    sld."Influence",
-                    sld."Complexity",
-                    sld."BusinessSkills",
-                    sld."Knowledge",
-                    sld."BehavioralIndicators",
-                    sld."EvidenceExamples"
-                FROM public."SkillLevelDefinitions" sld
-                JOIN public."Skills" s ON sld."SkillId" = s."Id"
-                WHERE NOT sld."IsDeleted"
-                    AND NOT s."IsDeleted"
-                    AND s."IsActive" = true
-                    AND sld."SkillId" = %s
-                ORDER BY sld."Level"
-                """, (skill_id,))
-            results = cur.fetchall()
+            cur.execute(SKILL_LEVELS_BY_SKILL_ID_SQL, (skill_id,))
+            results = [SkillLevel._make(row) for row in cur]
             LOGGER.debug(f"Retrieved {len(results)} levels for skill ID: {skill_id}")
 
     return results
 
 
+def groupSkillLevelRows(rows):
+    """
+    Group SKILL_LEVELS_BY_SKILL_IDS_SQL rows per skill.
+
+    Returns:
+        dict: skill_id -> {"skill_name", "skill_code", "levels"}, where levels
+              are SkillLevel records
+    """
+    grouped = {}
+    for row in rows:
+        skill_id = str(row[0]).lower()
+        if skill_id not in grouped:
+            grouped[skill_id] = {
+                "skill_name": row[1],
+                "skill_code": row[2],
+                "levels": []
+            }
+        grouped[skill_id]["levels"].append(SkillLevel._make(row[3:12]))
+    return grouped
+
+
+@named_query
+def getSkillLevelsBySkillIds(skill_ids):
+    """
+    Get level definitions for several skills in one round-trip.
+
+    Args:
+        skill_ids (list): Skill IDs (UUID strings) to query
+
+    Returns:
+        dict: skill_id -> {"skill_name", "skill_code", "levels"}; skills
+              without level definitions are absent
+    """
+    if not skill_ids:
+        return {}
+
+    with getReadConn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(SKILL_LEVELS_BY_SKILL_IDS_SQL, (list(skill_ids),))
+            results = cur.fetchall()
+            LOGGER.debug(f"Retrieved {len(results)} levels for {len(skill_ids)} skill IDs")
+
+    return groupSkillLevelRows(results)
+
+
+@named_query
 def getSkillDefinitionsByLevel(level):
     """
     Get all skill definitions for a specific proficiency level.
@@ -112,33 +440,16 @@ def getSkillDefinitionsByLevel(level):
     Returns:
         list: List of tuples with skill definitions at the specified level
     """
-    with getConn() as conn:
+    with getReadConn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT
-                    s."Name" as "SkillName",
-                    s."Code" as "SkillCode",
-                    sld."Description",
-                    sld."Autonomy",
-                    sld."Influence",
-                    sld."Complexity",
-                    sld."BusinessSkills",
-                    sld."Knowledge"
-                FROM public."SkillLevelDefinitions" sld
-                JOIN public."Skills" s ON sld."SkillId" = s."Id"
-                WHERE NOT sld."IsDeleted"
-                    AND NOT s."IsDeleted"
-                    AND s."IsActive" = true
-                    AND sld."Level" = %s
-                ORDER BY s."Name"
-                """, (level,))
+            cur.execute(SKILL_DEFINITIONS_BY_LEVEL_SQL, (level,))
             results = cur.fetchall()
             LOGGER.debug(f"Retrieved {len(results)} skill definitions for level {level}")
 
     return results
 
 
+@named_query
 def getSkillLevelCount():
     """
     Get total count of skill level definitions.
@@ -146,50 +457,93 @@ def getSkillLevelCount():
     Returns:
         int: Total count of non-deleted skill level definitions
     """
-    with getConn() as conn:
+    with getReadConn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT COUNT(*)
-                FROM public."SkillLevelDefinitions"
-                WHERE NOT "IsDeleted"
-                """)
+            cur.execute(SKILL_LEVEL_COUNT_SQL)
             count = cur.fetchone()[0]
             LOGGER.debug(f"Total skill level definitions: {count}")
 
     return count
 
 
+# Set to False once the SkillSummary view is found missing
+_skillSummaryAvailable = True
+
+
+def fetchSkillSummary(summary_sql, fallback_sql):
+    """
+    Run a query against the SkillSummary view, falling back to the equivalent
+    live aggregate when the view has not been created yet.
+
+    Returns:
+        list: Query results
+    """
+    global _skillSummaryAvailable
+    if _skillSummaryAvailable:
+        try:
+            with getReadConn() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(summary_sql)
+                    return cur.fetchall()
+        except psycopg2.errors.UndefinedTable:
+            LOGGER.warning("SkillSummary view not found (apply create_skill_summary_view.sql), using live aggregate")
+            _skillSummaryAvailable = False
+
+    with getReadConn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(fallback_sql)
+            return cur.fetchall()
+
+
+@named_query
 def getDistinctSkillsWithLevels():
     """
     Get list of distinct skills that have level definitions.
+    Served by the SkillSummary materialized view.
 
     Returns:
         list: List of tuples (SkillId, SkillName, SkillCode, LevelCount)
     """
-    with getConn() as conn:
+    results = fetchSkillSummary(SKILL_SUMMARY_SQL, DISTINCT_SKILLS_WITH_LEVELS_SQL)
+    LOGGER.debug(f"Found {len(results)} distinct skills with level definitions")
+    return results
+
+
+@named_query
+def getSkillSummaryTotals():
+    """
+    Get catalog totals from the SkillSummary materialized view.
+
+    Returns:
+        tuple: (total_skills, total_level_definitions) over active skills
+    """
+    total_skills, total_definitions = fetchSkillSummary(SKILL_SUMMARY_TOTALS_SQL, SKILL_SUMMARY_TOTALS_LIVE_SQL)[0]
+    LOGGER.debug(f"Skill summary: {total_skills} skills, {total_definitions} level definitions")
+    return total_skills, total_definitions
+
+
+@named_query
+def getSkillCatalogRows():
+    """
+    Get every active skill joined with its level definitions in one pass.
+    Used to build the in-memory skill catalog (src/catalog/skill_catalog.py).
+
+    Returns:
+        list: List of tuples (SkillId, SkillName, SkillCode, Level, Description,
+              Autonomy, Influence, Complexity, BusinessSkills, Knowledge,
+              BehavioralIndicators, EvidenceExamples, UpdatedAt)
+              ordered by skill name and level
+    """
+    with getReadConn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT
-                    s."Id",
-                    s."Name",
-                    s."Code",
-                    COUNT(sld."Id") as "LevelCount"
-                FROM public."Skills" s
-                JOIN public."SkillLevelDefinitions" sld ON s."Id" = sld."SkillId"
-                WHERE NOT s."IsDeleted"
-                    AND NOT sld."IsDeleted"
-                    AND s."IsActive" = true
-                GROUP BY s."Id", s."Name", s."Code"
-                ORDER BY s."Name"
-                """)
+            cur.execute(SKILL_CATALOG_SQL)
             results = cur.fetchall()
-            LOGGER.debug(f"Found {len(results)} distinct skills with level definitions")
+            LOGGER.debug(f"Retrieved {len(results)} catalog rows")
 
     return results
 
 
+@named_query
 def getSkillLevelDefinitionById(definition_id):
     """
     Get a specific skill level definition by its ID.
@@ -200,30 +554,9 @@ def getSkillLevelDefinitionById(definition_id):
     Returns:
         tuple: Single skill level definition record or None if not found
     """
-    with getConn() as conn:
+    with getReadConn() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT
-                    sld."Id",
-                    sld."SkillId",
-                    s."Name" as "SkillName",
-                    sld."Level",
-                    sld."Description",
-                    sld."Autonomy",
-                    sld."Influence",
-                    sld."Complexity",
-                    sld."BusinessSkills",
-                    sld."Knowledge",
-                    sld."BehavioralIndicators",
-                    sld."EvidenceExamples"
-                FROM public."SkillLevelDefinitions" sld
-                JOIN public."Skills" s ON sld."SkillId" = s."Id"
-                WHERE NOT sld."IsDeleted"
-                    AND NOT s."IsDeleted"
-                    AND s."IsActive" = true
-                    AND sld."Id" = %s
-                """, (definition_id,))
+            cur.execute(SKILL_LEVEL_DEFINITION_BY_ID_SQL, (definition_id,))
             result = cur.fetchone()
             if result:
                 LOGGER.debug(f"Found skill level definition with ID: {definition_id}")
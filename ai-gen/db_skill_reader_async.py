@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Async database reader for SkillLevelDefinitions table.
+Same functions as db_skill_reader.py, backed by the async connection pool so
+queries never block the event loop. Reads are served by a read replica when
+one is configured (see src/db/replicas.py).
+"""
+
+import psycopg.errors
+from psycopg.rows import args_row
+
+from src.db.async_pool import getAsyncConn, getAsyncReadConn, LOGGER
+from src.db.metrics import named_query
+from src.db.records import SkillLevel
+from db_skill_reader import (
+    SKILL_LEVELS_BY_SKILL_ID_SQL,
+    SKILL_LEVELS_BY_SKILL_IDS_SQL,
+    SKILL_DEFINITIONS_BY_LEVEL_SQL,
+    SKILL_LEVEL_COUNT_SQL,
+    DISTINCT_SKILLS_WITH_LEVELS_SQL,
+    SKILL_SUMMARY_SQL,
+    SKILL_SUMMARY_TOTALS_SQL,
+    SKILL_SUMMARY_TOTALS_LIVE_SQL,
+    SKILL_CATALOG_SQL,
+    SKILL_CATALOG_BY_SKILL_IDS_SQL,
+    SKILL_LEVEL_DEFINITION_BY_ID_SQL,
+    buildSkillLevelDefinitionsQuery,
+    buildSkillLevelDefinitionsPageQuery,
+    groupSkillLevelRows
+)
+
+
+@named_query
+async def getSkillLevelDefinitions(skill_id=None, level=None):
+    """
+    Get skill level definitions from database.
+
+    Args:
+        skill_id (str, optional): Filter by specific skill ID
+        level (int, optional): Filter by specific proficiency level (1-7)
+
+    Returns:
+        list: List of tuples containing skill level definition data
+    """
+    query, params = buildSkillLevelDefinitionsQuery(skill_id, level)
+    query += ' ORDER BY s."Name", sld."Level"'
+
+    async with getAsyncReadConn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, params if params else None)
+            results = await cur.fetchall()
+            LOGGER.debug(f"Retrieved {len(results)} skill level definitions from database.")
+
+    return results
+
+
+@named_query
+async def getSkillLevelDefinitionsPage(after_skill_id=None, after_level=None, limit=500):
+    """
+    Get one keyset page of skill level definitions.
+
+    Args:
+        after_skill_id (str, optional): SkillId of the last row of the previous page
+        after_level (int, optional): Level of the last row of the previous page
+        limit (int): Maximum number of rows to return
+
+    Returns:
+        list: List of tuples shaped like getSkillLevelDefinitions(), ordered by
+              SkillId and Level
+    """
+    query, params = buildSkillLevelDefinitionsPageQuery(after_skill_id, after_level, limit)
+
+    async with getAsyncReadConn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, params)
+            results = await cur.fetchall()
+            LOGGER.debug(f"Retrieved page of {len(results)} skill level definitions")
+
+    return results
+
+
+@named_query
+async def getSkillLevelsBySkillId(skill_id):
+    """
+    Get all level definitions for a specific skill.
+
+    Args:
+        skill_id (str): The skill ID to query
+
+    Returns:
+        list: List of SkillLevel records ordered by level
+    """
+    async with getAsyncReadConn() as conn:
+        # Build records straight from the wire values, no intermediate tuples
+        async with conn.cursor(row_factory=args_row(SkillLevel)) as cur:
+            await cur.execute(SKILL_LEVELS_BY_SKILL_ID_SQL, (skill_id,))
+            results = await cur.fetchall()
+            LOGGER.debug(f"Retrieved {len(results)} levels for skill ID: {skill_id}")
+
+    return results
+
+
+@named_query
+async def getSkillLevelsBySkillIds(skill_ids):
+    """
+    Get level definitions for several skills in one round-trip.
+
+    Args:
+        skill_ids (list): Skill IDs (UUID strings) to query
+
+    Returns:
+        dict: skill_id -> {"skill_name", "skill_code", "levels"}; skills
+              without level definitions are absent
+    """
+    if not skill_ids:
+        return {}
+
+    async with getAsyncReadConn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SKILL_LEVELS_BY_SKILL_IDS_SQL, (list(skill_ids),))
+            results = await cur.fetchall()
+            LOGGER.debug(f"Retrieved {len(results)} levels for {len(skill_ids)} skill IDs")
+
+    return groupSkillLevelRows(results)
+
+
+@named_query
+async def getSkillDefinitionsByLevel(level):
+    """
+    Get all skill definitions for a specific proficiency level.
+
+    Args:
+        level (int): Proficiency level (1-7)
+
+    Returns:
+        list: List of tuples with skill definitions at the specified level
+    """
+    async with getAsyncReadConn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SKILL_DEFINITIONS_BY_LEVEL_SQL, (level,))
+            results = await cur.fetchall()
+            LOGGER.debug(f"Retrieved {len(results)} skill definitions for level {level}")
+
+    return results
+
+
+@named_query
+async def getSkillLevelCount():
+    """
+    Get total count of skill level definitions.
+
+    Returns:
+        int: Total count of non-deleted skill level definitions
+    """
+    async with getAsyncReadConn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SKILL_LEVEL_COUNT_SQL)
+            count = (await cur.fetchone())[0]
+            LOGGER.debug(f"Total skill level definitions: {count}")
+
+    return count
+
+
+# Set to False once the SkillSummary view is found missing
+_skillSummaryAvailable = True
+
+
+async def fetchSkillSummary(summary_sql, fallback_sql):
+    """
+    Run a query against the SkillSummary view, falling back to the equivalent
+    live aggregate when the view has not been created yet.
+
+    Returns:
+        list: Query results
+    """
+    global _skillSummaryAvailable
+    if _skillSummaryAvailable:
+        try:
+            async with getAsyncReadConn() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(summary_sql)
+                    return await cur.fetchall()
+        except psycopg.errors.UndefinedTable:
+            LOGGER.warning("SkillSummary view not found (apply create_skill_summary_view.sql), using live aggregate")
+            _skillSummaryAvailable = False
+
+    async with getAsyncReadConn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(fallback_sql)
+            return await cur.fetchall()
+
+
+@named_query
+async def getDistinctSkillsWithLevels():
+    """
+    Get list of distinct skills that have level definitions.
+    Served by the SkillSummary materialized view.
+
+    Returns:
+        list: List of tuples (SkillId, SkillName, SkillCode, LevelCount)
+    """
+    results = await fetchSkillSummary(SKILL_SUMMARY_SQL, DISTINCT_SKILLS_WITH_LEVELS_SQL)
+    LOGGER.debug(f"Found {len(results)} distinct skills with level definitions")
+    return results
+
+
+@named_query
+async def getSkillSummaryTotals():
+    """
+    Get catalog totals from the SkillSummary materialized view.
+
+    Returns:
+        tuple: (total_skills, total_level_definitions) over active skills
+    """
+    rows = await fetchSkillSummary(SKILL_SUMMARY_TOTALS_SQL, SKILL_SUMMARY_TOTALS_LIVE_SQL)
+    total_skills, total_definitions = rows[0]
+    LOGGER.debug(f"Skill summary: {total_skills} skills, {total_definitions} level definitions")
+    return total_skills, total_definitions
+
+
+@named_query
+async def refreshSkillSummary():
+    """
+    Refresh the SkillSummary materialized view (concurrently, readers are not
+    blocked). Runs on the primary.
+
+    Returns:
+        bool: False if the view has not been created
+    """
+    global _skillSummaryAvailable
+    try:
+        async with getAsyncConn() as conn:
+            await conn.execute("SELECT public.refresh_skill_summary()")
+    except psycopg.errors.UndefinedFunction:
+        _skillSummaryAvailable = False
+        return False
+    _skillSummaryAvailable = True
+    LOGGER.debug("SkillSummary view refreshed")
+    return True
+
+
+@named_query
+async def getSkillCatalogRows():
+    """
+    Get every active skill joined with its level definitions in one pass.
+    Used to build the in-memory skill catalog (src/catalog/skill_catalog.py).
+
+    Returns:
+        list: List of tuples (SkillId, SkillName, SkillCode, Level, Description,
+              Autonomy, Influence, Complexity, BusinessSkills, Knowledge,
+              BehavioralIndicators, EvidenceExamples, UpdatedAt)
+              ordered by skill name and level
+    """
+    async with getAsyncReadConn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SKILL_CATALOG_SQL)
+            results = await cur.fetchall()
+            LOGGER.debug(f"Retrieved {len(results)} catalog rows")
+
+    return results
+
+
+@named_query
+async def getSkillCatalogRowsBySkillIds(skill_ids):
+    """
+    Get catalog rows (same shape as getSkillCatalogRows) for a set of skills.
+    Used to patch the in-memory catalog after a change notification.
+    Always reads from the primary: a replica may not have replayed the change
+    that triggered the notification yet.
+
+    Args:
+        skill_ids (list): Skill IDs to query
+
+    Returns:
+        list: List of catalog row tuples ordered by skill name and level
+    """
+    async with getAsyncConn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SKILL_CATALOG_BY_SKILL_IDS_SQL, (list(skill_ids),))
+            results = await cur.fetchall()
+            LOGGER.debug(f"Retrieved {len(results)} catalog rows for {len(skill_ids)} skills")
+
+    return results
+
+
+@named_query
+async def getSkillLevelDefinitionById(definition_id):
+    """
+    Get a specific skill level definition by its ID.
+
+    Args:
+        definition_id (str): The definition ID to query
+
+    Returns:
+        tuple: Single skill level definition record or None if not found
+    """
+    async with getAsyncReadConn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(SKILL_LEVEL_DEFINITION_BY_ID_SQL, (definition_id,))
+            result = await cur.fetchone()
+            if result:
+                LOGGER.debug(f"Found skill level definition with ID: {definition_id}")
+            else:
+                LOGGER.warning(f"No skill level definition found with ID: {definition_id}")
+
+    return result
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Export the skill catalog to a binary snapshot file.
+
+The service loads this file at startup (CATALOG_SNAPSHOT_PATH) so it can serve
+catalog and question generation requests before, or without, reaching the
+database.
+
+Usage:
+    python export_catalog_snapshot.py [path] [--verify]
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import CATALOG_SNAPSHOT_PATH
+from db_skill_reader import getSkillCatalogRows, LOGGER
+from src.catalog.skill_catalog import build_snapshot
+from src.catalog.snapshot_file import write_snapshot_file, read_snapshot_file
+
+
+def export_catalog_snapshot(path: str, verify: bool = False) -> int:
+    """
+    Build the catalog from the database and write it to `path`.
+
+    Args:
+        path: Output file
+        verify: Read the file back and compare versions
+
+    Returns:
+        int: File size in bytes
+    """
+    rows = getSkillCatalogRows()
+    snapshot = build_snapshot(rows)
+    size = write_snapshot_file(snapshot, path)
+
+    if verify:
+        loaded = read_snapshot_file(path)
+        if loaded.version != snapshot.version:
+            raise ValueError(f"Snapshot verification failed: {loaded.version} != {snapshot.version}")
+        LOGGER.info("Snapshot verified")
+
+    print(f"Wrote {path}: {len(snapshot.skills)} skills, {len(rows)} levels, "
+          f"{size} bytes, version {snapshot.version}")
+    return size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the skill catalog to a snapshot file")
+    parser.add_argument("path", nargs="?", default=CATALOG_SNAPSHOT_PATH or "skill_catalog.snapshot",
+                        help="Output file (default: CATALOG_SNAPSHOT_PATH or skill_catalog.snapshot)")
+    parser.add_argument("--verify", action="store_true", help="Read the file back after writing")
+    args = parser.parse_args()
+    export_catalog_snapshot(args.path, args.verify)
@@ -4,10 +4,17 @@ from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from config.settings import DEBUG, OPENAI_API_KEY
+from config.settings import DEBUG, OPENAI_API_KEY, CATALOG_LISTEN_ENABLED
 
 # Import V2 routes
 from src.api import routes_v2
+from src.db.async_pool import init_async_pool, close_async_pool
+from src.db.pool import close_pool
+from src.generators.llm_gateway import close_clients as close_llm_clients
+from src.generators.grading_cache import get_grading_cache
+from src.generators.question_bank import get_question_bank
+from src.catalog.skill_catalog import get_catalog
+from src.catalog.listener import start_catalog_listener, stop_catalog_listener
 
 # Configure logging
 logging.basicConfig(
@@ -53,9 +60,40 @@ async def startup_event():
     logger.info(f"DEBUG mode: {DEBUG}")
     logger.info(f"OpenAI API configured: {OPENAI_API_KEY is not None and len(OPENAI_API_KEY or '') > 0}")
 
+    # Open the async DB pool (connections are established in the background)
+    try:
+        await init_async_pool()
+    except Exception as e:
+        logger.error(f"Async DB pool unavailable at startup: {e}")
+
+    # Load the skill catalog and keep it fresh in the background. With a
+    # snapshot file the catalog is served from it immediately and the database
+    # load runs in the background (the service keeps working if the DB is down).
+    catalog = get_catalog()
+    if catalog.load_file():
+        catalog.start_background_load()
+    else:
+        try:
+            await catalog.load()
+        except Exception as e:
+            logger.error(f"Skill catalog not loaded at startup, will load on first use: {e}")
+    catalog.start_refresh()
+    if CATALOG_LISTEN_ENABLED:
+        start_catalog_listener(catalog)
+
+    # Keep the pre-generated question bank stocked (QUESTION_BANK_ENABLED)
+    await get_question_bank().start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler."""
+    await get_question_bank().stop()
+    await stop_catalog_listener()
+    await get_catalog().stop_refresh()
+    await close_llm_clients()
+    get_grading_cache().close()
+    await close_async_pool()
+    close_pool()
     logger.info("=" * 50)
     logger.info("AI Question Generator API Shutting Down")
     logger.info("=" * 50)
@@ -3,20 +3,33 @@ AI Question Generation API V2
 Endpoints for generating questions and grading answers with new schema
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Header, Response, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 import logging
+import uuid
 
 from ..validators.request_validator import validate_and_normalize, RequestValidator
-from db_skill_reader import (
-    getDistinctSkillsWithLevels,
-    getSkillLevelsBySkillId,
-    getSkillLevelCount
+from db_skill_reader_async import (
+    getSkillLevelCount,
+    getSkillLevelsBySkillIds,
+    getSkillLevelDefinitionsPage
 )
-from ..generators.question_generator_v2 import generate_questions_v2 as ai_generate_questions
-from ..generators.answer_grader import grade_answer as ai_grade_answer
+from ..catalog.skill_catalog import get_catalog, content_digest, build_skill_data
+from ..catalog.listener import get_listener
+from ..db.pool import get_pool_stats
+from ..db.async_pool import get_async_pool_stats
+from ..db.replicas import get_replica_stats
+from ..db.metrics import get_db_metrics
+from ..db.records import SkillLevel, dump_json
+from ..generators.llm_gateway import get_llm_metrics
+from ..generators.grading_cache import get_grading_cache
+from ..generators.question_bank import get_question_bank
+from ..generators.output_repair import get_repair_stats
+from ..generators.question_generator_v2 import generate_questions_v2 as ai_generate_questions, stream_questions_v2
+from ..generators.answer_grader import grade_answer as ai_grade_answer, grade_submission
 from ..generators.skill_gap_analyzer import analyze_skill_gap, analyze_multiple_gaps
 from ..generators.learning_path_recommender import generate_learning_path, rank_learning_resources
 
@@ -61,6 +74,41 @@ class GradeAnswerResponse(BaseModel):
     improvement_areas: List[str]
     detailed_analysis: Optional[str] = None
 
+class SubmissionOption(BaseModel):
+    """Option of a choice-based question in a submission."""
+    id: Optional[str] = Field(None, description="Option ID (selected_options refers to it; defaults to display_order)")
+    content: Optional[str] = Field(None, description="Option text")
+    is_correct: bool = Field(False, description="Whether this option is correct")
+    display_order: Optional[int] = Field(None, description="Display order (1, 2, 3...)")
+    effectiveness_level: Optional[str] = Field(None, description="SJT effectiveness level")
+    explanation: Optional[str] = Field(None, description="Why this option is correct/incorrect")
+
+class SubmissionAnswer(BaseModel):
+    """One answered question of a test submission."""
+    question_id: Optional[str] = Field(None, description="Question ID")
+    question_type: str = Field(..., description="Question type (MultipleChoice, ShortAnswer, ...)")
+    max_points: int = Field(..., ge=1, le=100, description="Maximum points for this question")
+    options: Optional[List[SubmissionOption]] = Field(None, description="Options of choice-based questions")
+    selected_options: Optional[List[Union[str, int]]] = Field(None, description="Selected option IDs (or display_order values)")
+    question_content: Optional[str] = Field(None, description="Question text (required for AI-graded types)")
+    student_answer: Optional[str] = Field(None, description="Student's text answer")
+    grading_rubric: Optional[str] = Field(None, description="JSON string with grading criteria")
+    expected_answer: Optional[str] = Field(None, description="Expected/model answer")
+    language: Optional[str] = Field(None, description="Response language (defaults to the submission language)")
+
+class GradeSubmissionRequest(BaseModel):
+    """Request to grade a whole test submission."""
+    submission_id: Optional[str] = Field(None, description="Submission ID (echoed back)")
+    answers: List[SubmissionAnswer] = Field(..., min_items=1, max_items=200, description="Answers to grade")
+    language: Optional[str] = Field("en", description="Response language (en/vi)")
+
+class GradeSubmissionResponse(BaseModel):
+    """Per-question results and aggregate score of a submission."""
+    success: bool
+    submission_id: Optional[str] = None
+    results: List[Dict[str, Any]]
+    aggregate: Dict[str, Any]
+
 # Response Models
 class SkillResponse(BaseModel):
     skill_id: str
@@ -68,6 +116,10 @@ class SkillResponse(BaseModel):
     skill_code: str
     level_count: int
 
+class SkillLevelsBatchRequest(BaseModel):
+    """Request to fetch level definitions for several skills at once."""
+    skill_ids: List[str] = Field(..., min_items=1, max_items=200, description="Skill IDs to hydrate")
+
 class SkillLevelResponse(BaseModel):
     level: int
     description: str
@@ -75,33 +127,49 @@ class SkillLevelResponse(BaseModel):
     influence: Optional[str]
     complexity: Optional[str]
 
+# Conditional GET helpers
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag (weak comparison per RFC 7232)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current ETag."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def json_with_etag(content: bytes, etag: str) -> Response:
+    """Pre-serialized JSON response carrying an ETag; clients must revalidate before reuse."""
+    return Response(content=content, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
 # Endpoints
 @router.get("/skills", response_model=Dict[str, Any])
-async def get_all_skills():
+async def get_all_skills(if_none_match: Optional[str] = Header(None)):
     """
-    Get all available skills from database.
+    Get all available skills from the in-memory catalog.
     Returns list of skills with their level counts.
+    Supports ETag / If-None-Match (304 when the catalog is unchanged).
     """
     try:
-        logger.info("Fetching all skills from database")
-        skills = getDistinctSkillsWithLevels()
+        logger.info("Fetching all skills from catalog")
+        snapshot = await get_catalog().get_snapshot()
+        etag = f'"{snapshot.skills_etag}"'
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
 
-        skill_list = [
-            {
-                "skill_id": str(s[0]),
-                "skill_name": s[1],
-                "skill_code": s[2],
-                "level_count": s[3]
-            }
-            for s in skills
-        ]
+        total = len(snapshot.skills)
+        body = b'{"success":true,"skills":' + snapshot.skills_json + b',"total":%d}' % total
 
-        logger.info(f"Retrieved {len(skill_list)} skills")
-        return {
-            "success": True,
-            "skills": skill_list,
-            "total": len(skill_list)
-        }
+        logger.info(f"Retrieved {total} skills")
+        return json_with_etag(body, etag)
     except Exception as e:
         logger.error(f"Error fetching skills: {e}", exc_info=True)
         raise HTTPException(
@@ -110,61 +178,158 @@ async def get_all_skills():
         )
 
 @router.get("/skills/{skill_id}/levels")
-async def get_skill_levels(skill_id: str):
+async def get_skill_levels(skill_id: str, if_none_match: Optional[str] = Header(None)):
     """
     Get proficiency levels for a specific skill.
     Returns all level definitions (1-7) for the skill.
+    Supports ETag / If-None-Match (304 when the skill is unchanged).
     """
     try:
         logger.info(f"Fetching levels for skill: {skill_id}")
-        levels = getSkillLevelsBySkillId(skill_id)
+        snapshot = await get_catalog().get_snapshot()
+        skill_key = skill_id.strip().lower()
+        levels_json = snapshot.levels_json(skill_key)
 
-        if not levels:
+        if levels_json is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No levels found for skill: {skill_id}"
             )
 
-        level_list = [
+        etag = f'"{content_digest([snapshot.level_etags[skill_key], skill_id])}"'
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        body = b'{"success":true,"skill_id":' + dump_json(skill_id) + b',"levels":' + levels_json + b'}'
+
+        logger.info(f"Retrieved {len(snapshot.levels[skill_key])} levels for skill {skill_id}")
+        return json_with_etag(body, etag)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching skill levels: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch skill levels: {str(e)}"
+        )
+
+@router.post("/skills/levels:batch")
+async def get_skill_levels_batch(request: SkillLevelsBatchRequest):
+    """
+    Get proficiency levels for several skills in one request.
+    Served from the skill catalog; skills missing from it are fetched from the
+    database with a single batched query.
+    """
+    try:
+        snapshot = await get_catalog().get_snapshot()
+
+        requested = list(dict.fromkeys(sid.strip().lower() for sid in request.skill_ids))
+        found: Dict[str, Dict[str, Any]] = {}
+        misses = []
+        not_found = []
+        for skill_id in requested:
+            levels = snapshot.levels.get(skill_id)
+            if levels:
+                skill = snapshot.skills_by_id[skill_id]
+                found[skill_id] = {"skill_name": skill[1], "skill_code": skill[2], "levels": levels}
+                continue
+            try:
+                uuid.UUID(skill_id)
+                misses.append(skill_id)
+            except ValueError:
+                not_found.append(skill_id)
+
+        if misses:
+            logger.info(f"{len(misses)} skills not in catalog, querying database")
+            found.update(await getSkillLevelsBySkillIds(misses))
+            not_found.extend(sid for sid in misses if sid not in found)
+
+        results = [
             {
-                "level": l[0],
-                "description": l[1],
-                "autonomy": l[2],
-                "influence": l[3],
-                "complexity": l[4],
-                "business_skills": l[5],
-                "knowledge": l[6]
+                "skill_id": skill_id,
+                "skill_name": found[skill_id]["skill_name"],
+                "skill_code": found[skill_id]["skill_code"],
+                "levels": [l.to_dict() for l in found[skill_id]["levels"]]
             }
-            for l in levels
+            for skill_id in requested if skill_id in found
         ]
 
-        logger.info(f"Retrieved {len(level_list)} levels for skill {skill_id}")
+        logger.info(f"Batch levels: {len(results)} found, {len(not_found)} not found")
         return {
             "success": True,
-            "skill_id": skill_id,
-            "levels": level_list
+            "skills": results,
+            "not_found": not_found
         }
-    except HTTPException:
-        raise
     except Exception as e:
-        logger.error(f"Error fetching skill levels: {e}", exc_info=True)
+        logger.error(f"Error fetching batch skill levels: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch skill levels: {str(e)}"
         )
 
+@router.get("/skill-level-definitions")
+async def list_skill_level_definitions(
+    after_skill_id: Optional[str] = Query(None, description="SkillId of the last row of the previous page"),
+    after_level: Optional[int] = Query(None, ge=1, le=7, description="Level of the last row of the previous page"),
+    limit: int = Query(500, ge=1, le=1000, description="Page size")
+):
+    """
+    Page through every skill level definition, ordered by (skill_id, level).
+    Pass the `next` cursor of a response to get the following page; it is null
+    on the last page.
+    """
+    if after_skill_id:
+        try:
+            uuid.UUID(after_skill_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid after_skill_id: {after_skill_id}"
+            )
+
+    try:
+        rows = await getSkillLevelDefinitionsPage(after_skill_id, after_level, limit)
+    except Exception as e:
+        logger.error(f"Error fetching skill level definitions page: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch skill level definitions: {str(e)}"
+        )
+
+    definitions = [
+        {
+            "id": str(r[0]),
+            "skill_id": str(r[1]),
+            "skill_name": r[2],
+            "skill_code": r[3],
+            **SkillLevel._make(r[4:13])._asdict(),
+            "updated_at": r[15].isoformat() if r[15] else None
+        }
+        for r in rows
+    ]
+
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = {"after_skill_id": definitions[-1]["skill_id"], "after_level": definitions[-1]["level"]}
+
+    return {
+        "success": True,
+        "definitions": definitions,
+        "count": len(definitions),
+        "next": next_cursor
+    }
+
 @router.get("/stats")
 async def get_database_stats():
-    """Get database statistics."""
+    """Get database statistics (served from the skill catalog)."""
     try:
-        total_definitions = getSkillLevelCount()
-        skills = getDistinctSkillsWithLevels()
+        catalog_stats = await get_catalog().get_stats()
 
         return {
             "success": True,
             "stats": {
-                "total_skills": len(skills),
-                "total_level_definitions": total_definitions,
+                "total_skills": catalog_stats["total_skills"],
+                "total_level_definitions": catalog_stats["total_level_definitions"],
                 "sfia_levels": "1-7"
             }
         }
@@ -175,6 +340,43 @@ async def get_database_stats():
             detail=str(e)
         )
 
+async def prepare_generation(request: GenerateRequestV2):
+    """
+    Validate a generation request and load the skill data for its prompt.
+
+    Returns:
+        (normalized_request, skill_data); skill_data is None without skill levels
+
+    Raises:
+        HTTPException: 422 if the request is invalid
+    """
+    # 1. Validate and normalize request
+    request_dict = request.dict()
+    is_valid, error, normalized = validate_and_normalize(request_dict)
+
+    if not is_valid:
+        logger.error(f"Validation failed: {error}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid request: {error}"
+        )
+
+    logger.info("Request validated successfully")
+    logger.debug(f"Normalized request: {normalized}")
+
+    # 2. Fetch skill data from DB if provided
+    skill_data = None
+    if normalized.get("skills") and len(normalized["skills"]) > 0:
+        skill_id = normalized["skills"][0]["skill_id"]
+        skill_name = normalized["skills"][0]["skill_name"]
+        skill_code = normalized["skills"][0].get("skill_code", "")
+
+        logger.info(f"Fetching skill data for: {skill_name} ({skill_code}) - {skill_id}")
+        skill_data = await build_skill_data(normalized["skills"][0])
+
+    return normalized, skill_data
+
+
 @router.post("/generate-questions")
 async def generate_questions_v2(request: GenerateRequestV2):
     """
@@ -183,64 +385,22 @@ async def generate_questions_v2(request: GenerateRequestV2):
     This endpoint:
     1. Validates the request
     2. Fetches skill data from database
-    3. Generates questions using AI (Azure OpenAI)
-    4. Returns questions in output_question_schema_v2 format
+    3. Serves the request from the question bank when it has stock
+    4. Otherwise generates questions using AI (Azure OpenAI)
+    5. Returns questions in output_question_schema_v2 format
     """
     try:
         logger.info(f"Received generation request: {request.number_of_questions} questions")
         logger.debug(f"Request details: {request.dict()}")
 
-        # 1. Validate and normalize request
-        request_dict = request.dict()
-        is_valid, error, normalized = validate_and_normalize(request_dict)
+        normalized, skill_data = await prepare_generation(request)
 
-        if not is_valid:
-            logger.error(f"Validation failed: {error}")
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Invalid request: {error}"
-            )
+        # 3. Serve from the pre-generated question bank when it has stock
+        banked = await get_question_bank().take(normalized, skill_data)
+        if banked is not None:
+            return banked
 
-        logger.info("Request validated successfully")
-        logger.debug(f"Normalized request: {normalized}")
-
-        # 2. Fetch skill data from DB if provided
-        skill_data = None
-        if normalized.get("skills") and len(normalized["skills"]) > 0:
-            skill_id = normalized["skills"][0]["skill_id"]
-            skill_name = normalized["skills"][0]["skill_name"]
-            skill_code = normalized["skills"][0].get("skill_code", "")
-
-            logger.info(f"Fetching skill data for: {skill_name} ({skill_code}) - {skill_id}")
-            levels = getSkillLevelsBySkillId(skill_id)
-
-            if not levels:
-                logger.warning(f"No levels found for skill {skill_id}, proceeding without skill data")
-            else:
-                logger.info(f"Retrieved {len(levels)} levels for skill")
-                # Format skill data for AI generator
-                # Fields from DB: Level, Description, Autonomy, Influence, Complexity, BusinessSkills, Knowledge, BehavioralIndicators, EvidenceExamples
-                skill_data = {
-                    "skill_id": skill_id,
-                    "skill_name": skill_name,
-                    "skill_code": skill_code,
-                    "levels": [
-                        {
-                            "level": l[0],
-                            "description": l[1],
-                            "autonomy": l[2],
-                            "influence": l[3],
-                            "complexity": l[4],
-                            "business_skills": l[5],
-                            "knowledge": l[6],
-                            "behavioral_indicators": l[7],
-                            "evidence_examples": l[8]
-                        }
-                        for l in levels
-                    ]
-                }
-
-        # 3. Generate questions with Azure OpenAI
+        # 4. Generate questions with Azure OpenAI
         logger.info("Generating questions with Azure OpenAI")
 
         try:
@@ -269,26 +429,130 @@ async def generate_questions_v2(request: GenerateRequestV2):
             detail=f"Failed to generate questions: {str(e)}"
         )
 
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Event."""
+    return b"event: " + event.encode("ascii") + b"\ndata: " + dump_json(data) + b"\n\n"
+
+
+@router.post("/generate-questions:stream")
+async def generate_questions_stream(request: GenerateRequestV2):
+    """
+    Generate questions as a Server-Sent Events stream.
+
+    Same request and validation as /generate-questions. Each question is sent
+    as a `question` event as soon as the model has finished it, followed by
+    one `metadata` event; a failure after the stream started is reported as
+    an `error` event.
+    """
+    logger.info(f"Received streaming generation request: {request.number_of_questions} questions")
+    normalized, skill_data = await prepare_generation(request)
+    banked = await get_question_bank().take(normalized, skill_data)
+
+    async def events():
+        index = 0
+        if banked is not None:
+            for index, question in enumerate(banked["questions"]):
+                yield sse_event("question", {"index": index, "question": question})
+            yield sse_event("metadata", banked["metadata"])
+            return
+        try:
+            async for kind, payload in stream_questions_v2(normalized, skill_data):
+                if kind == "question":
+                    yield sse_event("question", {"index": index, "question": payload})
+                    index += 1
+                else:
+                    yield sse_event(kind, payload)
+        except Exception as e:
+            logger.error(f"Streaming generation failed after {index} questions: {e}")
+            yield sse_event("error", {"detail": f"AI generation failed: {str(e)}", "questions_sent": index})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/health")
 async def health_check():
     """Health check for V2 API."""
     try:
         # Test DB connection
-        count = getSkillLevelCount()
+        count = await getSkillLevelCount()
 
         return {
             "status": "healthy",
             "api_version": "v2",
             "database": "connected",
-            "total_definitions": count
+            "total_definitions": count,
+            "pool": {
+                "sync": get_pool_stats(),
+                "async": get_async_pool_stats(),
+                "replicas": get_replica_stats()
+            }
         }
     except Exception as e:
         return {
             "status": "unhealthy",
             "api_version": "v2",
             "database": "disconnected",
-            "error": str(e)
+            "error": str(e),
+            "pool": {
+                "sync": get_pool_stats(),
+                "async": get_async_pool_stats(),
+                "replicas": get_replica_stats()
+            }
+        }
+
+@router.get("/metrics/db")
+async def db_metrics():
+    """
+    Database query latency and pool wait histograms (milliseconds), tagged by
+    query name / pool, plus live pool statistics.
+    """
+    return {
+        "success": True,
+        **get_db_metrics(),
+        "pool": {
+            "sync": get_pool_stats(),
+            "async": get_async_pool_stats(),
+            "replicas": get_replica_stats()
         }
+    }
+
+@router.get("/metrics/llm")
+async def llm_metrics():
+    """
+    LLM call latency histograms (milliseconds) and token usage per endpoint,
+    HTTP connection reuse of the shared client, grading cache, question
+    bank and output repair counters.
+    """
+    return {
+        "success": True,
+        **get_llm_metrics(),
+        "grading_cache": get_grading_cache().get_stats(),
+        "question_bank": get_question_bank().get_stats(),
+        "output_repair": get_repair_stats()
+    }
+
+@router.post("/catalog/reload")
+async def reload_catalog():
+    """Reload the in-memory skill catalog from the database."""
+    try:
+        catalog = get_catalog()
+        await catalog.load()
+        listener = get_listener()
+        return {
+            "success": True,
+            "catalog": await catalog.get_stats(),
+            "listener": listener.get_stats() if listener else None
+        }
+    except Exception as e:
+        logger.error(f"Error reloading skill catalog: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to reload skill catalog: {str(e)}"
+        )
 
 @router.post("/grade-answer", response_model=GradeAnswerResponse)
 async def grade_answer_endpoint(request: GradeAnswerRequest):
@@ -333,6 +597,32 @@ async def grade_answer_endpoint(request: GradeAnswerRequest):
         )
 
 
+@router.post("/grade-answers:batch", response_model=GradeSubmissionResponse)
+async def grade_submission_endpoint(request: GradeSubmissionRequest):
+    """
+    Grade a whole test submission in one request.
+
+    Choice-based questions (MultipleChoice, MultipleAnswer, TrueFalse,
+    SituationalJudgment, Rating) are graded locally from their options; text
+    answers are graded by AI concurrently. Returns per-question results in
+    request order plus the aggregate score.
+    """
+    try:
+        logger.info(f"Grading submission {request.submission_id} with {len(request.answers)} answers")
+        result = await grade_submission(
+            items=[answer.model_dump() for answer in request.answers],
+            language=request.language or "en"
+        )
+        return GradeSubmissionResponse(submission_id=request.submission_id, **result)
+
+    except Exception as e:
+        logger.error(f"Unexpected error during submission grading: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
 # ============================================================================
 # SKILL GAP ANALYSIS ENDPOINTS
 # ============================================================================
@@ -369,6 +659,7 @@ class MultipleGapsRequest(BaseModel):
     job_role: str = Field(..., description="Job role name")
     gaps: List[Dict[str, Any]] = Field(..., description="List of gaps to analyze")
     language: Optional[str] = Field("en", description="Response language (en/vi)")
+    batch_mode: Optional[bool] = Field(None, description="Analyze several gaps per AI call (default: GAP_ANALYSIS_BATCH_MODE)")
 
 
 class MultipleGapsResponse(BaseModel):
@@ -440,7 +731,8 @@ async def analyze_multiple_gaps_endpoint(request: MultipleGapsRequest):
             employee_name=request.employee_name,
             job_role=request.job_role,
             gaps=request.gaps,
-            language=request.language or "en"
+            language=request.language or "en",
+            batch_mode=request.batch_mode
         )
 
         logger.info(f"Multiple gaps analysis complete: {len(result['gap_analyses'])} analyzed")
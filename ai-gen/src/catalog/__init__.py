@@ -0,0 +1,5 @@
+"""In-memory skill catalog"""
+
+from .skill_catalog import SkillCatalog, CatalogSnapshot, build_snapshot, get_catalog
+
+__all__ = ['SkillCatalog', 'CatalogSnapshot', 'build_snapshot', 'get_catalog']
@@ -0,0 +1,200 @@
+"""
+Skill catalog change listener.
+Subscribes to the Postgres notification channel fed by the triggers in
+create_skill_catalog_notify.sql and patches the affected skills in the
+in-memory catalog. Each batch of changes also refreshes the SkillSummary
+materialized view (create_skill_summary_view.sql), so writers never pay for it.
+"""
+
+import json
+import asyncio
+import logging
+from typing import Optional, Set
+
+import psycopg
+from psycopg import sql
+from psycopg.conninfo import make_conninfo
+
+from config.settings import (
+    CATALOG_NOTIFY_CHANNEL,
+    CATALOG_NOTIFY_DEBOUNCE,
+    CATALOG_NOTIFY_MAX_PATCH,
+    CATALOG_SUMMARY_REFRESH_ENABLED
+)
+from db_skill_reader_async import refreshSkillSummary
+from src.db.db_config import DB_CONFIG, get_connect_kwargs
+from .skill_catalog import SkillCatalog
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_MIN = 1.0
+RECONNECT_DELAY_MAX = 60.0
+
+
+def parse_notification(payload: str) -> Optional[str]:
+    """
+    Extract the skill id from a notification payload.
+
+    Returns:
+        Skill id, or None if the payload cannot be attributed to one skill
+    """
+    try:
+        data = json.loads(payload)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return data.get("skill_id") or None
+
+
+class CatalogChangeListener:
+    """Background LISTEN loop that keeps a SkillCatalog in sync with the DB."""
+
+    def __init__(
+        self,
+        catalog: SkillCatalog,
+        channel: str = CATALOG_NOTIFY_CHANNEL,
+        debounce: float = CATALOG_NOTIFY_DEBOUNCE,
+        max_patch: int = CATALOG_NOTIFY_MAX_PATCH,
+        refresh_summary: bool = CATALOG_SUMMARY_REFRESH_ENABLED
+    ):
+        self.catalog = catalog
+        self.channel = channel
+        self.debounce = debounce
+        self.max_patch = max_patch
+        self.refresh_summary = refresh_summary
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+        self.notifications_received = 0
+        self.patches_applied = 0
+        self.full_reloads = 0
+        self.summary_refreshes = 0
+
+    async def refresh_summary_view(self):
+        """Refresh the SkillSummary view read by getDistinctSkillsWithLevels() / getSkillSummaryTotals()."""
+        if not self.refresh_summary:
+            return
+        try:
+            if await refreshSkillSummary():
+                self.summary_refreshes += 1
+            else:
+                logger.warning("SkillSummary view not found (apply create_skill_summary_view.sql), not refreshing it")
+                self.refresh_summary = False
+        except Exception as e:
+            logger.error(f"Failed to refresh the SkillSummary view: {e}")
+
+    async def apply_changes(self, skill_ids: Set[str], full_reload: bool):
+        """Patch the changed skills, or reload everything for large/unknown changes."""
+        if full_reload or skill_ids:
+            await self.refresh_summary_view()
+        if full_reload or len(skill_ids) > self.max_patch:
+            await self.catalog.load()
+            self.full_reloads += 1
+        elif skill_ids:
+            await self.catalog.refresh_skills(sorted(skill_ids))
+            self.patches_applied += 1
+
+    async def _listen(self):
+        conninfo = make_conninfo(**get_connect_kwargs(DB_CONFIG))
+        async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+            await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+            self._connected = True
+            logger.info(f"Listening for skill catalog changes on channel '{self.channel}'")
+
+            # Changes committed before LISTEN took effect (since the startup
+            # load, or while disconnected) were never notified: reload once
+            await self.apply_changes(set(), full_reload=True)
+
+            while True:
+                skill_ids: Set[str] = set()
+                full_reload = False
+
+                # Block for the first notification, then batch any that follow
+                # within the debounce window (bulk edits from the admin UI).
+                async for notify in conn.notifies(stop_after=1):
+                    full_reload |= self._collect(notify.payload, skill_ids)
+                async for notify in conn.notifies(timeout=self.debounce):
+                    full_reload |= self._collect(notify.payload, skill_ids)
+
+                try:
+                    await self.apply_changes(skill_ids, full_reload)
+                except Exception as e:
+                    logger.error(f"Failed to apply skill catalog changes: {e}", exc_info=True)
+
+    def _collect(self, payload: str, skill_ids: Set[str]) -> bool:
+        """Record a notification; returns True if a full reload is needed."""
+        self.notifications_received += 1
+        skill_id = parse_notification(payload)
+        if skill_id is None:
+            logger.warning(f"Unrecognised catalog notification payload: {payload!r}")
+            return True
+        skill_ids.add(skill_id)
+        return False
+
+    async def _run(self):
+        delay = RECONNECT_DELAY_MIN
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._connected:
+                    delay = RECONNECT_DELAY_MIN
+                    self._connected = False
+                logger.error(f"Skill catalog listener disconnected: {e}; retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_DELAY_MAX)
+
+    def start(self):
+        """Start listening in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background listener."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self):
+        """Listener counters for diagnostics."""
+        return {
+            "channel": self.channel,
+            "running": self._task is not None and not self._task.done(),
+            "connected": self._connected,
+            "notifications_received": self.notifications_received,
+            "patches_applied": self.patches_applied,
+            "full_reloads": self.full_reloads,
+            "summary_refreshes": self.summary_refreshes
+        }
+
+
+# Process-wide listener (created at startup)
+_listener: Optional[CatalogChangeListener] = None
+
+
+def get_listener() -> Optional[CatalogChangeListener]:
+    """Return the running listener, if any."""
+    return _listener
+
+
+def start_catalog_listener(catalog: SkillCatalog) -> CatalogChangeListener:
+    """Create and start the process-wide listener."""
+    global _listener
+    if _listener is None:
+        _listener = CatalogChangeListener(catalog)
+        _listener.start()
+    return _listener
+
+
+async def stop_catalog_listener():
+    """Stop the process-wide listener."""
+    global _listener
+    if _listener is not None:
+        await _listener.stop()
+        _listener = None
@@ -0,0 +1,396 @@
+"""
+In-memory SFIA skill catalog.
+Holds a snapshot of Skills + SkillLevelDefinitions indexed by skill id and
+code so catalog endpoints and the question generator never hit the database
+on the request path.
+"""
+
+import os
+import json
+import time
+import asyncio
+import bisect
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from config.settings import (
+    CATALOG_REFRESH_INTERVAL,
+    CATALOG_SNAPSHOT_PATH,
+    CATALOG_SNAPSHOT_AUTOSAVE
+)
+from src.db.records import Skill, SkillLevel, dump_json, skill_levels_json
+from db_skill_reader_async import getSkillCatalogRows, getSkillCatalogRowsBySkillIds
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_skill_id(skill_id) -> str:
+    """Normalize a skill id (UUID or string) for catalog lookups."""
+    return str(skill_id).strip().lower()
+
+
+def content_digest(value) -> str:
+    """Stable content hash used as catalog version / ETag."""
+    payload = json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class CatalogSnapshot:
+    """
+    Immutable view of the skill catalog.
+
+    skills:  list of Skill records ordered by name, same shape as
+             getDistinctSkillsWithLevels()
+    levels:  skill id -> list of SkillLevel records, same shape as
+             getSkillLevelsBySkillId()
+
+    Content hashes (skills_etag, level_etags, version) are computed once per
+    snapshot and used as strong ETags by the catalog endpoints. Serialized
+    response bodies (skills_json, levels_json) are built on first use and
+    reused until the snapshot is replaced.
+    """
+
+    def __init__(
+        self,
+        skills: List[Skill],
+        levels: Dict[str, List[SkillLevel]],
+        total_definitions: int,
+        last_updated_at: Optional[datetime] = None,
+        level_etags: Optional[Dict[str, str]] = None,
+        source: str = "database"
+    ):
+        self.skills = skills
+        self.levels = levels
+        self.total_definitions = total_definitions
+        self.last_updated_at = last_updated_at
+        self.source = source
+        self.loaded_at = datetime.now()
+        self.skills_by_id = {normalize_skill_id(s[0]): s for s in skills}
+        self.skills_by_code = {s[2].upper(): s for s in skills if s[2]}
+
+        # Reuse hashes of unchanged skills when patching
+        known = level_etags or {}
+        self.level_etags = {
+            skill_id: known.get(skill_id) or content_digest(skill_levels)
+            for skill_id, skill_levels in levels.items()
+        }
+        self.skills_etag = content_digest(skills)
+        self.version = content_digest([self.skills_etag, total_definitions, sorted(self.level_etags.items())])
+
+        self._skills_json: Optional[bytes] = None
+        self._levels_json: Dict[str, bytes] = {}
+
+    @property
+    def skills_json(self) -> bytes:
+        """Serialized list of Skill.to_dict() entries."""
+        if self._skills_json is None:
+            self._skills_json = dump_json([skill.to_dict() for skill in self.skills])
+        return self._skills_json
+
+    def levels_json(self, skill_id: str) -> Optional[bytes]:
+        """Serialized list of SkillLevel.to_dict() entries, or None if the skill has no levels."""
+        cached = self._levels_json.get(skill_id)
+        if cached is None:
+            levels = self.levels.get(skill_id)
+            if not levels:
+                return None
+            cached = self._levels_json[skill_id] = skill_levels_json(levels)
+        return cached
+
+
+def count_definitions(levels: Dict[str, List[SkillLevel]]) -> int:
+    """Level definitions in a snapshot (one per catalog row)."""
+    return sum(len(skill_levels) for skill_levels in levels.values())
+
+
+def build_snapshot(rows: List[Tuple]) -> CatalogSnapshot:
+    """
+    Build a catalog snapshot from getSkillCatalogRows() rows.
+
+    Args:
+        rows: Catalog rows ordered by skill name and level
+
+    Returns:
+        CatalogSnapshot
+    """
+    skill_order: List[Tuple[str, str, str]] = []
+    levels: Dict[str, List[SkillLevel]] = {}
+    last_updated_at = None
+
+    for row in rows:
+        skill_id = normalize_skill_id(row[0])
+        if skill_id not in levels:
+            levels[skill_id] = []
+            skill_order.append((skill_id, row[1], row[2]))
+        levels[skill_id].append(SkillLevel._make(row[3:12]))
+
+        updated_at = row[12]
+        if updated_at is not None and (last_updated_at is None or updated_at > last_updated_at):
+            last_updated_at = updated_at
+
+    skills = [
+        Skill(skill_id, name, code, len(levels[skill_id]))
+        for skill_id, name, code in skill_order
+    ]
+    return CatalogSnapshot(skills, levels, count_definitions(levels), last_updated_at)
+
+
+def patch_snapshot(
+    snapshot: CatalogSnapshot,
+    skill_ids: List[str],
+    rows: List[Tuple]
+) -> CatalogSnapshot:
+    """
+    Build a new snapshot with only the given skills replaced.
+
+    Skills in `skill_ids` that have no rows (deleted, deactivated or without
+    level definitions) are dropped; all other entries are shared with the
+    previous snapshot.
+
+    Args:
+        snapshot: Current snapshot
+        skill_ids: Skills affected by the change
+        rows: getSkillCatalogRowsBySkillIds(skill_ids) result
+
+    Returns:
+        CatalogSnapshot
+    """
+    changed = {normalize_skill_id(sid) for sid in skill_ids}
+    fresh = build_snapshot(rows)
+
+    levels = {sid: lv for sid, lv in snapshot.levels.items() if sid not in changed}
+    levels.update(fresh.levels)
+
+    skills = [s for s in snapshot.skills if s[0] not in changed]
+    for skill in fresh.skills:
+        bisect.insort(skills, skill, key=lambda s: s[1])
+
+    last_updated_at = snapshot.last_updated_at
+    if fresh.last_updated_at is not None and (last_updated_at is None or fresh.last_updated_at > last_updated_at):
+        last_updated_at = fresh.last_updated_at
+
+    level_etags = {sid: etag for sid, etag in snapshot.level_etags.items() if sid not in changed}
+    patched = CatalogSnapshot(skills, levels, count_definitions(levels), last_updated_at, level_etags)
+    patched._levels_json.update(
+        (sid, body) for sid, body in snapshot._levels_json.items() if sid not in changed
+    )
+    return patched
+
+
+class SkillCatalog:
+    """Process-wide skill catalog with background refresh."""
+
+    def __init__(
+        self,
+        refresh_interval: float = CATALOG_REFRESH_INTERVAL,
+        snapshot_path: str = CATALOG_SNAPSHOT_PATH,
+        autosave: bool = CATALOG_SNAPSHOT_AUTOSAVE
+    ):
+        self.refresh_interval = refresh_interval
+        self.snapshot_path = snapshot_path
+        self.autosave = autosave
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._initial_load_task: Optional[asyncio.Task] = None
+        self._loaded_monotonic = 0.0
+        self._saved_version: Optional[str] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    async def _load_locked(self) -> CatalogSnapshot:
+        start = time.perf_counter()
+        rows = await getSkillCatalogRows()
+        self._snapshot = build_snapshot(rows)
+        self._loaded_monotonic = time.monotonic()
+        logger.info(
+            f"Skill catalog loaded: {len(self._snapshot.skills)} skills, "
+            f"{len(rows)} levels in {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        await self._save_file()
+        return self._snapshot
+
+    def load_file(self, path: Optional[str] = None) -> Optional[CatalogSnapshot]:
+        """
+        Load the catalog from a snapshot file without touching the database.
+
+        Args:
+            path: Snapshot file, defaults to CATALOG_SNAPSHOT_PATH
+
+        Returns:
+            CatalogSnapshot, or None if no usable file exists
+        """
+        from .snapshot_file import read_snapshot_file, SnapshotFileError
+
+        path = path or self.snapshot_path
+        if not path:
+            return None
+        if not os.path.exists(path):
+            logger.info(f"No catalog snapshot file at {path}")
+            return None
+        try:
+            snapshot = read_snapshot_file(path)
+        except SnapshotFileError as e:
+            logger.error(f"Ignoring catalog snapshot file: {e}")
+            return None
+        self._snapshot = snapshot
+        self._loaded_monotonic = time.monotonic()
+        self._saved_version = snapshot.version
+        return snapshot
+
+    async def _save_file(self):
+        """Rewrite the snapshot file if autosave is on and the catalog changed."""
+        snapshot = self._snapshot
+        if not (self.snapshot_path and self.autosave) or snapshot is None:
+            return
+        if snapshot.version == self._saved_version:
+            return
+        from .snapshot_file import write_snapshot_file
+        try:
+            await asyncio.to_thread(write_snapshot_file, snapshot, self.snapshot_path)
+            self._saved_version = snapshot.version
+        except OSError as e:
+            logger.warning(f"Could not write catalog snapshot file {self.snapshot_path}: {e}")
+
+    async def load(self) -> CatalogSnapshot:
+        """Load a fresh snapshot from the database and swap it in."""
+        async with self._load_lock:
+            return await self._load_locked()
+
+    async def refresh_skills(self, skill_ids: List[str]) -> CatalogSnapshot:
+        """
+        Re-read only the given skills and patch them into the snapshot.
+        Falls back to a full load if no snapshot exists yet.
+        """
+        async with self._load_lock:
+            if self._snapshot is None:
+                return await self._load_locked()
+            rows = await getSkillCatalogRowsBySkillIds(skill_ids)
+            self._snapshot = patch_snapshot(self._snapshot, skill_ids, rows)
+            logger.info(f"Skill catalog patched for {len(skill_ids)} skill(s)")
+            await self._save_file()
+            return self._snapshot
+
+    async def get_snapshot(self) -> CatalogSnapshot:
+        """Return the current snapshot, loading it on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            async with self._load_lock:
+                snapshot = self._snapshot or await self._load_locked()
+        return snapshot
+
+    async def get_skills(self) -> List[Skill]:
+        """All skills as Skill records."""
+        return (await self.get_snapshot()).skills
+
+    async def get_skill(self, skill_id: str) -> Optional[Skill]:
+        """Skill record by id, or None."""
+        return (await self.get_snapshot()).skills_by_id.get(normalize_skill_id(skill_id))
+
+    async def get_skill_by_code(self, skill_code: str) -> Optional[Skill]:
+        """Skill record by code (case-insensitive), or None."""
+        return (await self.get_snapshot()).skills_by_code.get(skill_code.strip().upper())
+
+    async def get_levels(self, skill_id: str) -> List[SkillLevel]:
+        """SkillLevel records for a skill, empty list if unknown."""
+        return (await self.get_snapshot()).levels.get(normalize_skill_id(skill_id), [])
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Catalog counts and load metadata."""
+        snapshot = await self.get_snapshot()
+        return {
+            "total_skills": len(snapshot.skills),
+            "total_level_definitions": snapshot.total_definitions,
+            "version": snapshot.version,
+            "source": snapshot.source,
+            "loaded_at": snapshot.loaded_at.isoformat(),
+            "age_seconds": round(time.monotonic() - self._loaded_monotonic, 1),
+            "refresh_interval_seconds": self.refresh_interval
+        }
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Skill catalog refresh failed, keeping previous snapshot: {e}")
+
+    async def _load_until_ready(self):
+        delay = 1.0
+        while True:
+            try:
+                await self.load()
+                return
+            except Exception as e:
+                logger.warning(f"Skill catalog database load failed, serving snapshot file; retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    def start_background_load(self):
+        """Load from the database in the background, retrying until it succeeds."""
+        if self._initial_load_task is None:
+            self._initial_load_task = asyncio.create_task(self._load_until_ready())
+
+    def start_refresh(self):
+        """Start the periodic background refresh (no-op if interval <= 0)."""
+        if self.refresh_interval > 0 and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+            logger.info(f"Skill catalog refresh every {self.refresh_interval:.0f}s")
+
+    async def stop_refresh(self):
+        """Stop the background refresh and initial load tasks."""
+        for task in (self._refresh_task, self._initial_load_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresh_task = None
+        self._initial_load_task = None
+
+
+# Process-wide catalog (lazy-created)
+_catalog: Optional[SkillCatalog] = None
+
+
+def get_catalog() -> SkillCatalog:
+    """Get or create the process-wide skill catalog."""
+    global _catalog
+    if _catalog is None:
+        _catalog = SkillCatalog()
+    return _catalog
+
+
+async def build_skill_data(skill: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Skill data for the question generator (all SkillLevel fields per level).
+
+    Args:
+        skill: Request skill (skill_id, skill_name, optional skill_code)
+
+    Returns:
+        Dict with skill_id, skill_name, skill_code and levels, or None if
+        the skill has no level definitions
+    """
+    skill_id = skill["skill_id"]
+    levels = await get_catalog().get_levels(skill_id)
+    if not levels:
+        logger.warning(f"No levels found for skill {skill_id}, proceeding without skill data")
+        return None
+    logger.info(f"Retrieved {len(levels)} levels for skill")
+    return {
+        "skill_id": skill_id,
+        "skill_name": skill["skill_name"],
+        "skill_code": skill.get("skill_code", ""),
+        "levels": [l._asdict() for l in levels]
+    }
@@ -0,0 +1,260 @@
+"""
+Binary skill catalog snapshot file.
+
+Lets the service answer catalog and generation requests right after a cold
+start, before (or without) reaching Postgres. Written by
+export_catalog_snapshot.py or by the service after each catalog load, and
+read through mmap at startup.
+
+Layout (little-endian):
+
+    header   HEADER struct (magic, format version, catalog version, counts,
+             string table size, CRC-32 of everything after the header)
+    skills   skill_count x SKILL_RECORD
+             (id, name, code, levels etag, first level index, level count)
+    levels   level_count x LEVEL_RECORD
+             (level, description, autonomy, influence, complexity,
+              business skills, knowledge, behavioral indicators,
+              evidence examples)
+    strings  UTF-8 string table; records reference (offset, length) pairs,
+             identical strings are stored once, NULL is length 0xFFFFFFFF
+
+Fixed-size records make the tables addressable in place, and the stored
+per-skill etags mean loading does not re-hash the catalog.
+"""
+
+import os
+import mmap
+import tempfile
+import contextlib
+import time
+import struct
+import zlib
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.db.records import Skill, SkillLevel
+from .skill_catalog import CatalogSnapshot
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SKCATSNP"
+FORMAT_VERSION = 1
+
+# magic, format version, reserved, catalog version, created at (unix time),
+# total definitions, skill count, level count, string table size,
+# last updated at (string ref), CRC-32
+HEADER = struct.Struct("<8sHH32sdIIIIIII")
+SKILL_RECORD = struct.Struct("<10I")
+LEVEL_RECORD = struct.Struct("<HH16I")
+
+NULL_LENGTH = 0xFFFFFFFF
+
+
+class SnapshotFileError(ValueError):
+    """The snapshot file is missing, truncated, corrupted or of another format version."""
+
+
+class _StringTable:
+    """Deduplicating UTF-8 string table."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self._refs: Dict[str, Tuple[int, int]] = {}
+
+    def ref(self, value: Optional[str]) -> Tuple[int, int]:
+        if value is None:
+            return 0, NULL_LENGTH
+        value = str(value)
+        existing = self._refs.get(value)
+        if existing is not None:
+            return existing
+        data = value.encode("utf-8")
+        ref = (self.size, len(data))
+        self.chunks.append(data)
+        self.size += len(data)
+        self._refs[value] = ref
+        return ref
+
+
+def encode_snapshot(snapshot: CatalogSnapshot) -> bytes:
+    """
+    Serialize a catalog snapshot.
+
+    Args:
+        snapshot: Snapshot to serialize
+
+    Returns:
+        bytes: File contents
+    """
+    strings = _StringTable()
+    skill_records = []
+    level_records = []
+
+    for skill in snapshot.skills:
+        levels = snapshot.levels.get(skill.skill_id, [])
+        skill_records.append(SKILL_RECORD.pack(
+            *strings.ref(skill.skill_id),
+            *strings.ref(skill.skill_name),
+            *strings.ref(skill.skill_code),
+            *strings.ref(snapshot.level_etags.get(skill.skill_id)),
+            len(level_records),
+            len(levels)
+        ))
+        for level in levels:
+            refs = []
+            for value in level[1:]:
+                refs.extend(strings.ref(value))
+            level_records.append(LEVEL_RECORD.pack(int(level.level), 0, *refs))
+
+    last_updated = snapshot.last_updated_at.isoformat() if snapshot.last_updated_at else None
+    last_updated_ref = strings.ref(last_updated)
+
+    body = b"".join(skill_records) + b"".join(level_records) + b"".join(strings.chunks)
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        snapshot.version.encode("ascii"),
+        time.time(),
+        snapshot.total_definitions,
+        len(skill_records),
+        len(level_records),
+        strings.size,
+        *last_updated_ref,
+        zlib.crc32(body)
+    )
+    return header + body
+
+
+def write_snapshot_file(snapshot: CatalogSnapshot, path: str) -> int:
+    """
+    Write a snapshot file atomically (temp file + rename).
+
+    Returns:
+        int: File size in bytes
+    """
+    data = encode_snapshot(snapshot)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Unique temp file: workers autosaving the same path must not share it
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), 0o644)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    logger.info(f"Catalog snapshot written to {path} ({len(data)} bytes, version {snapshot.version})")
+    return len(data)
+
+
+def decode_snapshot(buffer) -> CatalogSnapshot:
+    """
+    Rebuild a catalog snapshot from snapshot file contents.
+
+    Args:
+        buffer: bytes, memoryview or mmap with the file contents
+
+    Returns:
+        CatalogSnapshot
+
+    Raises:
+        SnapshotFileError: If the data is not a valid snapshot
+    """
+    view = memoryview(buffer)
+    if len(view) < HEADER.size:
+        raise SnapshotFileError("snapshot file is truncated")
+
+    (magic, format_version, _, catalog_version, created_at, total_definitions,
+     skill_count, level_count, strings_size, last_updated_offset,
+     last_updated_length, crc) = HEADER.unpack_from(view)
+
+    if magic != MAGIC:
+        raise SnapshotFileError("not a catalog snapshot file")
+    if format_version != FORMAT_VERSION:
+        raise SnapshotFileError(f"unsupported snapshot format version {format_version} (expected {FORMAT_VERSION})")
+
+    skills_start = HEADER.size
+    levels_start = skills_start + skill_count * SKILL_RECORD.size
+    strings_start = levels_start + level_count * LEVEL_RECORD.size
+    end = strings_start + strings_size
+    if len(view) != end:
+        raise SnapshotFileError("snapshot file size does not match its header")
+    if zlib.crc32(view[skills_start:]) != crc:
+        raise SnapshotFileError("snapshot file checksum mismatch")
+
+    strings = view[strings_start:end]
+    decoded: Dict[int, str] = {}
+
+    def text(offset: int, length: int) -> Optional[str]:
+        if length == NULL_LENGTH:
+            return None
+        value = decoded.get(offset)
+        if value is None:
+            value = decoded[offset] = str(strings[offset:offset + length], "utf-8")
+        return value
+
+    level_rows = [
+        SkillLevel(
+            level,
+            *(text(refs[i], refs[i + 1]) for i in range(0, 16, 2))
+        )
+        for level, _, *refs in LEVEL_RECORD.iter_unpack(view[levels_start:strings_start])
+    ]
+
+    skills: List[Skill] = []
+    levels: Dict[str, List[SkillLevel]] = {}
+    level_etags: Dict[str, str] = {}
+    for record in SKILL_RECORD.iter_unpack(view[skills_start:levels_start]):
+        skill_id = text(record[0], record[1])
+        first, count = record[8], record[9]
+        skills.append(Skill(skill_id, text(record[2], record[3]), text(record[4], record[5]), count))
+        levels[skill_id] = level_rows[first:first + count]
+        etag = text(record[6], record[7])
+        if etag:
+            level_etags[skill_id] = etag
+
+    last_updated = text(last_updated_offset, last_updated_length)
+    snapshot = CatalogSnapshot(
+        skills,
+        levels,
+        total_definitions,
+        datetime.fromisoformat(last_updated) if last_updated else None,
+        level_etags,
+        source="file"
+    )
+    if snapshot.version != catalog_version.decode("ascii"):
+        raise SnapshotFileError("snapshot content does not match its recorded version")
+    return snapshot
+
+
+def read_snapshot_file(path: str) -> CatalogSnapshot:
+    """
+    Load a snapshot file through mmap.
+
+    Raises:
+        SnapshotFileError: If the file is missing or invalid
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                snapshot = decode_snapshot(mapped)
+    except (OSError, ValueError) as e:
+        if isinstance(e, SnapshotFileError):
+            raise
+        raise SnapshotFileError(f"cannot read catalog snapshot {path}: {e}") from e
+
+    logger.info(
+        f"Catalog snapshot loaded from {path}: {len(snapshot.skills)} skills, "
+        f"version {snapshot.version} in {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+    return snapshot
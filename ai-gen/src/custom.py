@@ -1,44 +1,8 @@
-import os
-import json
 import logging
-import psycopg2
-from psycopg2 import pool
 from contextlib import contextmanager
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# Database configuration - read from environment variable
-def get_db_config():
-    """Parse DB_CONNECT_STRING from environment or use defaults."""
-    db_connect_string = os.getenv("DB_CONNECT_STRING")
-    if db_connect_string:
-        try:
-            config = json.loads(db_connect_string)
-            return {
-                "host": config.get("ServerName", "localhost"),
-                "database": config.get("CatalogName", "MySkillList_NGE_DEV"),
-                "user": config.get("Username", "postgres"),
-                "password": config.get("Password", ""),
-                "port": config.get("Port", 5432)
-            }
-        except json.JSONDecodeError:
-            logging.error("Failed to parse DB_CONNECT_STRING")
-
-    # Fallback to defaults
-    return {
-        "host": os.getenv("DATABASE_HOST", "192.168.0.21"),
-        "database": os.getenv("DATABASE_NAME", "MySkillList_NGE_DEV"),
-        "user": os.getenv("DATABASE_USER", "postgres"),
-        "password": os.getenv("DATABASE_PASSWORD", "@ll1@nceP@ss2o21"),
-        "port": int(os.getenv("DATABASE_PORT", "5432"))
-    }
-
-DB_CONFIG = get_db_config()
-
-# Connection pool
-connection_pool = None
+from src.db.pool import get_pool, connection, read_connection
+from src.db.metrics import named_query
 
 # Logger setup
 LOGGER = logging.getLogger(__name__)
@@ -48,41 +12,36 @@ logging.basicConfig(
 )
 
 def init_connection_pool():
-    """Initialize the database connection pool."""
-    global connection_pool
-    if connection_pool is None:
-        try:
-            connection_pool = psycopg2.pool.SimpleConnectionPool(
-                minconn=1,
-                maxconn=1000,
-                **DB_CONFIG
-            )
-            LOGGER.info("Database connection pool initialized successfully")
-        except Exception as e:
-            LOGGER.error(f"Failed to initialize connection pool: {e}")
-            raise
+    """Initialize the shared database connection pool (src/db/pool.py)."""
+    return get_pool()
 
 @contextmanager
 def getConn():
     """Context manager for database connections."""
-    global connection_pool
-    if connection_pool is None:
-        init_connection_pool()
+    try:
+        with connection() as conn:
+            yield conn
+    except Exception as e:
+        LOGGER.error(f"Database connection error: {e}")
+        raise
 
-    conn = None
+@contextmanager
+def getReadConn():
+    """
+    Context manager for read-only queries.
+    Served by a read replica when one is configured and caught up, otherwise by the primary.
+    """
     try:
-        conn = connection_pool.getconn()
-        yield conn
+        with read_connection() as conn:
+            yield conn
     except Exception as e:
         LOGGER.error(f"Database connection error: {e}")
         raise
-    finally:
-        if conn:
-            connection_pool.putconn(conn)
 
+@named_query
 def getKeywordsTable(docTemplate: str):
     """Get keywords table for a document template from database."""
-    with getConn() as conn:
+    with getReadConn() as conn:
         with conn.cursor() as cur:
             cur.execute("""
                 SELECT "KeyWordsTable" FROM public."ConfigDocTemplate"
@@ -94,9 +53,10 @@ def getKeywordsTable(docTemplate: str):
             LOGGER.debug(f"Success get Keywords for Table of Document Template - {docTemplate} in DB.")
     return keywordsTable
 
+@named_query
 def getSkillData(skill_id: str = None):
     """Get skill data from database and format for input_skill_schema.json."""
-    with getConn() as conn:
+    with getReadConn() as conn:
         with conn.cursor() as cur:
             if skill_id:
                 # Get specific skill
@@ -174,9 +134,10 @@ def getSkillData(skill_id: str = None):
 
             return result
 
+@named_query
 def getAllSkillsList():
     """Get list of all available skills."""
-    with getConn() as conn:
+    with getReadConn() as conn:
         with conn.cursor() as cur:
             cur.execute("""
                 SELECT s."Id", s."Name", s."Code"
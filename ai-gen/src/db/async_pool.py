@@ -0,0 +1,200 @@
+"""
+Async PostgreSQL connection pool.
+Non-blocking counterpart of getConn() for use inside async FastAPI endpoints.
+Read replicas get one pool each, used through getAsyncReadConn().
+"""
+
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+
+from config.settings import (
+    DB_POOL_ACQUIRE_TIMEOUT,
+    DB_POOL_MAX_LIFETIME,
+    DB_POOL_MAX_IDLE,
+    DB_REPLICA_ACQUIRE_TIMEOUT,
+    DB_REPLICA_RETRY_AFTER
+)
+from src.db.db_config import DB_CONFIG, get_connect_kwargs, get_pool_size_limits
+from src.db.replicas import Replica, get_replica_set, REPLICA_LAG_SQL
+from src.db.metrics import TimedAsyncCursor, record_pool_wait, query_name
+
+LOGGER = logging.getLogger(__name__)
+
+# Global async pool (created on first use or at startup)
+_async_pool: Optional[AsyncConnectionPool] = None
+
+# Replica pools by replica name (created on first read)
+_async_replica_pools: Dict[str, AsyncConnectionPool] = {}
+
+
+def _build_conninfo() -> str:
+    """Build a libpq connection string from DB_CONFIG."""
+    return make_conninfo(**get_connect_kwargs(DB_CONFIG))
+
+
+async def init_async_pool() -> AsyncConnectionPool:
+    """Initialize and open the async connection pool."""
+    global _async_pool
+    if _async_pool is None:
+        min_size, max_size = get_pool_size_limits(DB_CONFIG)
+        pool = AsyncConnectionPool(
+            conninfo=_build_conninfo(),
+            min_size=min_size,
+            max_size=max_size,
+            kwargs={"autocommit": True, "cursor_factory": TimedAsyncCursor},
+            timeout=DB_POOL_ACQUIRE_TIMEOUT,
+            max_lifetime=DB_POOL_MAX_LIFETIME,
+            max_idle=DB_POOL_MAX_IDLE,
+            check=AsyncConnectionPool.check_connection,
+            name="ai-gen-async",
+            open=False
+        )
+        try:
+            await pool.open()
+        except Exception as e:
+            LOGGER.error(f"Failed to initialize async connection pool: {e}")
+            raise
+        _async_pool = pool
+        LOGGER.info(f"Async database connection pool initialized (min={min_size}, max={max_size})")
+    return _async_pool
+
+
+async def _get_async_replica_pool(replica: Replica) -> AsyncConnectionPool:
+    """Get the async pool of a read replica, creating it on first use."""
+    pool = _async_replica_pools.get(replica.name)
+    if pool is None:
+        _, max_size = get_pool_size_limits(replica.config)
+        # min_size=0: an unreachable replica never blocks startup
+        pool = AsyncConnectionPool(
+            conninfo=make_conninfo(**get_connect_kwargs(replica.config)),
+            min_size=0,
+            max_size=max_size,
+            kwargs={
+                "autocommit": True,
+                "cursor_factory": TimedAsyncCursor,
+                "connect_timeout": max(int(DB_REPLICA_ACQUIRE_TIMEOUT), 1)
+            },
+            timeout=DB_REPLICA_ACQUIRE_TIMEOUT,
+            max_lifetime=DB_POOL_MAX_LIFETIME,
+            max_idle=DB_POOL_MAX_IDLE,
+            check=AsyncConnectionPool.check_connection,
+            reconnect_timeout=DB_REPLICA_RETRY_AFTER,
+            name=f"ai-gen-async-{replica.name}",
+            open=False
+        )
+        existing = _async_replica_pools.setdefault(replica.name, pool)
+        if existing is pool:
+            await pool.open()
+            LOGGER.info(f"Async replica connection pool initialized for {replica.name} (max={max_size})")
+        pool = existing
+    return pool
+
+
+async def close_async_pool():
+    """Close the async connection pool and the replica pools (called on application shutdown)."""
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+        LOGGER.info("Async database connection pool closed")
+    for pool in list(_async_replica_pools.values()):
+        await pool.close()
+    _async_replica_pools.clear()
+
+
+def get_async_pool_stats() -> Optional[Dict[str, Any]]:
+    """Statistics of the async pool, or None if it has not been created."""
+    if _async_pool is None:
+        return None
+    stats = _async_pool.get_stats()
+    stats["in_use"] = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+    stats["idle"] = stats.get("pool_available", 0)
+    return stats
+
+
+@asynccontextmanager
+async def getAsyncConn():
+    """Async context manager for database connections."""
+    pool = await init_async_pool()
+    start = time.perf_counter()
+    try:
+        async with pool.connection() as conn:
+            record_pool_wait("async", (time.perf_counter() - start) * 1000)
+            yield conn
+    except Exception as e:
+        LOGGER.error(f"Database connection error: {e}")
+        raise
+
+
+async def _acquire_async_replica_conn():
+    """
+    Borrow a connection from the first usable replica.
+
+    Returns:
+        tuple: (pool, conn), or (None, None) if reads must go to the primary
+    """
+    replica_set = get_replica_set()
+    for replica in replica_set.candidates():
+        pool = await _get_async_replica_pool(replica)
+        connect_errors = pool.get_stats().get("connections_errors", 0)
+        start = time.perf_counter()
+        try:
+            conn = await pool.getconn()
+            record_pool_wait(f"async:{replica.name}", (time.perf_counter() - start) * 1000)
+        except PoolTimeout as e:
+            # Failed connection attempts while waiting: the replica is unreachable
+            if pool.get_stats().get("connections_errors", 0) > connect_errors:
+                replica.mark_down(e)
+            else:
+                LOGGER.warning(f"Replica {replica.name} pool exhausted, trying next")
+            continue
+        except Exception as e:
+            replica.mark_down(e)
+            continue
+
+        if replica.needs_lag_check():
+            try:
+                with query_name("replicaLag"):
+                    cur = await conn.execute(REPLICA_LAG_SQL)
+                lag = (await cur.fetchone())[0]
+            except Exception as e:
+                await pool.putconn(conn)
+                replica.mark_down(e)
+                continue
+            if not replica.record_lag(lag):
+                await pool.putconn(conn)
+                continue
+
+        replica.reads += 1
+        return pool, conn
+
+    replica_set.record_fallback()
+    return None, None
+
+
+@asynccontextmanager
+async def getAsyncReadConn():
+    """
+    Async context manager for read-only queries.
+
+    Uses a reachable replica whose replay lag is within DB_REPLICA_MAX_LAG and
+    falls back to the primary pool otherwise (or when no replicas are configured).
+    """
+    pool, conn = await _acquire_async_replica_conn()
+    if conn is None:
+        async with getAsyncConn() as conn:
+            yield conn
+        return
+    try:
+        async with conn:
+            yield conn
+    except Exception as e:
+        LOGGER.error(f"Database connection error: {e}")
+        raise
+    finally:
+        await pool.putconn(conn)
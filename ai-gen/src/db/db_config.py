@@ -0,0 +1,140 @@
+"""
+Database configuration shared by the sync and async connection pools.
+Parses DB_CONNECT_STRING once and derives bounded pool sizes.
+
+Read replicas are listed under "Replicas", either as objects with the same
+keys as the primary (missing keys are inherited from it) or as libpq DSN /
+URI strings:
+
+    {"ServerName": "db-primary", ..., "Replicas": [
+        {"ServerName": "db-replica-1"},
+        "host=db-replica-2 port=5433"
+    ]}
+"""
+
+import os
+import json
+import logging
+from typing import Dict, Any, List
+
+from psycopg.conninfo import conninfo_to_dict
+
+from config.settings import (
+    DB_CONNECT_STRING,
+    DB_MAX_CONNECTIONS,
+    WEB_CONCURRENCY,
+    DB_POOL_MIN_SIZE,
+    DB_STATEMENT_TIMEOUT_MS
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# Each worker process holds one sync pool and one async pool
+POOLS_PER_PROCESS = 2
+
+
+def parse_replica_config(entry, primary: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize one "Replicas" entry to the get_db_config() shape.
+
+    Args:
+        entry: Object with DB_CONNECT_STRING keys, or a libpq DSN / URI string
+        primary: Parsed primary config supplying defaults
+
+    Returns:
+        dict: Replica config (no nested replicas)
+    """
+    if isinstance(entry, str):
+        dsn = conninfo_to_dict(entry)
+        entry = {
+            "ServerName": dsn.get("host"),
+            "CatalogName": dsn.get("dbname"),
+            "Username": dsn.get("user"),
+            "Password": dsn.get("password"),
+            "Port": dsn.get("port")
+        }
+    if not isinstance(entry, dict) or not entry.get("ServerName"):
+        raise ValueError(f"Invalid replica entry: {entry!r}")
+
+    return {
+        "host": entry["ServerName"],
+        "database": entry.get("CatalogName") or primary["database"],
+        "user": entry.get("Username") or primary["user"],
+        "password": entry.get("Password") if entry.get("Password") is not None else primary["password"],
+        "port": int(entry.get("Port") or primary["port"]),
+        "max_pool_size": entry.get("MaxPoolSize") or primary["max_pool_size"],
+        "replicas": []
+    }
+
+
+def get_db_config() -> Dict[str, Any]:
+    """Parse DB_CONNECT_STRING from environment or use defaults."""
+    if DB_CONNECT_STRING:
+        try:
+            config = json.loads(DB_CONNECT_STRING)
+            primary = {
+                "host": config.get("ServerName", "localhost"),
+                "database": config.get("CatalogName", "MySkillList_NGE_DEV"),
+                "user": config.get("Username", "postgres"),
+                "password": config.get("Password", ""),
+                "port": config.get("Port", 5432),
+                "max_pool_size": config.get("MaxPoolSize")
+            }
+            replicas: List[Dict[str, Any]] = []
+            for entry in config.get("Replicas") or []:
+                try:
+                    replicas.append(parse_replica_config(entry, primary))
+                except ValueError as e:
+                    LOGGER.error(f"Ignoring replica in DB_CONNECT_STRING: {e}")
+            primary["replicas"] = replicas
+            return primary
+        except json.JSONDecodeError:
+            LOGGER.error("Failed to parse DB_CONNECT_STRING")
+
+    # Fallback to defaults
+    return {
+        "host": os.getenv("DATABASE_HOST", "192.168.0.21"),
+        "database": os.getenv("DATABASE_NAME", "MySkillList_NGE_DEV"),
+        "user": os.getenv("DATABASE_USER", "postgres"),
+        "password": os.getenv("DATABASE_PASSWORD", "@ll1@nceP@ss2o21"),
+        "port": int(os.getenv("DATABASE_PORT", "5432")),
+        "max_pool_size": None,
+        "replicas": []
+    }
+
+
+def get_connect_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Build libpq connection keyword arguments (incl. statement timeout)."""
+    kwargs = {
+        "host": config["host"],
+        "dbname": config["database"],
+        "user": config["user"],
+        "password": config["password"],
+        "port": config.get("port", 5432),
+        "application_name": "ai-gen"
+    }
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        kwargs["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return kwargs
+
+
+def get_pool_size_limits(config: Dict[str, Any]) -> tuple[int, int]:
+    """
+    Derive (min_size, max_size) for a single pool.
+
+    The service-wide DB_MAX_CONNECTIONS budget is divided by the number of
+    worker processes and pools per process. MaxPoolSize from
+    DB_CONNECT_STRING, when present, acts as an upper bound.
+
+    Returns:
+        tuple: (min_size, max_size)
+    """
+    workers = max(WEB_CONCURRENCY, 1)
+    max_size = max(DB_MAX_CONNECTIONS // (workers * POOLS_PER_PROCESS), 1)
+    if config.get("max_pool_size"):
+        max_size = min(max_size, int(config["max_pool_size"]))
+    min_size = min(max(DB_POOL_MIN_SIZE, 0), max_size)
+    return min_size, max_size
+
+
+DB_CONFIG = get_db_config()
@@ -0,0 +1,265 @@
+"""
+Database query instrumentation.
+Times every query issued through the sync and async pools, tags it with a
+query name, keeps per-name latency histograms (plus pool acquire waits) and
+logs queries slower than DB_SLOW_QUERY_MS with the shape of their parameters.
+"""
+
+import re
+import time
+import inspect
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+
+import psycopg
+import psycopg2.extensions
+
+from config.settings import DB_SLOW_QUERY_MS
+
+LOGGER = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current_query_name: ContextVar[Optional[str]] = ContextVar("db_query_name", default=None)
+
+_TABLE_RE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+(?:\w+\.)?"?(\w+)"?', re.IGNORECASE)
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with count / sum / max."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float, error: bool = False):
+        index = 0
+        while index < len(LATENCY_BUCKETS_MS) and elapsed_ms > LATENCY_BUCKETS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile (max for the +Inf bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 2)
+        return round(self.max_ms, 2)
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, n in zip(list(LATENCY_BUCKETS_MS) + ["+Inf"], self.buckets):
+            cumulative += n
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 2),
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets_ms": buckets
+        }
+
+
+class LatencyRegistry:
+    """Thread-safe set of named latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def observe(self, name: str, elapsed_ms: float, error: bool = False):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.observe(elapsed_ms, error)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+QUERY_LATENCY = LatencyRegistry()
+POOL_WAIT = LatencyRegistry()
+
+
+def params_shape(params) -> Any:
+    """
+    Describe query parameters without their values, e.g.
+    ('str(36)', 'list[200]') or {'level': 'int'}.
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _value_shape(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return tuple(_value_shape(value) for value in params)
+    return _value_shape(params)
+
+
+def _value_shape(value) -> str:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    return type(value).__name__
+
+
+def infer_query_name(query) -> str:
+    """Fallback tag for untagged queries, e.g. 'SELECT SkillLevelDefinitions'."""
+    if not isinstance(query, str):
+        return "query"
+    words = query.split(None, 1)
+    verb = words[0].upper() if words else "query"
+    match = _TABLE_RE.search(query)
+    return f"{verb} {match.group(1)}" if match else verb
+
+
+def record_query(query, params, elapsed_ms: float, error: bool = False, rowcount: Optional[int] = None):
+    """Record one executed query and log it if it was slow."""
+    name = _current_query_name.get() or infer_query_name(query)
+    QUERY_LATENCY.observe(name, elapsed_ms, error)
+    if DB_SLOW_QUERY_MS > 0 and elapsed_ms >= DB_SLOW_QUERY_MS:
+        LOGGER.warning(
+            f"Slow query {name}: {elapsed_ms:.1f} ms "
+            f"(params={params_shape(params)}, rows={rowcount}, error={error})"
+        )
+
+
+def record_pool_wait(pool_name: str, elapsed_ms: float):
+    """Record the time spent waiting for a pooled connection."""
+    POOL_WAIT.observe(pool_name, elapsed_ms)
+
+
+@contextmanager
+def query_name(name: str):
+    """Tag the queries executed inside the block with `name`."""
+    token = _current_query_name.set(name)
+    try:
+        yield
+    finally:
+        _current_query_name.reset(token)
+
+
+def named_query(func):
+    """Decorator tagging the queries of a (sync or async) reader function with its name."""
+    name = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with query_name(name):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with query_name(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def get_db_metrics() -> Dict[str, Any]:
+    """Query latency and pool wait histograms."""
+    return {
+        "slow_query_threshold_ms": DB_SLOW_QUERY_MS,
+        "queries": QUERY_LATENCY.snapshot(),
+        "pool_wait": POOL_WAIT.snapshot()
+    }
+
+
+# psycopg2 (sync pool)
+
+class TimedCursorMixin:
+    """Times execute()/executemany() of a psycopg2 cursor class."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        error = False
+        try:
+            return super().execute(query, vars)
+        except Exception:
+            error = True
+            raise
+        finally:
+            record_query(query, vars, (time.perf_counter() - start) * 1000, error, self.rowcount)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        error = False
+        try:
+            return super().executemany(query, vars_list)
+        except Exception:
+            error = True
+            raise
+        finally:
+            record_query(query, None, (time.perf_counter() - start) * 1000, error, self.rowcount)
+
+
+_timed_cursor_classes: Dict[type, type] = {}
+
+
+def timed_cursor_class(cursor_class: type) -> type:
+    """Timed subclass of a psycopg2 cursor class (cached)."""
+    if issubclass(cursor_class, TimedCursorMixin):
+        return cursor_class
+    timed = _timed_cursor_classes.get(cursor_class)
+    if timed is None:
+        timed = type(f"Timed{cursor_class.__name__}", (TimedCursorMixin, cursor_class), {})
+        _timed_cursor_classes[cursor_class] = timed
+    return timed
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection whose cursors are timed, whatever cursor_factory the
+    caller picks (e.g. RealDictCursor in postgres_conn.py).
+    """
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = timed_cursor_class(factory)
+        return super().cursor(*args, **kwargs)
+
+
+# psycopg 3 (async pool)
+
+class TimedAsyncCursor(psycopg.AsyncCursor):
+    """Async cursor timing execute()."""
+
+    async def execute(self, query, params=None, **kwargs):
+        start = time.perf_counter()
+        error = False
+        try:
+            return await super().execute(query, params, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            record_query(query, params, (time.perf_counter() - start) * 1000, error, self.rowcount)
@@ -0,0 +1,411 @@
+"""
+Thread-safe PostgreSQL connection pool.
+Single pool behind getConn() (src/custom.py) and DBConnection
+(src/db/postgres_conn.py), with bounded size, acquire timeouts,
+connection health checks/recycling and live statistics. Read replicas get
+one pool each, used through read_connection().
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError
+
+from config.settings import (
+    DB_POOL_ACQUIRE_TIMEOUT,
+    DB_POOL_MAX_LIFETIME,
+    DB_POOL_MAX_IDLE,
+    DB_POOL_HEALTH_CHECK_AFTER,
+    DB_REPLICA_ACQUIRE_TIMEOUT
+)
+from src.db.db_config import DB_CONFIG, get_connect_kwargs, get_pool_size_limits
+from src.db.replicas import Replica, get_replica_set, REPLICA_LAG_SQL
+from src.db.metrics import InstrumentedConnection, record_pool_wait, query_name
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PoolTimeout(PoolError):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class _PooledConn:
+    """Bookkeeping for a pooled connection."""
+
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe psycopg2 connection pool.
+
+    Connections are checked on checkout: closed, expired (max_lifetime) or
+    long-idle (max_idle) connections are discarded, and connections idle for
+    longer than health_check_after are pinged before being handed out.
+    """
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        acquire_timeout: float = DB_POOL_ACQUIRE_TIMEOUT,
+        max_lifetime: float = DB_POOL_MAX_LIFETIME,
+        max_idle: float = DB_POOL_MAX_IDLE,
+        health_check_after: float = DB_POOL_HEALTH_CHECK_AFTER,
+        name: str = "sync",
+        **connect_kwargs
+    ):
+        self.name = name
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.acquire_timeout = acquire_timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self._connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition()
+        self._idle: deque = deque()
+        self._in_use: Dict[int, _PooledConn] = {}
+        self._opened = 0          # connections open or being opened
+        self._waiting = 0
+        self._closed = False
+
+        # Statistics
+        self._stats = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "connections_recycled": 0,
+            "health_check_failures": 0,
+            "acquired": 0,
+            "acquire_timeouts": 0,
+            "wait_count": 0,
+            "wait_time_total_ms": 0.0,
+            "wait_time_max_ms": 0.0
+        }
+
+        for _ in range(minconn):
+            with self._cond:
+                self._opened += 1
+            try:
+                self._idle.append(self._connect())
+            except Exception:
+                with self._cond:
+                    self._opened -= 1
+                raise
+
+    def _connect(self) -> _PooledConn:
+        conn = psycopg2.connect(connection_factory=InstrumentedConnection, **self._connect_kwargs)
+        with self._cond:
+            self._stats["connections_opened"] += 1
+        return _PooledConn(conn)
+
+    def _discard(self, entry: _PooledConn, reason: str):
+        """Close a connection and free its slot. Caller must NOT hold the lock."""
+        try:
+            if not entry.conn.closed:
+                entry.conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._opened -= 1
+            self._stats["connections_closed"] += 1
+            if reason == "recycled":
+                self._stats["connections_recycled"] += 1
+            self._cond.notify()
+        LOGGER.debug(f"Discarded pooled connection ({reason})")
+
+    def _is_usable(self, entry: _PooledConn) -> bool:
+        """Check a connection before handing it out."""
+        now = time.monotonic()
+        if entry.conn.closed:
+            self._discard(entry, "closed")
+            return False
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            self._discard(entry, "recycled")
+            return False
+        if self.max_idle and now - entry.last_used > self.max_idle:
+            self._discard(entry, "recycled")
+            return False
+        if self.health_check_after and now - entry.last_used > self.health_check_after:
+            try:
+                with entry.conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                entry.conn.rollback()
+            except Exception as e:
+                LOGGER.warning(f"Pooled connection failed health check: {e}")
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                self._discard(entry, "unhealthy")
+                return False
+        return True
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        Get a connection from the pool, waiting up to `timeout` seconds.
+
+        Raises:
+            PoolTimeout: If no connection is available in time
+            PoolError: If the pool is closed
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            entry = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("connection pool is closed")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._opened < self.maxconn:
+                        self._opened += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["acquire_timeouts"] += 1
+                        raise PoolTimeout(
+                            f"Timed out after {timeout:.1f}s waiting for a DB connection "
+                            f"(pool max size {self.maxconn})"
+                        )
+                    waited = True
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            if create:
+                try:
+                    entry = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._opened -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_usable(entry):
+                continue
+
+            wait_ms = (time.monotonic() - start) * 1000
+            record_pool_wait(self.name, wait_ms)
+            with self._cond:
+                self._in_use[id(entry.conn)] = entry
+                self._stats["acquired"] += 1
+                if waited:
+                    self._stats["wait_count"] += 1
+                    self._stats["wait_time_total_ms"] += wait_ms
+                    self._stats["wait_time_max_ms"] = max(self._stats["wait_time_max_ms"], wait_ms)
+            return entry.conn
+
+    def putconn(self, conn, close: bool = False):
+        """Return a connection to the pool, resetting its session state."""
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            raise PoolError("trying to put unkeyed connection")
+
+        if not close and not conn.closed:
+            try:
+                status = conn.info.transaction_status
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    close = True
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if not close:
+                    conn.autocommit = False
+                    conn.cursor_factory = psycopg2.extensions.cursor
+            except Exception as e:
+                LOGGER.warning(f"Failed to reset pooled connection: {e}")
+                close = True
+
+        if close or conn.closed or self._closed:
+            self._discard(entry, "closed")
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def closeall(self):
+        """Close all idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry, "closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return a snapshot of live pool statistics."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "pool_min": self.minconn,
+                "pool_max": self.maxconn,
+                "pool_size": self._opened,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "requests_waiting": self._waiting
+            })
+        stats["wait_time_avg_ms"] = (
+            round(stats["wait_time_total_ms"] / stats["wait_count"], 2) if stats["wait_count"] else 0.0
+        )
+        stats["wait_time_total_ms"] = round(stats["wait_time_total_ms"], 2)
+        stats["wait_time_max_ms"] = round(stats["wait_time_max_ms"], 2)
+        return stats
+
+
+# Global pool (created once per process)
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# Replica pools by replica name (created on first read)
+_replica_pools: Dict[str, ConnectionPool] = {}
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                min_size, max_size = get_pool_size_limits(DB_CONFIG)
+                try:
+                    _pool = ConnectionPool(
+                        minconn=min_size,
+                        maxconn=max_size,
+                        **get_connect_kwargs(DB_CONFIG)
+                    )
+                    LOGGER.info(f"Database connection pool initialized (min={min_size}, max={max_size})")
+                except Exception as e:
+                    LOGGER.error(f"Failed to initialize connection pool: {e}")
+                    raise
+    return _pool
+
+
+def get_replica_pool(replica: Replica) -> ConnectionPool:
+    """Get the pool of a read replica, creating it on first use."""
+    pool = _replica_pools.get(replica.name)
+    if pool is None:
+        with _pool_lock:
+            pool = _replica_pools.get(replica.name)
+            if pool is None:
+                _, max_size = get_pool_size_limits(replica.config)
+                # Opened lazily so an unreachable replica never blocks startup
+                pool = ConnectionPool(
+                    minconn=0,
+                    maxconn=max_size,
+                    connect_timeout=max(int(DB_REPLICA_ACQUIRE_TIMEOUT), 1),
+                    name=f"sync:{replica.name}",
+                    **get_connect_kwargs(replica.config)
+                )
+                _replica_pools[replica.name] = pool
+                LOGGER.info(f"Replica connection pool initialized for {replica.name} (max={max_size})")
+    return pool
+
+
+def close_pool():
+    """Close the process-wide pool and the replica pools."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            LOGGER.info("Database connection pool closed")
+        for pool in _replica_pools.values():
+            pool.closeall()
+        _replica_pools.clear()
+
+
+def get_pool_stats() -> Optional[Dict[str, Any]]:
+    """Statistics of the sync pool, or None if it has not been created."""
+    return _pool.get_stats() if _pool is not None else None
+
+
+@contextmanager
+def connection(timeout: Optional[float] = None):
+    """Context manager that borrows a connection from the pool."""
+    pool = get_pool()
+    conn = pool.getconn(timeout)
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def _acquire_replica_conn():
+    """
+    Borrow a connection from the first usable replica.
+
+    Returns:
+        tuple: (pool, conn), or (None, None) if reads must go to the primary
+    """
+    replica_set = get_replica_set()
+    for replica in replica_set.candidates():
+        pool = get_replica_pool(replica)
+        try:
+            conn = pool.getconn(DB_REPLICA_ACQUIRE_TIMEOUT)
+        except PoolTimeout:
+            LOGGER.warning(f"Replica {replica.name} pool exhausted, trying next")
+            continue
+        except Exception as e:
+            replica.mark_down(e)
+            continue
+
+        if replica.needs_lag_check():
+            try:
+                with conn.cursor() as cur, query_name("replicaLag"):
+                    cur.execute(REPLICA_LAG_SQL)
+                    lag = cur.fetchone()[0]
+                conn.rollback()
+            except Exception as e:
+                pool.putconn(conn, close=True)
+                replica.mark_down(e)
+                continue
+            if not replica.record_lag(lag):
+                pool.putconn(conn)
+                continue
+
+        replica.reads += 1
+        return pool, conn
+
+    replica_set.record_fallback()
+    return None, None
+
+
+@contextmanager
+def read_connection(timeout: Optional[float] = None):
+    """
+    Context manager that borrows a connection for read-only queries.
+
+    Uses a reachable replica whose replay lag is within DB_REPLICA_MAX_LAG and
+    falls back to the primary pool otherwise (or when no replicas are configured).
+    """
+    pool, conn = _acquire_replica_conn()
+    if conn is None:
+        with connection(timeout) as conn:
+            yield conn
+        return
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
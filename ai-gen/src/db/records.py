@@ -0,0 +1,63 @@
+"""
+Compact record types for skill catalog rows.
+
+Records are NamedTuples: no per-instance __dict__, the same footprint as the
+plain cursor tuples they replace, and still indexable by position so existing
+`row[0]` style code keeps working. Building one from a row only copies
+references, never the column values themselves.
+"""
+
+import json
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+
+def dump_json(value: Any) -> bytes:
+    """Serialize the way Starlette's JSONResponse does."""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class Skill(NamedTuple):
+    """A skill with its number of level definitions (DISTINCT_SKILLS_WITH_LEVELS_SQL shape)."""
+    skill_id: str
+    skill_name: str
+    skill_code: Optional[str]
+    level_count: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public representation used by /api/v2/skills."""
+        return {
+            "skill_id": str(self.skill_id),
+            "skill_name": self.skill_name,
+            "skill_code": self.skill_code,
+            "level_count": self.level_count
+        }
+
+
+class SkillLevel(NamedTuple):
+    """One SFIA level definition (SKILL_LEVELS_BY_SKILL_ID_SQL shape)."""
+    level: int
+    description: Optional[str]
+    autonomy: Optional[str]
+    influence: Optional[str]
+    complexity: Optional[str]
+    business_skills: Optional[str]
+    knowledge: Optional[str]
+    behavioral_indicators: Optional[str]
+    evidence_examples: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public representation used by the skill level endpoints."""
+        return {
+            "level": self.level,
+            "description": self.description,
+            "autonomy": self.autonomy,
+            "influence": self.influence,
+            "complexity": self.complexity,
+            "business_skills": self.business_skills,
+            "knowledge": self.knowledge
+        }
+
+
+def skill_levels_json(levels: Iterable[SkillLevel]) -> bytes:
+    """Serialized list of SkillLevel.to_dict() entries."""
+    return dump_json([level.to_dict() for level in levels])
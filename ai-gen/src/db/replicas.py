@@ -0,0 +1,150 @@
+"""
+Read-replica routing.
+Tracks the health and replay lag of the replicas configured in
+DB_CONNECT_STRING so read-only queries can be sent to them instead of the
+primary. Shared by the sync (pool.py) and async (async_pool.py) pools.
+"""
+
+import time
+import logging
+import itertools
+from typing import Dict, Any, List, Optional
+
+from config.settings import (
+    DB_REPLICA_MAX_LAG,
+    DB_REPLICA_LAG_CHECK_INTERVAL,
+    DB_REPLICA_RETRY_AFTER
+)
+from src.db.db_config import DB_CONFIG
+
+LOGGER = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary. A replica that has replayed
+# everything it received reports 0 even when the primary has been idle (in
+# which case pg_last_xact_replay_timestamp() would be old); a server that is
+# not in recovery reports 0. NULL means behind by an unknown amount (nothing
+# replayed since the replica started).
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END::float8
+"""
+
+
+class Replica:
+    """Routing state of one read replica."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.name = f"{config['host']}:{config['port']}"
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+        self.down_until = 0.0
+        self.last_error: Optional[str] = None
+        self.reads = 0
+        self.failures = 0
+        self.lag_rejections = 0
+
+    def needs_lag_check(self, now: Optional[float] = None) -> bool:
+        """True when the last lag reading is older than the check interval."""
+        now = time.monotonic() if now is None else now
+        return now - self.checked_at >= DB_REPLICA_LAG_CHECK_INTERVAL
+
+    def is_candidate(self, now: Optional[float] = None) -> bool:
+        """
+        Whether reads may be attempted on this replica.
+        A replica with a stale lag reading is a candidate; the caller re-checks
+        its lag on the borrowed connection before using it.
+        """
+        now = time.monotonic() if now is None else now
+        if now < self.down_until:
+            return False
+        if self.needs_lag_check(now):
+            return True
+        return self.lag is not None and self.lag <= DB_REPLICA_MAX_LAG
+
+    def record_lag(self, lag: Optional[float]) -> bool:
+        """Store a lag reading (None = unknown); returns True if the replica is fresh enough."""
+        self.lag = lag
+        self.checked_at = time.monotonic()
+        self.down_until = 0.0
+        self.last_error = None
+        if lag is None or lag > DB_REPLICA_MAX_LAG:
+            self.lag_rejections += 1
+            behind = f"{lag:.1f}s" if lag is not None else "an unknown amount"
+            LOGGER.warning(f"Replica {self.name} is {behind} behind, reading from primary")
+            return False
+        return True
+
+    def mark_down(self, error: Exception):
+        """Skip this replica for DB_REPLICA_RETRY_AFTER seconds."""
+        self.failures += 1
+        self.last_error = str(error)
+        self.down_until = time.monotonic() + DB_REPLICA_RETRY_AFTER
+        LOGGER.error(f"Replica {self.name} unavailable, retrying in {DB_REPLICA_RETRY_AFTER:.0f}s: {error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "name": self.name,
+            "available": self.is_candidate(now),
+            "lag_seconds": round(self.lag, 3) if self.lag is not None else None,
+            "lag_checked_seconds_ago": round(now - self.checked_at, 1) if self.checked_at else None,
+            "reads": self.reads,
+            "failures": self.failures,
+            "lag_rejections": self.lag_rejections,
+            "last_error": self.last_error
+        }
+
+
+class ReplicaSet:
+    """Round-robin selection over the configured replicas."""
+
+    def __init__(self, configs: List[Dict[str, Any]]):
+        self.replicas = [Replica(config) for config in configs]
+        self._counter = itertools.count()
+        self.primary_fallbacks = 0
+
+    def candidates(self) -> List[Replica]:
+        """Replicas to try for the next read, in round-robin order."""
+        if not self.replicas:
+            return []
+        now = time.monotonic()
+        start = next(self._counter) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.is_candidate(now)]
+
+    def record_fallback(self):
+        """Count a read that went to the primary although replicas are configured."""
+        if self.replicas:
+            self.primary_fallbacks += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_lag_seconds": DB_REPLICA_MAX_LAG,
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [replica.get_stats() for replica in self.replicas]
+        }
+
+
+# Process-wide replica set built from DB_CONNECT_STRING
+_replica_set: Optional[ReplicaSet] = None
+
+
+def get_replica_set() -> ReplicaSet:
+    """Get the process-wide replica set."""
+    global _replica_set
+    if _replica_set is None:
+        _replica_set = ReplicaSet(DB_CONFIG.get("replicas", []))
+        if _replica_set.replicas:
+            names = ", ".join(replica.name for replica in _replica_set.replicas)
+            LOGGER.info(f"Read replicas configured: {names}")
+    return _replica_set
+
+
+def get_replica_stats() -> Optional[Dict[str, Any]]:
+    """Replica routing statistics, or None if no replicas are configured."""
+    replica_set = get_replica_set()
+    return replica_set.get_stats() if replica_set.replicas else None
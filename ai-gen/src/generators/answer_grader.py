@@ -4,26 +4,51 @@ Grades student answers using Azure OpenAI based on rubric and expected answer
 """
 
 import json
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-from openai import AsyncOpenAI
+from typing import Dict, Any, List, Optional
 
-from config.settings import OPENAI_API_KEY, OPENAI_BASE_URL, LLM_MODEL
+from config.settings import LLM_MODEL, GRADING_BATCH_CONCURRENCY, GRADING_BATCH_TIMEOUT
+from .llm_gateway import chat_completion
+from .token_planner import get_token_planner
+from .grading_cache import get_grading_cache, grading_cache_key
 
 logger = logging.getLogger(__name__)
 
-# Azure OpenAI client (lazy-loaded)
-_client = None
 
-def get_client():
-    """Get or create Azure OpenAI client."""
-    global _client
-    if _client is None:
-        _client = AsyncOpenAI(
-            api_key=OPENAI_API_KEY,
-            base_url=OPENAI_BASE_URL
-        )
-    return _client
+# Grading instructions and output schema shared by every answer; sent
+# unchanged as the system message so it forms a cacheable prompt prefix
+GRADING_SYSTEM_PROMPT = """You are an expert assessment grader. You evaluate student answers objectively and fairly and provide constructive feedback. Always return valid JSON.
+
+The user message gives the QUESTION, the STUDENT'S ANSWER, optionally an EXPECTED/MODEL ANSWER and grading criteria, the MAXIMUM POINTS and the RESPONSE LANGUAGE.
+
+GRADING INSTRUCTIONS:
+1. Evaluate the student's answer against the criteria/expected answer
+2. Be fair but rigorous - partial credit is allowed
+3. Consider both correctness and completeness
+4. For coding questions, evaluate logic even if syntax has minor issues
+5. Provide constructive feedback in the response language
+
+OUTPUT REQUIREMENTS:
+Return ONLY valid JSON matching this exact schema (no markdown, no explanations):
+
+{
+  "points_awarded": <number between 0 and MAXIMUM POINTS>,
+  "max_points": <MAXIMUM POINTS>,
+  "percentage": <calculated percentage>,
+  "feedback": "Brief overall feedback in the response language",
+  "strength_points": ["What the student did well", "Another strength"],
+  "improvement_areas": ["What could be improved", "Another area"],
+  "detailed_analysis": "Detailed explanation of the grading decision in the response language"
+}
+
+IMPORTANT:
+- points_awarded must be between 0 and MAXIMUM POINTS
+- percentage = (points_awarded / max_points) * 100
+- Be specific in feedback - reference parts of the student's answer
+- strength_points and improvement_areas should have 1-3 items each
+- Return ONLY the JSON, no markdown blocks
+"""
 
 
 def build_grading_prompt(
@@ -36,7 +61,8 @@ def build_grading_prompt(
     language: str = "en"
 ) -> str:
     """
-    Build prompt for grading student answer.
+    Build the answer-specific grading prompt (the user message; instructions
+    are in GRADING_SYSTEM_PROMPT).
 
     Args:
         question_content: The question text
@@ -81,9 +107,7 @@ EXPECTED/MODEL ANSWER:
 {expected_answer}
 """
 
-    prompt = f"""You are an expert assessment grader. Grade the student's answer objectively and fairly.
-
-QUESTION:
+    prompt = f"""QUESTION:
 {question_content}
 
 STUDENT'S ANSWER:
@@ -94,33 +118,7 @@ STUDENT'S ANSWER:
 {rubric_text}
 
 MAXIMUM POINTS: {max_points}
-
-GRADING INSTRUCTIONS:
-1. Evaluate the student's answer against the criteria/expected answer
-2. Be fair but rigorous - partial credit is allowed
-3. Consider both correctness and completeness
-4. For coding questions, evaluate logic even if syntax has minor issues
-5. Provide constructive feedback in {lang_name}
-
-OUTPUT REQUIREMENTS:
-Return ONLY valid JSON matching this exact schema (no markdown, no explanations):
-
-{{
-  "points_awarded": <number between 0 and {max_points}>,
-  "max_points": {max_points},
-  "percentage": <calculated percentage>,
-  "feedback": "Brief overall feedback in {lang_name}",
-  "strength_points": ["What the student did well", "Another strength"],
-  "improvement_areas": ["What could be improved", "Another area"],
-  "detailed_analysis": "Detailed explanation of the grading decision in {lang_name}"
-}}
-
-IMPORTANT:
-- points_awarded must be between 0 and {max_points}
-- percentage = (points_awarded / max_points) * 100
-- Be specific in feedback - reference parts of the student's answer
-- strength_points and improvement_areas should have 1-3 items each
-- Return ONLY the JSON, no markdown blocks
+RESPONSE LANGUAGE: {lang_name}
 """
 
     return prompt
@@ -137,6 +135,8 @@ async def grade_answer(
 ) -> Dict[str, Any]:
     """
     Grade a student's answer using Azure OpenAI.
+    Results are cached by normalized content (see grading_cache.py), so
+    repeated answers get the same score without another LLM call.
 
     Args:
         question_content: The question text
@@ -167,6 +167,39 @@ async def grade_answer(
             "detailed_analysis": None
         }
 
+    key = grading_cache_key(
+        question_content=question_content,
+        student_answer=student_answer,
+        max_points=max_points,
+        grading_rubric=grading_rubric,
+        expected_answer=expected_answer,
+        question_type=question_type,
+        language=language
+    )
+    return await get_grading_cache().get_or_grade(
+        key,
+        lambda: _grade_with_llm(
+            question_content=question_content,
+            student_answer=student_answer,
+            max_points=max_points,
+            grading_rubric=grading_rubric,
+            expected_answer=expected_answer,
+            question_type=question_type,
+            language=language
+        )
+    )
+
+
+async def _grade_with_llm(
+    question_content: str,
+    student_answer: str,
+    max_points: int,
+    grading_rubric: Optional[str],
+    expected_answer: Optional[str],
+    question_type: Optional[str],
+    language: str
+) -> Dict[str, Any]:
+    """Grade one answer with an LLM call (no caching)."""
     try:
         # Build prompt
         prompt = build_grading_prompt(
@@ -182,14 +215,13 @@ async def grade_answer(
 
         # Call Azure OpenAI
         logger.info(f"Calling Azure OpenAI for grading with model: {LLM_MODEL}")
-        client = get_client()
-
-        response = await client.chat.completions.create(
+        response = await chat_completion(
+            "grade_answer",
             model=LLM_MODEL,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are an expert assessment grader. You evaluate student answers objectively and provide constructive feedback. Always return valid JSON."
+                    "content": GRADING_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -197,7 +229,7 @@ async def grade_answer(
                 }
             ],
             temperature=0.3,  # Lower temperature for more consistent grading
-            max_tokens=2048,
+            max_tokens=get_token_planner().max_tokens("grade_answer", prompt=GRADING_SYSTEM_PROMPT + prompt),
             response_format={"type": "json_object"}
         )
 
@@ -244,6 +276,203 @@ async def grade_answer(
         raise ValueError(f"Failed to grade answer: {str(e)}")
 
 
+# Question types graded locally from their options (no LLM call)
+OBJECTIVE_TYPES = {"MultipleChoice", "MultipleAnswer", "TrueFalse", "SituationalJudgment", "Rating"}
+
+# Share of the points awarded for each SJT option (SFIA L4..L1)
+SJT_EFFECTIVENESS_CREDIT = {
+    "MostEffective": 1.0,
+    "Effective": 2 / 3,
+    "Ineffective": 1 / 3,
+    "CounterProductive": 0.0
+}
+
+
+def _option_key(option: Dict[str, Any], position: int) -> str:
+    """Identifier a submission uses to select an option: its id, else its display_order."""
+    if option.get("id") is not None:
+        return str(option["id"]).strip()
+    return str(option.get("display_order", position)).strip()
+
+
+def grade_objective_answer(
+    question_type: str,
+    options: List[Dict[str, Any]],
+    selected_options: Optional[List[str]],
+    max_points: int,
+    language: str = "en"
+) -> Dict[str, Any]:
+    """
+    Grade a choice-based answer locally.
+
+    MultipleChoice / TrueFalse / MultipleAnswer score full points only when the
+    selection equals the set of correct options. SituationalJudgment scores by
+    the effectiveness_level of the chosen option; Rating (all options correct)
+    scores any selection.
+
+    Args:
+        question_type: One of OBJECTIVE_TYPES
+        options: Question options (content, is_correct, display_order, id, effectiveness_level)
+        selected_options: Ids (or display_order values) of the chosen options
+        max_points: Maximum points for this question
+        language: Feedback language
+
+    Returns:
+        Dict with grading result (same shape as grade_answer())
+
+    Raises:
+        ValueError: If the question has no options
+    """
+    if not options:
+        raise ValueError(f"{question_type} question has no options to grade against")
+
+    vi = language != "en"
+    by_key = {_option_key(option, i): option for i, option in enumerate(options, start=1)}
+    selected = {str(value).strip() for value in (selected_options or [])}
+    correct = {key for key, option in by_key.items() if option.get("is_correct")}
+
+    if not selected:
+        credit = 0.0
+        feedback = "Chưa chọn phương án nào." if vi else "No option was selected."
+    elif question_type == "SituationalJudgment":
+        chosen = by_key.get(next(iter(selected))) if len(selected) == 1 else None
+        level = chosen.get("effectiveness_level") if chosen else None
+        credit = SJT_EFFECTIVENESS_CREDIT.get(level, 0.0)
+        if level:
+            feedback = f"Phương án đã chọn: {level}." if vi else f"Selected response: {level}."
+        else:
+            feedback = "Lựa chọn không hợp lệ." if vi else "Invalid selection."
+    elif correct and correct == set(by_key):
+        # Rating scales and other questions without a wrong answer
+        credit = 1.0
+        feedback = "Đã ghi nhận câu trả lời." if vi else "Answer recorded."
+    else:
+        credit = 1.0 if selected == correct else 0.0
+        if credit:
+            feedback = "Chính xác." if vi else "Correct."
+        else:
+            feedback = "Chưa chính xác." if vi else "Incorrect."
+
+    points_awarded = int(round(credit * max_points))
+    explanations = [
+        by_key[key]["explanation"] for key in sorted(selected)
+        if key in by_key and by_key[key].get("explanation")
+    ]
+    return {
+        "success": True,
+        "points_awarded": points_awarded,
+        "max_points": max_points,
+        "percentage": round(points_awarded / max_points * 100, 2) if max_points > 0 else 0.0,
+        "feedback": feedback,
+        "strength_points": [],
+        "improvement_areas": [],
+        "detailed_analysis": " ".join(explanations) or None
+    }
+
+
+async def grade_submission(
+    items: List[Dict[str, Any]],
+    language: str = "en",
+    concurrency: int = GRADING_BATCH_CONCURRENCY,
+    timeout: float = GRADING_BATCH_TIMEOUT
+) -> Dict[str, Any]:
+    """
+    Grade every answer of a test submission.
+
+    Choice-based questions are graded locally; text answers go through
+    grade_answer() (cached) concurrently, at most `concurrency` at a time. An
+    answer that fails to grade is reported with success=False and counts zero
+    points without failing the submission.
+
+    Args:
+        items: Answer dicts (question_id, question_type, max_points and either
+               options + selected_options or question_content + student_answer
+               + grading_rubric / expected_answer)
+        language: Feedback language used when an item does not set one
+        concurrency: Maximum AI gradings in flight at once
+        timeout: Seconds allowed per AI-graded answer (0 disables)
+
+    Returns:
+        Dict with per-question results (input order) and the aggregate score
+    """
+    logger.info(f"Grading submission with {len(items)} answers")
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def grade_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        question_type = item.get("question_type") or ""
+        item_language = item.get("language") or language
+        graded_by = "rule" if question_type in OBJECTIVE_TYPES else "ai"
+        base = {
+            "question_id": item.get("question_id"),
+            "question_type": question_type,
+            "graded_by": graded_by
+        }
+        try:
+            if graded_by == "rule":
+                result = grade_objective_answer(
+                    question_type,
+                    item.get("options") or [],
+                    item.get("selected_options"),
+                    item["max_points"],
+                    item_language
+                )
+            else:
+                if not item.get("question_content"):
+                    raise ValueError("question_content is required for AI-graded questions")
+                async with semaphore:
+                    result = await asyncio.wait_for(
+                        grade_answer(
+                            question_content=item["question_content"],
+                            student_answer=item.get("student_answer") or "",
+                            max_points=item["max_points"],
+                            grading_rubric=item.get("grading_rubric"),
+                            expected_answer=item.get("expected_answer"),
+                            question_type=question_type,
+                            language=item_language
+                        ),
+                        timeout=timeout or None
+                    )
+            return {**base, **result}
+        except asyncio.TimeoutError:
+            error = f"Grading timed out after {timeout:.0f}s"
+        except Exception as e:
+            error = str(e)
+        logger.error(f"Failed to grade question {item.get('question_id')}: {error}")
+        return {
+            **base,
+            "success": False,
+            "points_awarded": 0,
+            "max_points": item.get("max_points", 0),
+            "percentage": 0.0,
+            "error": error
+        }
+
+    results = list(await asyncio.gather(*(grade_item(item) for item in items)))
+
+    total_awarded = sum(r["points_awarded"] for r in results)
+    total_max = sum(r["max_points"] for r in results)
+    failed = sum(1 for r in results if not r["success"])
+    aggregate = {
+        "total_points_awarded": total_awarded,
+        "total_max_points": total_max,
+        "percentage": round(total_awarded / total_max * 100, 2) if total_max > 0 else 0.0,
+        "graded_count": len(results) - failed,
+        "failed_count": failed,
+        "ai_graded_count": sum(1 for r in results if r["graded_by"] == "ai" and r["success"]),
+        "rule_graded_count": sum(1 for r in results if r["graded_by"] == "rule" and r["success"]),
+        "complete": failed == 0
+    }
+    logger.info(
+        f"Submission graded: {total_awarded}/{total_max} ({aggregate['percentage']}%), "
+        f"{failed} failed"
+    )
+    return {
+        "success": True,
+        "results": results,
+        "aggregate": aggregate
+    }
+
+
 async def test_grader():
     """Test the grader with sample data."""
     result = await grade_answer(
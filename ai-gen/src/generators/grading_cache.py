@@ -0,0 +1,255 @@
+"""
+Grading Cache
+Content-addressed cache of AI grading results. Identical answers to the same
+question, rubric and settings are graded once and then served from memory
+with the same score. Free-text answers (ShortAnswer / LongAnswer) match after
+whitespace / case / Unicode normalization; other answers, such as code, only
+match verbatim.
+
+Entries are kept in an LRU with a TTL; with GRADING_CACHE_PATH set they are
+also written through to a local SQLite file and reloaded at startup.
+Concurrent requests for the same key share a single LLM call.
+"""
+
+import json
+import time
+import copy
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+from config.settings import (
+    LLM_MODEL,
+    GRADING_CACHE_ENABLED,
+    GRADING_CACHE_MAX_ENTRIES,
+    GRADING_CACHE_TTL,
+    GRADING_CACHE_PATH
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the grading prompt, result shape or key changes to invalidate old entries
+GRADING_CACHE_VERSION = 2
+
+# Answer types whose text is normalized for the key; indentation and
+# identifier case matter in the others (CodingChallenge, Scenario, ...)
+NORMALIZED_ANSWER_TYPES = {"shortanswer", "longanswer"}
+
+
+def normalize_text(value: Optional[str]) -> Optional[str]:
+    """Collapse whitespace, apply NFKC and casefold so trivially different texts match."""
+    if value is None:
+        return None
+    return " ".join(unicodedata.normalize("NFKC", str(value)).split()).casefold()
+
+
+def normalize_rubric(rubric: Optional[str]) -> Optional[str]:
+    """Canonical JSON for JSON rubrics (key order / spacing ignored), normalized text otherwise."""
+    if rubric is None:
+        return None
+    try:
+        return json.dumps(json.loads(rubric), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return normalize_text(rubric)
+
+
+def grading_cache_key(
+    question_content: str,
+    student_answer: str,
+    max_points: int,
+    grading_rubric: Optional[str] = None,
+    expected_answer: Optional[str] = None,
+    question_type: Optional[str] = None,
+    language: str = "en"
+) -> str:
+    """
+    Content hash identifying a grading request.
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    answer_type = (question_type or "").lower()
+    payload = [
+        GRADING_CACHE_VERSION,
+        LLM_MODEL,
+        normalize_text(question_content),
+        normalize_text(student_answer) if answer_type in NORMALIZED_ANSWER_TYPES else student_answer,
+        normalize_rubric(grading_rubric),
+        normalize_text(expected_answer),
+        int(max_points),
+        answer_type,
+        (language or "en").lower()
+    ]
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class GradingCache:
+    """LRU + TTL cache of grading results with optional SQLite persistence."""
+
+    def __init__(
+        self,
+        max_entries: int = GRADING_CACHE_MAX_ENTRIES,
+        ttl: float = GRADING_CACHE_TTL,
+        path: str = GRADING_CACHE_PATH,
+        enabled: bool = GRADING_CACHE_ENABLED
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.enabled = enabled and max_entries > 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        if self.enabled and path:
+            self._open_db()
+
+    def _open_db(self):
+        try:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS grading_cache "
+                "(key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            if self.ttl > 0:
+                self._db.execute("DELETE FROM grading_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            rows = self._db.execute(
+                "SELECT key, result, created_at FROM grading_cache ORDER BY created_at DESC LIMIT ?",
+                (self.max_entries,)
+            ).fetchall()
+            self._db.commit()
+            for key, result, created_at in reversed(rows):
+                self._entries[key] = (json.loads(result), created_at)
+            logger.info(f"Grading cache loaded {len(rows)} entries from {self.path}")
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Grading cache persistence disabled ({self.path}): {e}")
+            self._db = None
+
+    def _persist(self, sql: str, params: tuple):
+        if self._db is None:
+            return
+        try:
+            self._db.execute(sql, params)
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Grading cache write failed: {e}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result (a copy) or None; counts a hit or miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl > 0 and time.time() - entry[1] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self._persist("DELETE FROM grading_cache WHERE key = ?", (key,))
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[0])
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a grading result, evicting the least recently used entries."""
+        if not self.enabled:
+            return
+        created_at = time.time()
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(result), created_at)
+            self._entries.move_to_end(key)
+            self._persist(
+                "INSERT OR REPLACE INTO grading_cache (key, result, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), created_at)
+            )
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                self._persist("DELETE FROM grading_cache WHERE key = ?", (evicted,))
+
+    async def get_or_grade(
+        self,
+        key: str,
+        grade: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Return the cached result for `key`, or run `grade()` once and cache it.
+        Concurrent callers with the same key wait for the same call.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        if not self.enabled:
+            return await grade()
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(pending))
+
+        task = asyncio.ensure_future(grade())
+        self._inflight[key] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._inflight.pop(key, None)
+            else:
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        self.put(key, result)
+        return copy.deepcopy(result)
+
+    def clear(self):
+        """Drop all entries (memory and file)."""
+        with self._lock:
+            self._entries.clear()
+            self._persist("DELETE FROM grading_cache", ())
+
+    def close(self):
+        """Close the persistence file."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "persistent": self._db is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+# Process-wide grading cache (lazy-loaded)
+_grading_cache: Optional[GradingCache] = None
+
+
+def get_grading_cache() -> GradingCache:
+    """Get or create the process-wide grading cache."""
+    global _grading_cache
+    if _grading_cache is None:
+        _grading_cache = GradingCache()
+    return _grading_cache
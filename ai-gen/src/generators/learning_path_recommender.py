@@ -6,25 +6,98 @@ AI-powered learning path generation and resource recommendations
 import json
 import logging
 from typing import Dict, Any, List, Optional
-from openai import AsyncOpenAI
 
-from config.settings import OPENAI_API_KEY, OPENAI_BASE_URL, LLM_MODEL
+from config.settings import LLM_MODEL
+from .llm_gateway import chat_completion
+from .token_planner import get_token_planner
 
 logger = logging.getLogger(__name__)
 
-# Azure OpenAI client (lazy-loaded)
-_client = None
 
+# Instructions and output schemas shared by every request; sent unchanged as
+# the system message so they form a cacheable prompt prefix
+LEARNING_PATH_SYSTEM_PROMPT = """You are an expert learning and development consultant specializing in IT/Tech skill development. Design effective, practical learning paths. Always return valid JSON.
 
-def get_client():
-    """Get or create Azure OpenAI client."""
-    global _client
-    if _client is None:
-        _client = AsyncOpenAI(
-            api_key=OPENAI_API_KEY,
-            base_url=OPENAI_BASE_URL
-        )
-    return _client
+The user message gives the employee, the skill with its current and target level, optionally available learning resources and a time constraint, and the RESPONSE LANGUAGE.
+
+TASK:
+Create a comprehensive learning path to help the employee advance from the current level to the target level.
+
+Consider:
+1. Progressive skill building (don't skip levels)
+2. Mix of learning methods (courses, projects, mentoring, etc.)
+3. Practical application opportunities
+4. Milestones to measure progress
+
+OUTPUT REQUIREMENTS:
+Return ONLY valid JSON matching this exact schema (no markdown):
+
+{
+  "path_title": "Title for this learning path in the response language",
+  "path_description": "Brief description of the learning journey in the response language",
+  "estimated_total_hours": <number>,
+  "estimated_duration_weeks": <number>,
+  "learning_items": [
+    {
+      "order": 1,
+      "title": "Learning item title in the response language",
+      "description": "What will be learned in the response language",
+      "item_type": "Course|Book|Video|Project|Mentorship|Workshop|Certification|Article",
+      "estimated_hours": <number>,
+      "target_level_after": <number 1-7>,
+      "success_criteria": "How to know this is complete in the response language",
+      "resource_id": "<id if matching available resource, null otherwise>"
+    }
+  ],
+  "milestones": [
+    {
+      "after_item": <order number>,
+      "description": "Milestone description in the response language",
+      "expected_level": <number>
+    }
+  ],
+  "ai_rationale": "Explanation of why this path was designed this way in the response language",
+  "key_success_factors": ["Factor 1", "Factor 2"],
+  "potential_challenges": ["Challenge 1", "Challenge 2"]
+}
+
+IMPORTANT:
+- Create 3-8 learning items depending on gap size
+- Each level advancement typically needs 20-40 hours of learning
+- Include at least one hands-on project
+- Mix theoretical and practical learning
+- All text in the response language
+- Return ONLY valid JSON
+"""
+
+RESOURCE_RANKING_SYSTEM_PROMPT = """You are an expert learning consultant. Evaluate and rank learning resources objectively. Always return valid JSON.
+
+The user message gives the skill development context, the available resources as JSON and the RESPONSE LANGUAGE.
+
+TASK:
+Rank these resources by how well they help close the skill gap. Consider:
+1. Relevance to the specific skill
+2. Appropriateness for the current -> target level transition
+3. Learning efficiency (hours vs. value)
+4. Logical learning sequence
+
+OUTPUT REQUIREMENTS:
+Return ONLY valid JSON:
+
+{
+  "ranked_resources": [
+    {
+      "resource_id": "<id>",
+      "rank": 1,
+      "relevance_score": <0-100>,
+      "reason": "Why this resource is ranked here in the response language"
+    }
+  ],
+  "top_recommendations": ["id1", "id2", "id3"],
+  "coverage_assessment": "How well these resources cover the skill gap in the response language",
+  "gaps_in_resources": ["What's missing in the response language"]
+}
+"""
 
 
 def build_learning_path_prompt(
@@ -39,7 +112,8 @@ def build_learning_path_prompt(
     language: str = "en"
 ) -> str:
     """
-    Build prompt for generating a learning path.
+    Build the request-specific learning path prompt (the user message;
+    instructions are in LEARNING_PATH_SYSTEM_PROMPT).
     """
     lang_name = "English" if language == "en" else "Vietnamese"
 
@@ -71,9 +145,7 @@ def build_learning_path_prompt(
     if time_constraint_months:
         time_text = f"\nTIME CONSTRAINT: Complete within {time_constraint_months} months"
 
-    prompt = f"""You are an expert learning and development consultant specializing in IT/Tech skill development.
-
-CONTEXT:
+    prompt = f"""CONTEXT:
 - Employee: {employee_name}
 - Skill to Develop: {skill_name} ({skill_code})
 - Current Level: {current_level} ({current_level_name})
@@ -83,54 +155,7 @@ CONTEXT:
 {resources_text}
 {time_text}
 
-TASK:
-Create a comprehensive learning path to help the employee advance from level {current_level} to level {target_level}.
-
-Consider:
-1. Progressive skill building (don't skip levels)
-2. Mix of learning methods (courses, projects, mentoring, etc.)
-3. Practical application opportunities
-4. Milestones to measure progress
-
-OUTPUT REQUIREMENTS:
-Return ONLY valid JSON matching this exact schema (no markdown):
-
-{{
-  "path_title": "Title for this learning path in {lang_name}",
-  "path_description": "Brief description of the learning journey in {lang_name}",
-  "estimated_total_hours": <number>,
-  "estimated_duration_weeks": <number>,
-  "learning_items": [
-    {{
-      "order": 1,
-      "title": "Learning item title in {lang_name}",
-      "description": "What will be learned in {lang_name}",
-      "item_type": "Course|Book|Video|Project|Mentorship|Workshop|Certification|Article",
-      "estimated_hours": <number>,
-      "target_level_after": <number 1-7>,
-      "success_criteria": "How to know this is complete in {lang_name}",
-      "resource_id": "<id if matching available resource, null otherwise>"
-    }}
-  ],
-  "milestones": [
-    {{
-      "after_item": <order number>,
-      "description": "Milestone description in {lang_name}",
-      "expected_level": <number>
-    }}
-  ],
-  "ai_rationale": "Explanation of why this path was designed this way in {lang_name}",
-  "key_success_factors": ["Factor 1", "Factor 2"],
-  "potential_challenges": ["Challenge 1", "Challenge 2"]
-}}
-
-IMPORTANT:
-- Create 3-8 learning items depending on gap size
-- Each level advancement typically needs 20-40 hours of learning
-- Include at least one hands-on project
-- Mix theoretical and practical learning
-- All text in {lang_name}
-- Return ONLY valid JSON
+RESPONSE LANGUAGE: {lang_name}
 """
     return prompt
 
@@ -185,13 +210,13 @@ async def generate_learning_path(
         logger.debug(f"Learning path prompt built: {len(prompt)} characters")
 
         # Call Azure OpenAI
-        client = get_client()
-        response = await client.chat.completions.create(
+        response = await chat_completion(
+            "generate_learning_path",
             model=LLM_MODEL,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are an expert learning and development consultant. Design effective, practical learning paths. Always return valid JSON."
+                    "content": LEARNING_PATH_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -199,7 +224,7 @@ async def generate_learning_path(
                 }
             ],
             temperature=0.5,
-            max_tokens=2048,
+            max_tokens=get_token_planner().max_tokens("generate_learning_path", prompt=LEARNING_PATH_SYSTEM_PROMPT + prompt),
             response_format={"type": "json_object"}
         )
 
@@ -284,9 +309,7 @@ async def rank_learning_resources(
         for i, r in enumerate(resources[:20])  # Limit to 20
     ], indent=2)
 
-    prompt = f"""You are an expert learning consultant. Rank these learning resources by relevance.
-
-SKILL DEVELOPMENT CONTEXT:
+    prompt = f"""SKILL DEVELOPMENT CONTEXT:
 - Skill: {skill_name} ({skill_code})
 - Current Level: {current_level}
 - Target Level: {target_level}
@@ -295,39 +318,17 @@ SKILL DEVELOPMENT CONTEXT:
 AVAILABLE RESOURCES:
 {resources_json}
 
-TASK:
-Rank these resources by how well they help close the skill gap. Consider:
-1. Relevance to the specific skill
-2. Appropriateness for the current -> target level transition
-3. Learning efficiency (hours vs. value)
-4. Logical learning sequence
-
-OUTPUT REQUIREMENTS:
-Return ONLY valid JSON:
-
-{{
-  "ranked_resources": [
-    {{
-      "resource_id": "<id>",
-      "rank": 1,
-      "relevance_score": <0-100>,
-      "reason": "Why this resource is ranked here in {lang_name}"
-    }}
-  ],
-  "top_recommendations": ["id1", "id2", "id3"],
-  "coverage_assessment": "How well these resources cover the skill gap in {lang_name}",
-  "gaps_in_resources": ["What's missing in {lang_name}"]
-}}
+RESPONSE LANGUAGE: {lang_name}
 """
 
     try:
-        client = get_client()
-        response = await client.chat.completions.create(
+        response = await chat_completion(
+            "rank_learning_resources",
             model=LLM_MODEL,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are an expert learning consultant. Evaluate and rank learning resources objectively. Always return valid JSON."
+                    "content": RESOURCE_RANKING_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -335,7 +336,7 @@ Return ONLY valid JSON:
                 }
             ],
             temperature=0.3,
-            max_tokens=1024,
+            max_tokens=get_token_planner().max_tokens("rank_learning_resources", prompt=RESOURCE_RANKING_SYSTEM_PROMPT + prompt),
             response_format={"type": "json_object"}
         )
 
@@ -0,0 +1,355 @@
+"""
+LLM Gateway
+Single place where the generators talk to Azure OpenAI: one pooled, tuned
+HTTP client per process (keep-alive, connection limits, HTTP/2 when the `h2`
+package is installed), shared timeouts and retry policy, and per-endpoint
+latency / token / connection reuse metrics.
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional, AsyncIterator
+
+import httpx
+from openai import AsyncOpenAI, AzureOpenAI
+
+from config.settings import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_TIMEOUT,
+    LLM_CONNECT_TIMEOUT,
+    LLM_MAX_RETRIES,
+    LLM_HTTP2
+)
+from src.db.metrics import LatencyRegistry
+from .token_planner import get_token_planner
+
+logger = logging.getLogger(__name__)
+
+# api-version used by the legacy v1 generator (AzureOpenAI client)
+AZURE_API_VERSION = "2024-02-15-preview"
+
+try:
+    import h2  # noqa: F401  (optional: enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class ConnectionStats:
+    """Counts HTTP requests by whether they opened a new connection or reused a pooled one."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.http_requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.errors = 0
+        self.http_versions: Dict[str, int] = {}
+
+    def record(self, opened: bool, http_version: Optional[str] = None, error: bool = False):
+        with self._lock:
+            self.http_requests += 1
+            if opened:
+                self.new_connections += 1
+            else:
+                self.reused_connections += 1
+            if error:
+                self.errors += 1
+            if http_version:
+                self.http_versions[http_version] = self.http_versions.get(http_version, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "http_requests": self.http_requests,
+                "new_connections": self.new_connections,
+                "reused_connections": self.reused_connections,
+                "reuse_ratio": round(self.reused_connections / self.http_requests, 4) if self.http_requests else None,
+                "errors": self.errors,
+                "http_versions": dict(self.http_versions)
+            }
+
+
+def _cached_tokens(usage) -> int:
+    """Prompt tokens served from the provider's prompt cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+
+
+class EndpointUsage:
+    """Per-endpoint LLM call and token counters (including prompt cache hits)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, usage=None, error: bool = False):
+        with self._lock:
+            counters = self._usage.setdefault(endpoint, {
+                "calls": 0,
+                "errors": 0,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "completion_tokens": 0
+            })
+            counters["calls"] += 1
+            if error:
+                counters["errors"] += 1
+            if usage is not None:
+                counters["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                counters["cached_tokens"] += _cached_tokens(usage)
+                counters["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            usage = {endpoint: dict(counters) for endpoint, counters in sorted(self._usage.items())}
+        for counters in usage.values():
+            prompt_tokens = counters["prompt_tokens"]
+            counters["cached_ratio"] = round(counters["cached_tokens"] / prompt_tokens, 4) if prompt_tokens else None
+        return usage
+
+
+CONNECTIONS = ConnectionStats()
+LLM_LATENCY = LatencyRegistry()
+LLM_USAGE = EndpointUsage()
+
+
+class InstrumentedAsyncTransport(httpx.AsyncHTTPTransport):
+    """Async transport recording connection reuse through httpcore's trace extension."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        opened = []
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                opened.append(True)
+            if outer_trace is not None:
+                await outer_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            CONNECTIONS.record(bool(opened), error=True)
+            raise
+        CONNECTIONS.record(bool(opened), response.extensions.get("http_version", b"").decode("ascii", "ignore"))
+        return response
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """Sync counterpart of InstrumentedAsyncTransport (legacy v1 client)."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        opened = []
+        outer_trace = request.extensions.get("trace")
+
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                opened.append(True)
+            if outer_trace is not None:
+                outer_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            CONNECTIONS.record(bool(opened), error=True)
+            raise
+        CONNECTIONS.record(bool(opened), response.extensions.get("http_version", b"").decode("ascii", "ignore"))
+        return response
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+
+def _http2() -> bool:
+    if LLM_HTTP2 and not HTTP2_AVAILABLE:
+        logger.info("LLM_HTTP2 is on but the 'h2' package is not installed, using HTTP/1.1")
+    return LLM_HTTP2 and HTTP2_AVAILABLE
+
+
+# Process-wide clients (lazy-loaded)
+_client: Optional[AsyncOpenAI] = None
+_azure_client: Optional[AzureOpenAI] = None
+
+
+def get_client() -> AsyncOpenAI:
+    """Get or create the shared async Azure OpenAI client."""
+    global _client
+    if _client is None:
+        http2 = _http2()
+        _client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL,
+            timeout=_timeout(),
+            max_retries=LLM_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                transport=InstrumentedAsyncTransport(limits=_limits(), http2=http2),
+                timeout=_timeout(),
+                follow_redirects=True
+            )
+        )
+        logger.info(
+            f"LLM client created: max_connections={LLM_MAX_CONNECTIONS}, "
+            f"keepalive={LLM_MAX_KEEPALIVE_CONNECTIONS}, http2={http2}, max_retries={LLM_MAX_RETRIES}"
+        )
+    return _client
+
+
+def get_azure_client() -> AzureOpenAI:
+    """Get or create the shared sync AzureOpenAI client used by the v1 generator."""
+    global _azure_client
+    if _azure_client is None:
+        _azure_client = AzureOpenAI(
+            api_key=OPENAI_API_KEY,
+            api_version=AZURE_API_VERSION,
+            azure_endpoint=OPENAI_BASE_URL.rstrip('/openai/v1/') if OPENAI_BASE_URL else None,
+            timeout=_timeout(),
+            max_retries=LLM_MAX_RETRIES,
+            http_client=httpx.Client(
+                transport=InstrumentedTransport(limits=_limits(), http2=_http2()),
+                timeout=_timeout(),
+                follow_redirects=True
+            )
+        )
+    return _azure_client
+
+
+def _finish_reason(response) -> Optional[str]:
+    choices = getattr(response, "choices", None)
+    return getattr(choices[0], "finish_reason", None) if choices else None
+
+
+async def chat_completion(endpoint: str, units: int = 1, **kwargs):
+    """
+    Create a chat completion through the shared client.
+
+    Args:
+        endpoint: Name the call is reported under (e.g. "grade_answer")
+        units: Results in the response, for output size learning (e.g. gaps in a batch)
+        **kwargs: Arguments for client.chat.completions.create
+
+    Returns:
+        ChatCompletion
+    """
+    start = time.perf_counter()
+    try:
+        response = await get_client().chat.completions.create(**kwargs)
+    except Exception:
+        LLM_LATENCY.observe(endpoint, (time.perf_counter() - start) * 1000, error=True)
+        LLM_USAGE.record(endpoint, error=True)
+        raise
+    LLM_LATENCY.observe(endpoint, (time.perf_counter() - start) * 1000)
+    LLM_USAGE.record(endpoint, getattr(response, "usage", None))
+    get_token_planner().record_call(
+        endpoint, getattr(response, "usage", None), _finish_reason(response), kwargs.get("max_tokens"), units
+    )
+    return response
+
+
+async def chat_completion_stream(endpoint: str, units: int = 1, **kwargs) -> AsyncIterator[str]:
+    """
+    Stream a chat completion through the shared client.
+
+    Latency is recorded when the stream ends; time to the first content
+    delta is recorded under "<endpoint>:first_token".
+
+    Args:
+        endpoint: Name the call is reported under
+        units: Results in the response, for output size learning
+        **kwargs: Arguments for client.chat.completions.create (without stream)
+
+    Yields:
+        str: Content deltas in order
+    """
+    start = time.perf_counter()
+    first_token = True
+    usage = None
+    finish_reason = None
+    try:
+        stream = await get_client().chat.completions.create(
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+        async with stream:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token:
+                        first_token = False
+                        LLM_LATENCY.observe(f"{endpoint}:first_token", (time.perf_counter() - start) * 1000)
+                    yield delta
+    except Exception:
+        LLM_LATENCY.observe(endpoint, (time.perf_counter() - start) * 1000, error=True)
+        LLM_USAGE.record(endpoint, error=True)
+        raise
+    LLM_LATENCY.observe(endpoint, (time.perf_counter() - start) * 1000)
+    LLM_USAGE.record(endpoint, usage)
+    get_token_planner().record_call(endpoint, usage, finish_reason, kwargs.get("max_tokens"), units)
+
+
+def chat_completion_sync(endpoint: str, **kwargs):
+    """Sync variant of chat_completion() for the v1 generator."""
+    start = time.perf_counter()
+    try:
+        response = get_azure_client().chat.completions.create(**kwargs)
+    except Exception:
+        LLM_LATENCY.observe(endpoint, (time.perf_counter() - start) * 1000, error=True)
+        LLM_USAGE.record(endpoint, error=True)
+        raise
+    LLM_LATENCY.observe(endpoint, (time.perf_counter() - start) * 1000)
+    LLM_USAGE.record(endpoint, getattr(response, "usage", None))
+    get_token_planner().record_call(
+        endpoint, getattr(response, "usage", None), _finish_reason(response), kwargs.get("max_tokens")
+    )
+    return response
+
+
+async def close_clients():
+    """Close the shared clients and their connection pools."""
+    global _client, _azure_client
+    if _client is not None:
+        await _client.close()
+        _client = None
+    if _azure_client is not None:
+        _azure_client.close()
+        _azure_client = None
+
+
+def get_llm_metrics() -> Dict[str, Any]:
+    """LLM call latency, token usage, connection reuse and max_tokens planning statistics."""
+    return {
+        "config": {
+            "max_connections": LLM_MAX_CONNECTIONS,
+            "max_keepalive_connections": LLM_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry_seconds": LLM_KEEPALIVE_EXPIRY,
+            "timeout_seconds": LLM_TIMEOUT,
+            "max_retries": LLM_MAX_RETRIES,
+            "http2": LLM_HTTP2 and HTTP2_AVAILABLE
+        },
+        "calls": LLM_LATENCY.snapshot(),
+        "usage": LLM_USAGE.snapshot(),
+        "connections": CONNECTIONS.snapshot(),
+        "token_planner": get_token_planner().get_stats()
+    }
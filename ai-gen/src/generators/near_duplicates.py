@@ -0,0 +1,122 @@
+"""
+Near-duplicate question detection
+Questions are reduced to shingle sets: the normalized words of their
+content (order-insensitive, so paraphrases that reorder clauses still
+match) plus one shingle per option text. MinHash signatures bucketed with
+LSH bands find candidate matches in constant time per question; candidates
+are confirmed with the exact Jaccard similarity of the shingle sets.
+"""
+
+import re
+import random
+import hashlib
+import logging
+import unicodedata
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from config.settings import DUPLICATE_SIMILARITY_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240611)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _words(text: Any) -> List[str]:
+    return _WORD_RE.findall(unicodedata.normalize("NFKC", str(text or "")).casefold())
+
+
+def question_shingles(question: Dict[str, Any]) -> Set[str]:
+    """Shingles of a question: content words and normalized option texts."""
+    shingles = set(_words(question.get("content")))
+    for option in question.get("options") or []:
+        text = option.get("content") if isinstance(option, dict) else option
+        option_words = _words(text)
+        if option_words:
+            shingles.add("option:" + " ".join(option_words))
+    return shingles
+
+
+def _hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash(shingles: Set[str]) -> Tuple[int, ...]:
+    """MinHash signature of a shingle set."""
+    hashes = [_hash(s) for s in shingles] or [0]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateDetector:
+    """
+    Accepts questions that are not near-duplicates of ones accepted before.
+
+    Args:
+        threshold: Jaccard similarity of the shingle sets at or above which
+                   two questions count as duplicates
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._shingles: List[Set[str]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self.accepted = 0
+        self.duplicates = 0
+
+    def find(self, question: Dict[str, Any]) -> Optional[Tuple[int, float]]:
+        """
+        Most similar accepted question at or above the threshold.
+
+        Returns:
+            (index in acceptance order, similarity), or None
+        """
+        shingles = question_shingles(question)
+        return self._match(shingles, minhash(shingles))
+
+    def _match(self, shingles: Set[str], signature: Tuple[int, ...]) -> Optional[Tuple[int, float]]:
+        candidates = set()
+        for band in range(LSH_BANDS):
+            key = (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+            candidates.update(self._buckets.get(key, ()))
+        best = None
+        for index in candidates:
+            similarity = jaccard(shingles, self._shingles[index])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (index, similarity)
+        return best
+
+    def add(self, question: Dict[str, Any]) -> bool:
+        """
+        Accept a question unless it near-duplicates an accepted one.
+
+        Returns:
+            True if accepted, False if it is a duplicate
+        """
+        shingles = question_shingles(question)
+        signature = minhash(shingles)
+        match = self._match(shingles, signature)
+        if match is not None:
+            self.duplicates += 1
+            logger.info(f"Dropped near-duplicate question (similarity {match[1]:.2f} with #{match[0]})")
+            return False
+
+        index = len(self._shingles)
+        self._shingles.append(shingles)
+        for band in range(LSH_BANDS):
+            key = (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+            self._buckets.setdefault(key, []).append(index)
+        self.accepted += 1
+        return True
@@ -0,0 +1,255 @@
+"""
+Output repair
+Salvages the valid question objects of a generator response, including
+malformed or truncated JSON, and checks each against the V2 question schema
+(output_question_schema_v2.json). Only the broken items are sent back in a
+small repair call, so a bad response no longer costs a full regeneration of
+its questions.
+"""
+
+import json
+import logging
+import threading
+from typing import Dict, Any, List, NamedTuple, Tuple
+
+from config.settings import LLM_MODEL, OUTPUT_REPAIR_ENABLED, OUTPUT_REPAIR_MAX_ITEMS
+from src.validators.output_validator import question_errors_v2
+from .llm_gateway import chat_completion
+from .stream_parser import JsonArrayStreamParser
+from .token_planner import get_token_planner
+
+logger = logging.getLogger(__name__)
+
+# Longest text sent for one broken item
+REPAIR_ITEM_CHARS = 6000
+
+# Repair instructions shared by every call (cacheable prompt prefix)
+REPAIR_SYSTEM_PROMPT = """You repair assessment questions produced by a question generator. Return valid JSON only.
+
+The user message lists broken question objects, each with the problems found in it, followed by the requested question types and the RESPONSE LANGUAGE. An item may be invalid JSON, cut off before it was complete, or break the schema.
+
+For each item:
+- Keep its content, options and intent; change only what is needed to fix the listed problems
+- Complete a cut-off item in the same style, without starting a new question
+- If its type is not one of the requested types, rewrite it as a question of a requested type
+- Every option has "content", "is_correct" and "display_order" (1, 2, ...)
+- SituationalJudgment: exactly 4 options, each with "effectiveness_level" (MostEffective|Effective|Ineffective|CounterProductive)
+- ShortAnswer, LongAnswer, CodingChallenge and Scenario: "grading_rubric" as a JSON string
+- Write all text in the response language
+
+Return ONLY this JSON, with the repaired items in the order given and no markdown:
+
+{
+  "questions": [<repaired question object>, ...]
+}
+"""
+
+
+class BrokenQuestion(NamedTuple):
+    """A question that needs repair: the parsed object or raw text, and what is wrong with it."""
+    item: Any
+    errors: List[str]
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove a markdown code block around a JSON response."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+        text = text.strip()
+    return text
+
+
+def parser_broken_items(parser: JsonArrayStreamParser) -> List[BrokenQuestion]:
+    """Items a parser could not return: invalid JSON objects and the object cut off at the end."""
+    broken = [BrokenQuestion(raw, ["invalid JSON"]) for raw in parser.invalid_items]
+    if parser.pending.strip():
+        broken.append(BrokenQuestion(parser.pending, ["truncated: the object is incomplete"]))
+    return broken
+
+
+def salvage_questions(text: str) -> Tuple[List[Any], List[BrokenQuestion]]:
+    """
+    Question objects of a full or partial response.
+
+    Well-formed responses are parsed as a whole. Otherwise the complete
+    objects of the "questions" array are extracted one by one; objects that
+    are not valid JSON and an object cut off at the end are returned as
+    broken.
+
+    Returns:
+        (parsed items, broken items)
+
+    Raises:
+        ValueError: If the response contains no questions array
+    """
+    text = strip_code_fences(text)
+    try:
+        result = json.loads(text)
+    except ValueError:
+        result = None
+    if isinstance(result, list):
+        logger.warning("Response missing 'questions' key, wrapping list")
+        return result, []
+    if isinstance(result, dict) and isinstance(result.get("questions"), list):
+        return result["questions"], []
+
+    parser = JsonArrayStreamParser("questions")
+    items = parser.feed(text)
+    if not parser.started:
+        raise ValueError("Response does not contain 'questions' array")
+    broken = parser_broken_items(parser)
+    logger.warning(f"Malformed response: salvaged {len(items)} question(s), {len(broken)} broken")
+    return items, broken
+
+
+def check_questions(items: List[Any], allowed_types) -> Tuple[List[Dict[str, Any]], List[BrokenQuestion]]:
+    """
+    Split parsed items into valid questions and broken ones.
+
+    An item is valid when it matches the V2 question schema and has one of
+    the allowed types. A null skill_id is removed first.
+    """
+    valid, broken = [], []
+    for item in items:
+        if not isinstance(item, dict):
+            broken.append(BrokenQuestion(item, ["not a question object"]))
+            continue
+        # Requests without a skill get "skill_id": null; the caller stamps the
+        # request's skill_id later (inject_skill_id), so drop it here
+        if item.get("skill_id") in (None, "null"):
+            item.pop("skill_id", None)
+        errors = question_errors_v2(item)
+        if item.get("type") not in allowed_types:
+            errors.insert(0, f"type: '{item.get('type')}' is not one of the requested types {sorted(allowed_types)}")
+        if errors:
+            broken.append(BrokenQuestion(item, errors))
+        else:
+            valid.append(item)
+    return valid, broken
+
+
+def build_repair_prompt(broken: List[BrokenQuestion], request: Dict[str, Any]) -> str:
+    """Request-specific part of the repair prompt (the user message)."""
+    lang_name = "English" if request.get("language") == "en" else "Vietnamese"
+    blocks = []
+    for number, (item, errors) in enumerate(broken, start=1):
+        text = item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)
+        problems = "".join(f"- {error}\n" for error in errors[:10])
+        blocks.append(f"[item {number}]\nPROBLEMS:\n{problems}TEXT:\n{text[:REPAIR_ITEM_CHARS]}\n")
+
+    return f"""BROKEN ITEMS ({len(broken)}):
+
+{chr(10).join(blocks)}
+REQUESTED TYPES: {", ".join(request["question_type"])}
+DIFFICULTY LEVEL: {request.get("difficulty") or "medium"}
+RESPONSE LANGUAGE: {lang_name}
+"""
+
+
+class RepairStats:
+    """Counters of the repair stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.repair_calls = 0
+        self.repair_failures = 0
+        self.items_broken = 0
+        self.items_repaired = 0
+        self.items_skipped = 0
+
+    def record(self, broken: int = 0, repaired: int = 0, skipped: int = 0, call: bool = False, failed: bool = False):
+        with self._lock:
+            self.items_broken += broken
+            self.items_repaired += repaired
+            self.items_skipped += skipped
+            self.repair_calls += call
+            self.repair_failures += failed
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": OUTPUT_REPAIR_ENABLED,
+                "max_items": OUTPUT_REPAIR_MAX_ITEMS,
+                "repair_calls": self.repair_calls,
+                "repair_failures": self.repair_failures,
+                "items_broken": self.items_broken,
+                "items_repaired": self.items_repaired,
+                "items_skipped": self.items_skipped,
+                "repaired_ratio": round(self.items_repaired / self.items_broken, 4) if self.items_broken else None
+            }
+
+
+REPAIR_STATS = RepairStats()
+
+
+async def repair_questions(
+    broken: List[BrokenQuestion],
+    request: Dict[str, Any],
+    enabled: bool = OUTPUT_REPAIR_ENABLED,
+    max_items: int = OUTPUT_REPAIR_MAX_ITEMS
+) -> List[Dict[str, Any]]:
+    """
+    Repair broken questions with one small LLM call.
+
+    At most max_items items are repaired (the rest are left to the caller's
+    regeneration of the shortfall). A failed repair call is logged, not
+    raised: the chunk keeps the questions that were valid.
+
+    Args:
+        broken: Broken items from salvage_questions() / check_questions()
+        request: The chunk's generation request (types, language, difficulty)
+
+    Returns:
+        Repaired questions that pass the schema and type checks
+    """
+    if not broken:
+        return []
+    if not enabled or max_items <= 0:
+        REPAIR_STATS.record(broken=len(broken), skipped=len(broken))
+        return []
+
+    to_repair = broken[:max_items]
+    skipped = len(broken) - len(to_repair)
+    prompt = build_repair_prompt(to_repair, request)
+    try:
+        response = await chat_completion(
+            "repair_questions",
+            units=len(to_repair),
+            model=LLM_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": REPAIR_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.2,
+            max_tokens=get_token_planner().max_tokens(
+                "repair_questions", units=len(to_repair), prompt=REPAIR_SYSTEM_PROMPT + prompt
+            ),
+            response_format={"type": "json_object"}
+        )
+        items, _ = salvage_questions(response.choices[0].message.content or "")
+    except Exception as e:
+        logger.error(f"Repair of {len(to_repair)} question(s) failed: {e}")
+        REPAIR_STATS.record(broken=len(broken), skipped=skipped, call=True, failed=True)
+        return []
+
+    repaired, still_broken = check_questions(items, set(request["question_type"]))
+    for item in still_broken:
+        logger.debug(f"Question still invalid after repair: {item.errors}")
+    # Extra items the model added are not repairs
+    repaired = repaired[:len(to_repair)]
+    REPAIR_STATS.record(broken=len(broken), repaired=len(repaired), skipped=skipped, call=True)
+    logger.info(f"Repaired {len(repaired)} of {len(to_repair)} broken question(s)")
+    return repaired
+
+
+def get_repair_stats() -> Dict[str, Any]:
+    return REPAIR_STATS.snapshot()
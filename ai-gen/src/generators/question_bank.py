@@ -0,0 +1,321 @@
+"""
+Question Bank
+Serves /generate-questions requests from a stock of pre-generated, schema
+validated questions kept per combination of skill, target levels, question
+type, language and difficulty (table QuestionBank, create_question_bank.sql).
+
+A request is served from the bank only when every requested type has enough
+stock; otherwise nothing is consumed and the caller generates live. Either
+way, combinations whose stock is below the low-water mark (or below what
+was asked for) are queued for a background refill up to the target stock.
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Any, List, Optional, NamedTuple, Tuple
+
+import psycopg.errors
+
+from config.settings import (
+    QUESTION_BANK_ENABLED,
+    QUESTION_BANK_TARGET_STOCK,
+    QUESTION_BANK_LOW_WATER,
+    QUESTION_BANK_WORKERS
+)
+from db_question_bank import takeBankQuestions, getBankStock, getBankCombinations, insertBankQuestions
+from src.catalog.skill_catalog import build_skill_data
+from src.validators.output_validator import question_errors_v2
+from .question_generator_v2 import (
+    generate_questions_v2,
+    distribute_by_type,
+    question_key,
+    request_skill_id,
+    inject_skill_id,
+    generation_metadata
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BankCombination(NamedTuple):
+    """One stocked combination; `key` is the QuestionBank.BankKey."""
+    skill_id: Optional[str]
+    skill_name: Optional[str]
+    skill_code: Optional[str]
+    target_levels: str
+    question_type: str
+    language: str
+    difficulty: str
+
+    @property
+    def key(self) -> str:
+        return "|".join([
+            self.skill_id or "",
+            self.target_levels,
+            self.question_type,
+            self.language,
+            self.difficulty
+        ])
+
+    def to_request(self, number_of_questions: int) -> Dict[str, Any]:
+        """Normalized generation request for this combination."""
+        return {
+            "question_type": [self.question_type],
+            "language": self.language,
+            "number_of_questions": number_of_questions,
+            "skills": [{
+                "skill_id": self.skill_id,
+                "skill_name": self.skill_name,
+                "skill_code": self.skill_code
+            }] if self.skill_id else None,
+            "target_proficiency_level": [int(l) for l in self.target_levels.split(",")] if self.target_levels else None,
+            "difficulty": self.difficulty or None,
+            "additional_context": None
+        }
+
+
+def plan_bank_request(normalized_request: Dict[str, Any]) -> Optional[List[Tuple[BankCombination, int]]]:
+    """
+    Combinations and per-type counts a request needs from the bank.
+
+    Returns:
+        List of (combination, count), or None if the request cannot be served
+        from the bank (custom additional_context or several skills)
+    """
+    if (normalized_request.get("additional_context") or "").strip():
+        return None
+    skills = normalized_request.get("skills") or []
+    if len(skills) > 1:
+        return None
+    skill = skills[0] if skills else {}
+
+    levels = ",".join(str(l) for l in sorted(set(normalized_request.get("target_proficiency_level") or [])))
+    counts = distribute_by_type(normalized_request["number_of_questions"], normalized_request["question_type"])
+    return [
+        (BankCombination(
+            skill_id=str(skill["skill_id"]) if skill.get("skill_id") else None,
+            skill_name=skill.get("skill_name"),
+            skill_code=skill.get("skill_code"),
+            target_levels=levels,
+            question_type=qtype,
+            language=normalized_request["language"],
+            difficulty=normalized_request.get("difficulty") or ""
+        ), count)
+        for qtype, count in counts.items() if count > 0
+    ]
+
+
+def content_hash(question: Dict[str, Any]) -> str:
+    """Hash of the normalized question content (one copy per combination)."""
+    return hashlib.sha256(question_key(question).encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    """Bank lookups plus the background refill workers."""
+
+    def __init__(
+        self,
+        target_stock: int = QUESTION_BANK_TARGET_STOCK,
+        low_water: int = QUESTION_BANK_LOW_WATER,
+        workers: int = QUESTION_BANK_WORKERS,
+        enabled: bool = QUESTION_BANK_ENABLED
+    ):
+        self.target_stock = target_stock
+        self.low_water = low_water
+        self.workers = max(1, workers)
+        self.enabled = enabled and target_stock > 0
+        self.available = True
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Dict[str, BankCombination] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.questions_served = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self.questions_stored = 0
+        self.questions_rejected = 0
+
+    def _table_missing(self):
+        logger.warning("QuestionBank table not found (apply create_question_bank.sql), question bank disabled")
+        self.available = False
+
+    async def take(
+        self,
+        normalized_request: Dict[str, Any],
+        skill_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Serve a request from the bank.
+
+        Args:
+            normalized_request: Validated request from request_validator
+            skill_data: Skill data used for metadata and skill_id injection
+
+        Returns:
+            Dict with 'questions' and 'metadata' like generate_questions_v2,
+            or None if the request must be generated live
+        """
+        if not (self.enabled and self.available):
+            return None
+        plan = plan_bank_request(normalized_request)
+        if plan is None:
+            self.bypassed += 1
+            return None
+
+        try:
+            taken = await takeBankQuestions({combo.key: count for combo, count in plan})
+            stock = await getBankStock([combo.key for combo, _ in plan])
+        except psycopg.errors.UndefinedTable:
+            self._table_missing()
+            return None
+        except Exception as e:
+            logger.error(f"Question bank lookup failed: {e}")
+            return None
+
+        for combo, count in plan:
+            if stock[combo.key] < max(self.low_water, count if taken is None else 0):
+                self.schedule_refill(combo)
+
+        if taken is None:
+            self.misses += 1
+            return None
+
+        questions = [question for combo, _ in plan for question in taken[combo.key]]
+        skill_id = request_skill_id(normalized_request, skill_data)
+        for question in questions:
+            inject_skill_id(question, skill_id)
+        self.hits += 1
+        self.questions_served += len(questions)
+
+        metadata = generation_metadata(normalized_request, skill_data, len(questions), 0, 0)
+        metadata["source"] = "question_bank"
+        logger.info(f"Served {len(questions)} questions from the question bank")
+        return {"questions": questions, "metadata": metadata}
+
+    def schedule_refill(self, combo: BankCombination):
+        """Queue a combination for refill (once, while the workers are running)."""
+        if self._queue is None or combo.key in self._pending:
+            return
+        self._pending[combo.key] = combo
+        self._queue.put_nowait(combo)
+
+    async def refill(self, combo: BankCombination) -> int:
+        """
+        Generate questions for one combination up to the target stock.
+
+        Returns:
+            int: Number of questions added
+        """
+        stock = (await getBankStock([combo.key]))[combo.key]
+        needed = self.target_stock - stock
+        if needed <= 0:
+            return 0
+
+        logger.info(f"Refilling question bank {combo.key}: {stock} in stock, generating {needed}")
+        request = combo.to_request(needed)
+        skill_data = await build_skill_data(request["skills"][0]) if request["skills"] else None
+        result = await generate_questions_v2(request, skill_data)
+
+        rows = []
+        for question in result["questions"]:
+            # Stock is shared by every request for the combination: the skill_id
+            # is stamped when served (and is null for combinations without a skill)
+            question.pop("skill_id", None)
+            errors = question_errors_v2(question)
+            if question.get("type") != combo.question_type or errors:
+                self.questions_rejected += 1
+                logger.debug(f"Question not stocked: {errors or question.get('type')}")
+                continue
+            rows.append((
+                combo.key, combo.skill_id, combo.skill_name, combo.skill_code, combo.target_levels,
+                combo.question_type, combo.language, combo.difficulty, content_hash(question), question
+            ))
+
+        inserted = await insertBankQuestions(rows) if rows else 0
+        self.refills += 1
+        self.questions_stored += inserted
+        logger.info(f"Question bank {combo.key}: stocked {inserted} of {len(result['questions'])} generated questions")
+        return inserted
+
+    async def _worker(self):
+        while True:
+            combo = await self._queue.get()
+            try:
+                await self.refill(combo)
+            except asyncio.CancelledError:
+                raise
+            except psycopg.errors.UndefinedTable:
+                self._table_missing()
+            except Exception as e:
+                self.refill_failures += 1
+                logger.error(f"Question bank refill of {combo.key} failed: {e}")
+            finally:
+                self._pending.pop(combo.key, None)
+
+    async def start(self):
+        """Start the refill workers and queue known combinations that are low on stock."""
+        if not self.enabled or self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(
+            f"Question bank started: target_stock={self.target_stock}, "
+            f"low_water={self.low_water}, workers={self.workers}"
+        )
+        try:
+            for row in await getBankCombinations():
+                combo = BankCombination(*row[1:8])
+                if row[8] < self.low_water:
+                    self.schedule_refill(combo)
+        except psycopg.errors.UndefinedTable:
+            self._table_missing()
+        except Exception as e:
+            logger.error(f"Question bank stock scan failed: {e}")
+
+    async def stop(self):
+        """Stop the refill workers (queued refills are dropped)."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "available": self.available,
+            "target_stock": self.target_stock,
+            "low_water": self.low_water,
+            "workers": len(self._tasks),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "bypassed": self.bypassed,
+            "questions_served": self.questions_served,
+            "refills_pending": len(self._pending),
+            "refills": self.refills,
+            "refill_failures": self.refill_failures,
+            "questions_stored": self.questions_stored,
+            "questions_rejected": self.questions_rejected
+        }
+
+
+# Process-wide question bank (lazy-loaded)
+_question_bank: Optional[QuestionBank] = None
+
+
+def get_question_bank() -> QuestionBank:
+    """Get or create the process-wide question bank."""
+    global _question_bank
+    if _question_bank is None:
+        _question_bank = QuestionBank()
+    return _question_bank
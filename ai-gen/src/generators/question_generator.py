@@ -1,16 +1,10 @@
 import json
-from openai import AzureOpenAI
 from typing import Dict, List
 from ..validators.input_validator import validate_input_skill
 from ..validators.output_validator import validate_output_questions
-from config.settings import OPENAI_API_KEY, OPENAI_BASE_URL, LLM_MODEL
-
-# Configure Azure OpenAI client
-client = AzureOpenAI(
-    api_key=OPENAI_API_KEY,
-    api_version="2024-02-15-preview",
-    azure_endpoint=OPENAI_BASE_URL.rstrip('/openai/v1/') if OPENAI_BASE_URL else None
-)
+from .llm_gateway import chat_completion_sync
+from .token_planner import get_token_planner
+from config.settings import LLM_MODEL
 
 def build_prompt(skill_json: dict, num_questions: int, language: str) -> str:
     """Build a detailed prompt for question generation."""
@@ -70,14 +64,15 @@ def generate_questions(skill_json: dict, num_questions: int, language: str, min_
 
     try:
         # Call Azure OpenAI API
-        response = client.chat.completions.create(
+        response = chat_completion_sync(
+            "generate_questions_v1",
             model=LLM_MODEL,
             messages=[
                 {"role": "system", "content": "You are an expert at creating assessment questions. Always respond with valid JSON only."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-            max_tokens=4000
+            max_tokens=get_token_planner().max_tokens("generate_questions_v1", prompt=prompt)
         )
 
         # Extract JSON from response
@@ -4,131 +4,206 @@ Generates questions using Azure OpenAI with output_question_schema_v2
 """
 
 import json
+import time
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator
 from datetime import datetime
-from openai import AsyncOpenAI
 
-from config.settings import OPENAI_API_KEY, OPENAI_BASE_URL, LLM_MODEL
+from config.settings import (
+    LLM_MODEL,
+    GENERATION_CONCURRENCY,
+    GENERATION_CHUNK_SIZE,
+    PROMPT_SKILL_CONTEXT_TOKENS,
+    PROMPT_LEVEL_NEIGHBOURS
+)
+from .llm_gateway import chat_completion, chat_completion_stream
+from .stream_parser import JsonArrayStreamParser
+from .output_repair import salvage_questions, check_questions, parser_broken_items, repair_questions
+from .near_duplicates import NearDuplicateDetector
+from .tokens import count_tokens, BYTES_PER_TOKEN
+from .token_planner import get_token_planner
+
+# Accepted questions listed in replacement requests (most recent, per type)
+AVOID_QUESTIONS_MAX = 20
+AVOID_QUESTION_CHARS = 200
 
 logger = logging.getLogger(__name__)
 
-# Azure OpenAI client (lazy-loaded)
-_client = None
 
-def get_client():
-    """Get or create Azure OpenAI client."""
-    global _client
-    if _client is None:
-        _client = AsyncOpenAI(
-            api_key=OPENAI_API_KEY,
-            base_url=OPENAI_BASE_URL
-        )
-    return _client
-
-def build_prompt_v2(
-    normalized_request: Dict[str, Any],
-    skill_data: Optional[Dict[str, Any]] = None
+# (field, label) of a level block, in prompt order; the first four are the
+# core SFIA attributes kept when a level has to be shortened
+LEVEL_FIELDS = [
+    ("description", "Description"),
+    ("autonomy", "Autonomy"),
+    ("influence", "Influence"),
+    ("complexity", "Complexity"),
+    ("business_skills", "Business Skills"),
+    ("knowledge", "Knowledge Required"),
+    ("behavioral_indicators", "Behavioral Indicators"),
+    ("evidence_examples", "Evidence Examples")
+]
+CORE_LEVEL_FIELDS = LEVEL_FIELDS[:4]
+LEVEL_SUMMARY_CHARS = 160
+
+
+def _clip(text: Any, max_chars: Optional[int]) -> str:
+    text = " ".join(str(text or "").split()) if max_chars else str(text or "")
+    if max_chars and len(text) > max_chars:
+        return text[:max_chars - 3].rstrip() + "..."
+    return text
+
+
+def render_level(level_data: Dict[str, Any], fields=LEVEL_FIELDS, max_field_chars: Optional[int] = None) -> str:
+    """Full block for one level (selected fields, optionally clipped)."""
+    block = f"\n=== Level {level_data['level']} ===\n"
+    for key, label in fields:
+        block += f"{label}: {_clip(level_data.get(key, ''), max_field_chars)}\n"
+    return block
+
+
+def summarize_level(level_data: Dict[str, Any]) -> str:
+    """One-line summary of a level: the start of its description."""
+    description = " ".join(str(level_data.get("description") or "").split())
+    first_sentence = description.split(". ")[0]
+    return f"- Level {level_data['level']} (summary): {_clip(first_sentence, LEVEL_SUMMARY_CHARS)}\n"
+
+
+def build_skill_context(
+    skill_data: Optional[Dict[str, Any]],
+    target_levels: Optional[List[int]] = None,
+    budget_tokens: int = PROMPT_SKILL_CONTEXT_TOKENS,
+    neighbours: int = PROMPT_LEVEL_NEIGHBOURS
 ) -> str:
     """
-    Build prompt for V2 schema with all 9 question types.
+    Skill section of the generation prompt.
+
+    Levels within `neighbours` of a target level (all levels without targets)
+    are rendered in full, the others as one-line summaries. If the section
+    exceeds `budget_tokens` (0: unlimited) it is compacted step by step:
+    neighbour levels are cut to the core fields, then summarized, then the
+    target levels' fields are clipped, then the other levels' summaries are
+    dropped, and finally every level is summarized.
 
     Args:
-        normalized_request: Validated and normalized request
-        skill_data: Optional skill data from database
+        skill_data: Skill data (skill_id, skill_name, skill_code, levels)
+        target_levels: Requested proficiency levels (target_proficiency_level)
+        budget_tokens: Token budget of the section
+        neighbours: Distance from a target level still rendered in full
 
     Returns:
-        Prompt string for AI
+        Skill context text
     """
-    question_types = normalized_request["question_type"]
-    language = normalized_request["language"]  # "en" or "vi"
-    num_questions = normalized_request["number_of_questions"]
-    difficulty = normalized_request.get("difficulty", "medium")
-    context = normalized_request.get("additional_context", "")
+    if not skill_data:
+        return "SKILL: General technical skill assessment\n"
+
+    levels = sorted(skill_data.get("levels", []), key=lambda l: l["level"])
+    targets = set(target_levels or [])
+    if targets:
+        target = [l for l in levels if l["level"] in targets]
+        nearby = [l for l in levels if l["level"] not in targets
+                  and any(abs(l["level"] - t) <= neighbours for t in targets)]
+    else:
+        target, nearby = levels, []
+    others = [l for l in levels if l not in target and l not in nearby]
 
-    # Language mapping
-    lang_name = "English" if language == "en" else "Vietnamese"
+    header = f"""
+SKILL: {skill_data.get("skill_name", "")}
+SKILL_CODE: {skill_data.get("skill_code", "")}
+SKILL_ID: {skill_data.get("skill_id")}
+"""
+    if targets:
+        header += f"TARGET LEVEL(S): {', '.join(f'L{t}' for t in sorted(targets))} (write questions for these levels; adjacent levels are given for contrast)\n"
+    header += "\nPROFICIENCY LEVELS (SFIA Framework 1-7):\n"
 
-    # Build skill context
-    skill_context = ""
-    skill_id_for_prompt = None
+    def render(target_fields, target_chars, nearby_fields, keep_summaries):
+        text = header
+        summaries = ""
+        for level_data in levels:
+            if level_data in target and target_fields is not None:
+                text += render_level(level_data, target_fields, target_chars)
+            elif level_data in nearby and nearby_fields is not None:
+                text += render_level(level_data, nearby_fields)
+            elif keep_summaries:
+                summaries += summarize_level(level_data)
+            else:
+                summaries += f"- Level {level_data['level']}\n"
+        if summaries:
+            text += "\nOTHER LEVELS:\n" + summaries
+        return text
+
+    # Most to least detailed; the first that fits the budget is used
+    steps = [
+        (LEVEL_FIELDS, None, LEVEL_FIELDS, True),
+        (LEVEL_FIELDS, None, CORE_LEVEL_FIELDS, True),
+        (LEVEL_FIELDS, None, None, True),
+        (LEVEL_FIELDS, 400, None, True),
+        (CORE_LEVEL_FIELDS, 300, None, True),
+        (CORE_LEVEL_FIELDS, 150, None, True),
+        (CORE_LEVEL_FIELDS, 150, None, False),
+        (None, None, None, True)
+    ]
+    if not targets:
+        # Every level is a target: shorten fields before anything else
+        steps = [step for step in steps if step[2] is None]
+
+    context = ""
+    for step in steps:
+        context = render(*step)
+        if budget_tokens <= 0 or count_tokens(context) <= budget_tokens:
+            return context
+
+    logger.warning(f"Skill context still over {budget_tokens} tokens after compaction, truncating")
+    return _clip(context, int(budget_tokens * BYTES_PER_TOKEN)) + "\n"
+
+
+# Instructions, type specifications and output schema shared by every
+# generation request. Sent unchanged as the system message, so it forms a
+# byte-identical prefix the provider can serve from its prompt cache; keep
+# request-specific values out of it (they go in build_prompt_v2()).
+QUESTION_SYSTEM_PROMPT_V2 = """You are an expert assessment question generator specializing in SFIA (Skills Framework for the Information Age) competency assessments. Return valid JSON only.
+
+The user message gives the skill context, the number of questions, the question types, the difficulty, the skill id and the response language.
 
-    if skill_data:
-        skill_name = skill_data.get("skill_name", "")
-        skill_id_for_prompt = skill_data.get("skill_id")
-        skill_code = skill_data.get("skill_code", "")
-        levels = skill_data.get("levels", [])
+CRITICAL INSTRUCTIONS - BEHAVIOR-BASED ASSESSMENT:
 
-        skill_context = f"""
-SKILL: {skill_name}
-SKILL_CODE: {skill_code}
-SKILL_ID: {skill_id_for_prompt}
+CORE PRINCIPLE: Measure what the person is LIKELY TO DO under responsibility, NOT what they know is correct.
 
-PROFICIENCY LEVELS (SFIA Framework 1-7):
-"""
-        for level_data in levels:
-            level_num = level_data["level"]
-            desc = level_data.get("description", "")
-            autonomy = level_data.get("autonomy", "")
-            influence = level_data.get("influence", "")
-            complexity = level_data.get("complexity", "")
-            business_skills = level_data.get("business_skills", "")
-            knowledge = level_data.get("knowledge", "")
-            behavioral_indicators = level_data.get("behavioral_indicators", "")
-            evidence_examples = level_data.get("evidence_examples", "")
-
-            skill_context += f"""
-=== Level {level_num} ===
-Description: {desc}
-Autonomy: {autonomy}
-Influence: {influence}
-Complexity: {complexity}
-Business Skills: {business_skills}
-Knowledge Required: {knowledge}
-Behavioral Indicators: {behavioral_indicators}
-Evidence Examples: {evidence_examples}
-"""
-    else:
-        skill_context = "SKILL: General technical skill assessment\n"
+AVOID in all questions:
+- Moral language ("you should", "it's wrong to")
+- "Best practice" framing
+- Knowledge recall (definitions, theory)
+- Obvious good/bad answers
+- Socially desirable answer patterns
 
-    # Build additional context
-    additional_context_text = ""
-    if context:
-        additional_context_text = f"""
-ADDITIONAL CONTEXT:
-{context}
-"""
+USE skill knowledge as follows:
+1. "Behavioral Indicators" → craft realistic workplace scenarios
+2. "Evidence Examples" → create authentic situational contexts
+3. "Autonomy/Influence/Complexity" → calibrate decision scope per level
+4. "Knowledge Required" → inform scenario background, NOT test recall
 
-    # Calculate type distribution
-    num_types = len(question_types)
-    base_per_type = num_questions // num_types
-    remainder = num_questions % num_types
+LEVEL TARGETING:
+- L1-2: Scenarios requiring guidance, following instructions, seeking confirmation
+- L3-4: Scenarios requiring independent judgment within defined scope
+- L5-7: Scenarios requiring strategic decisions, organizational impact, leading others
 
-    # Build question type instructions with distribution
-    type_instructions = f"""
-QUESTION TYPES TO GENERATE ({num_questions} questions total across {num_types} types):
-Distribution: Generate approximately {base_per_type} question(s) per type{f", with {remainder} extra distributed among types" if remainder > 0 else ""}.
-"""
-    for qtype in question_types:
-        type_instructions += f"- {qtype}\n"
-
-        # Add specific instructions per type
-        if qtype == "MultipleChoice":
-            type_instructions += "  * Single correct answer, 2-4 options\n"
-        elif qtype == "MultipleAnswer":
-            type_instructions += "  * Multiple correct answers possible, 2-4 options\n"
-        elif qtype == "TrueFalse":
-            type_instructions += "  * Exactly 2 options: True and False\n"
-        elif qtype == "ShortAnswer":
-            type_instructions += "  * Provide grading_rubric with keywords\n"
-        elif qtype == "LongAnswer":
-            type_instructions += "  * Provide grading_rubric with criteria\n"
-        elif qtype == "CodingChallenge":
-            type_instructions += "  * Include code_snippet and grading_rubric with test_cases\n"
-        elif qtype == "Scenario":
-            type_instructions += "  * Complex scenario with grading_rubric\n"
-        elif qtype == "SituationalJudgment":
-            type_instructions += """  * FORCED-CHOICE BEHAVIORAL ASSESSMENT (SJT)
+QUESTION TYPE SPECIFICATIONS (apply those of the requested types):
+- MultipleChoice
+  * Single correct answer, 2-4 options
+- MultipleAnswer
+  * Multiple correct answers possible, 2-4 options
+- TrueFalse
+  * Exactly 2 options: True and False
+- ShortAnswer
+  * Provide grading_rubric with keywords
+- LongAnswer
+  * Provide grading_rubric with criteria
+- CodingChallenge
+  * Include code_snippet and grading_rubric with test_cases
+- Scenario
+  * Complex scenario with grading_rubric
+- SituationalJudgment
+  * FORCED-CHOICE BEHAVIORAL ASSESSMENT (SJT)
   * FIXED CONTEXT - Scenario MUST explicitly define:
     - Task type (bug fix, feature, analysis, decision, coordination)
     - Constraints (deadline, documentation availability, risk level)
@@ -154,68 +229,18 @@ Distribution: Generate approximately {base_per_type} question(s) per type{f", wi
     - Responsibility ↔ Escalation
     - Initiative ↔ Compliance
   * effectiveness_level maps to SFIA: MostEffective=L4, Effective=L3, Ineffective=L2, CounterProductive=L1
-"""
-        elif qtype == "Rating":
-            type_instructions += "  * 5 rating scale options, all marked as correct\n"
-
-    # Add distribution reminder
-    allowed_types_str = ", ".join(question_types)
-    type_instructions += f"""
-TYPE DISTRIBUTION RULE:
-- Total questions required: {num_questions}
-- Number of types: {num_types}
-- ⚠️ ONLY USE THESE EXACT TYPES: [{allowed_types_str}]
-- DO NOT generate any other question types
-- Distribute questions across ALL listed types
-- Each type should have at least 1 question if possible
-- Vary the distribution naturally (e.g., for 5 questions with 3 types: 2-2-1 or 2-1-2)
-"""
-
-    prompt = f"""You are an expert assessment question generator specializing in SFIA (Skills Framework for the Information Age) competency assessments.
-
-{skill_context}
-
-{additional_context_text}
-
-TASK:
-Generate EXACTLY {num_questions} assessment questions in {lang_name}.
-⚠️ QUANTITY REQUIREMENT: You MUST generate exactly {num_questions} questions - no more, no less. This is mandatory.
-
-CRITICAL INSTRUCTIONS - BEHAVIOR-BASED ASSESSMENT:
-
-CORE PRINCIPLE: Measure what the person is LIKELY TO DO under responsibility, NOT what they know is correct.
-
-AVOID in all questions:
-- Moral language ("you should", "it's wrong to")
-- "Best practice" framing
-- Knowledge recall (definitions, theory)
-- Obvious good/bad answers
-- Socially desirable answer patterns
-
-USE skill knowledge as follows:
-1. "Behavioral Indicators" → craft realistic workplace scenarios
-2. "Evidence Examples" → create authentic situational contexts
-3. "Autonomy/Influence/Complexity" → calibrate decision scope per level
-4. "Knowledge Required" → inform scenario background, NOT test recall
-
-LEVEL TARGETING:
-- L1-2: Scenarios requiring guidance, following instructions, seeking confirmation
-- L3-4: Scenarios requiring independent judgment within defined scope
-- L5-7: Scenarios requiring strategic decisions, organizational impact, leading others
-
-{type_instructions}
-
-DIFFICULTY LEVEL: {difficulty}
+- Rating
+  * 5 rating scale options, all marked as correct
 
 OUTPUT REQUIREMENTS:
 Return ONLY valid JSON matching this exact schema (no markdown, no explanations):
 
-{{
+{
   "questions": [
-    {{
-      "skill_id": "{skill_id_for_prompt if skill_id_for_prompt else 'null'}",
+    {
+      "skill_id": "<SKILL ID from the request, or null>",
       "type": "MultipleChoice|MultipleAnswer|TrueFalse|ShortAnswer|LongAnswer|CodingChallenge|Scenario|SituationalJudgment|Rating",
-      "content": "Clear, professional question text in {lang_name}",
+      "content": "Clear, professional question text in the response language",
       "code_snippet": "Optional code for context",
       "media_url": null,
       "target_level": 1-7,
@@ -224,24 +249,24 @@ Return ONLY valid JSON matching this exact schema (no markdown, no explanations)
       "time_limit_seconds": 60-900,
       "tags": ["relevant", "tags"],
       "options": [
-        {{
+        {
           "content": "Option text",
           "is_correct": true|false,
           "display_order": 1,
           "explanation": "Why correct/incorrect",
           "effectiveness_level": "MostEffective|Effective|Ineffective|CounterProductive"  // Only for SJT
-        }}
+        }
       ],
-      "grading_rubric": "{{\\"criteria\\":[...]}}" or null,  // JSON string for text/coding questions
+      "grading_rubric": "{\\"criteria\\":[...]}" or null,  // JSON string for text/coding questions
       "explanation": "Answer explanation",
       "hints": ["helpful hint 1", "helpful hint 2"]
-    }}
+    }
   ]
-}}
+}
 
 IMPORTANT RULES:
-1. ⚠️ MANDATORY: Generate EXACTLY {num_questions} questions. Count them before responding.
-2. Use the exact skill_id provided above for ALL questions (do not generate random UUIDs)
+1. ⚠️ MANDATORY: Generate EXACTLY the requested number of questions. Count them before responding.
+2. Use the exact SKILL ID from the request for ALL questions (do not generate random UUIDs)
 3. For MultipleChoice: Exactly 1 option with is_correct=true
 4. For MultipleAnswer: 2+ options with is_correct=true
 5. For TrueFalse: Exactly 2 options (True/False)
@@ -251,7 +276,8 @@ IMPORTANT RULES:
 9. For Rating: 3-5 options, all with is_correct=true
 10. Use clear, professional language
 11. Ensure questions are at appropriate difficulty level
-12. Return ONLY the JSON, no markdown blocks or explanations
+12. Only use the question types listed in the request
+13. Return ONLY the JSON, no markdown blocks or explanations
 
 Generate questions that are:
 - Behavior-revealing: expose what candidates actually DO, not what they know
@@ -260,24 +286,387 @@ Generate questions that are:
 - Trade-off driven: force meaningful decisions between competing values
 - Level-differentiated: options map clearly to SFIA behavioral signatures
 - Unambiguous: clear context with defined constraints
+"""
+
+
+def build_prompt_v2(
+    normalized_request: Dict[str, Any],
+    skill_data: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build the request-specific part of the V2 prompt (the user message).
+
+    Instructions shared by all requests are in QUESTION_SYSTEM_PROMPT_V2.
+    The skill context comes first, so chunks of one request also share it
+    as a prefix.
+
+    Args:
+        normalized_request: Validated and normalized request
+        skill_data: Optional skill data from database
+
+    Returns:
+        Prompt string for AI
+    """
+    question_types = normalized_request["question_type"]
+    language = normalized_request["language"]  # "en" or "vi"
+    num_questions = normalized_request["number_of_questions"]
+    difficulty = normalized_request.get("difficulty", "medium")
+    context = normalized_request.get("additional_context", "")
+
+    # Language mapping
+    lang_name = "English" if language == "en" else "Vietnamese"
+
+    # Build skill context (targeted levels in full, within the token budget)
+    skill_context = build_skill_context(skill_data, normalized_request.get("target_proficiency_level"))
+    skill_id_for_prompt = skill_data.get("skill_id") if skill_data else None
+
+    # Build additional context
+    additional_context_text = ""
+    if context:
+        additional_context_text = f"""
+ADDITIONAL CONTEXT:
+{context}
+"""
+
+    # Questions already accepted from earlier chunks (replacement requests)
+    avoid_text = ""
+    if normalized_request.get("avoid_questions"):
+        avoid_text = "\nALREADY USED QUESTIONS (do NOT repeat or paraphrase these; cover different situations, sub-topics and options):\n"
+        avoid_text += "".join(f"- {content}\n" for content in normalized_request["avoid_questions"])
 
+    # Calculate type distribution
+    num_types = len(question_types)
+    base_per_type = num_questions // num_types
+    remainder = num_questions % num_types
+
+    # Requested types with distribution (specifications are in the system prompt)
+    allowed_types_str = ", ".join(question_types)
+    type_instructions = f"""
+QUESTION TYPES TO GENERATE ({num_questions} questions total across {num_types} types):
+Distribution: Generate approximately {base_per_type} question(s) per type{f", with {remainder} extra distributed among types" if remainder > 0 else ""}.
+"""
+    type_instructions += "".join(f"- {qtype}\n" for qtype in question_types)
+    type_instructions += f"""
+TYPE DISTRIBUTION RULE:
+- Total questions required: {num_questions}
+- Number of types: {num_types}
+- ⚠️ ONLY USE THESE EXACT TYPES: [{allowed_types_str}]
+- DO NOT generate any other question types
+- Distribute questions across ALL listed types
+- Each type should have at least 1 question if possible
+- Vary the distribution naturally (e.g., for 5 questions with 3 types: 2-2-1 or 2-1-2)
+"""
+
+    prompt = f"""{skill_context.lstrip()}
+{additional_context_text}
+TASK:
+Generate EXACTLY {num_questions} assessment questions in {lang_name}.
+⚠️ QUANTITY REQUIREMENT: You MUST generate exactly {num_questions} questions - no more, no less. This is mandatory.
+
+SKILL ID: {skill_id_for_prompt if skill_id_for_prompt else 'null'}
+DIFFICULTY LEVEL: {difficulty}
+RESPONSE LANGUAGE: {lang_name}
+{type_instructions}{avoid_text}
 FINAL CHECK: Your response MUST contain exactly {num_questions} question objects in the "questions" array.
 """
 
     return prompt
 
 
-async def generate_questions_v2(
+def split_count(total: int, size: int) -> List[int]:
+    """Split `total` into the fewest near-equal parts of at most `size`."""
+    if total <= 0:
+        return []
+    parts = -(-total // max(1, size))
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def distribute_by_type(total: int, question_types: List[str]) -> Dict[str, int]:
+    """Per-type targets: an even share per type, the remainder on the first types."""
+    base, remainder = divmod(total, len(question_types))
+    return {qtype: base + (1 if i < remainder else 0) for i, qtype in enumerate(question_types)}
+
+
+def plan_generation_chunks(
+    normalized_request: Dict[str, Any],
+    counts: Optional[Dict[str, int]] = None,
+    chunk_size: int = GENERATION_CHUNK_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    Split a generation request into sub-requests of at most chunk_size questions.
+
+    Args:
+        normalized_request: Validated request (question_type, number_of_questions, ...)
+        counts: Questions still needed per type; None asks for
+                number_of_questions across all requested types
+        chunk_size: Maximum questions per sub-request (lowered per type when
+                    the learned output size would not fit one response)
+
+    Returns:
+        List of sub-requests (copies of the request with their own
+        number_of_questions and question_type)
+    """
+    # Per type, at most chunk_size questions and no more than the planned
+    # output of one response can hold
+    planner = get_token_planner()
+    limits = {
+        qtype: min(chunk_size, planner.max_questions_per_call("generate_questions", qtype))
+        for qtype in normalized_request["question_type"]
+    }
+
+    if counts is None:
+        total = normalized_request["number_of_questions"]
+        if total <= min(limits.values()):
+            return [dict(normalized_request, number_of_questions=total)] if total > 0 else []
+        counts = distribute_by_type(total, normalized_request["question_type"])
+
+    chunks = []
+    for qtype, count in counts.items():
+        for part in split_count(count, limits.get(qtype, chunk_size)):
+            chunks.append(dict(normalized_request, question_type=[qtype], number_of_questions=part))
+    return chunks
+
+
+def question_key(question: Dict[str, Any]) -> str:
+    """Exact-duplicate key: whitespace / case normalized content."""
+    return " ".join(str(question.get("content", "")).split()).casefold()
+
+
+def chunk_completion_args(
+    request: Dict[str, Any],
+    skill_data: Optional[Dict[str, Any]] = None,
+    endpoint: str = "generate_questions"
+) -> Dict[str, Any]:
+    """Chat completion arguments for one sub-request."""
+    remaining = request["number_of_questions"]
+
+    # Build prompt
+    prompt = build_prompt_v2(request, skill_data)
+    logger.debug(f"Prompt built: {len(prompt)} characters")
+
+    # Reserve output tokens from the learned size of each requested type
+    counts = distribute_by_type(remaining, request["question_type"])
+    max_tokens = get_token_planner().question_max_tokens(endpoint, counts, QUESTION_SYSTEM_PROMPT_V2 + prompt)
+
+    return {
+        "model": LLM_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": QUESTION_SYSTEM_PROMPT_V2
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+        "response_format": {"type": "json_object"}
+    }
+
+
+def plan_initial_chunks(
+    normalized_request: Dict[str, Any],
+    chunk_size: int = GENERATION_CHUNK_SIZE
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, int]]]:
+    """
+    First-round chunks and the per-type targets they imply.
+
+    Returns:
+        (chunks, targets); targets is None when the request is one mixed chunk
+    """
+    chunks = plan_generation_chunks(normalized_request, chunk_size=chunk_size)
+    targets = None
+    if len(chunks) > 1 or chunks[0]["question_type"] != normalized_request["question_type"]:
+        targets = distribute_by_type(normalized_request["number_of_questions"], normalized_request["question_type"])
+    return chunks, targets
+
+
+def plan_shortfall(
+    normalized_request: Dict[str, Any],
+    targets: Optional[Dict[str, int]],
+    questions: List[Dict[str, Any]],
+    chunk_size: int = GENERATION_CHUNK_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    Replacement chunks for the questions still missing (per type when targets
+    are set). Each chunk lists the accepted questions of its types so the
+    model replaces duplicates instead of paraphrasing them again.
+    """
+    if targets is None:
+        chunks = plan_generation_chunks(
+            dict(normalized_request, number_of_questions=normalized_request["number_of_questions"] - len(questions)),
+            chunk_size=chunk_size
+        )
+    else:
+        have: Dict[str, int] = {}
+        for question in questions:
+            have[question.get("type")] = have.get(question.get("type"), 0) + 1
+        missing = {qtype: target - have.get(qtype, 0) for qtype, target in targets.items()}
+        chunks = plan_generation_chunks(
+            normalized_request,
+            counts={qtype: n for qtype, n in missing.items() if n > 0},
+            chunk_size=chunk_size
+        )
+
+    for chunk in chunks:
+        accepted = [
+            " ".join(str(q.get("content", "")).split())[:AVOID_QUESTION_CHARS]
+            for q in questions if q.get("type") in chunk["question_type"]
+        ]
+        if accepted:
+            chunk["avoid_questions"] = accepted[-AVOID_QUESTIONS_MAX:]
+    return chunks
+
+
+def request_skill_id(
     normalized_request: Dict[str, Any],
     skill_data: Optional[Dict[str, Any]] = None
+) -> Optional[str]:
+    """skill_id to stamp on generated questions (skill data first, then the request)."""
+    if skill_data and "skill_id" in skill_data:
+        return skill_data["skill_id"]
+    if normalized_request.get("skills") and len(normalized_request["skills"]) > 0:
+        return normalized_request["skills"][0].get("skill_id")
+    return None
+
+
+def inject_skill_id(question: Dict[str, Any], skill_id: Optional[str]):
+    """Set skill_id on a question if not already present or if null."""
+    if skill_id and (not question.get("skill_id") or question.get("skill_id") == "null"):
+        question["skill_id"] = skill_id
+        logger.debug(f"Injected skill_id {skill_id} into question")
+
+
+def generation_metadata(
+    normalized_request: Dict[str, Any],
+    skill_data: Optional[Dict[str, Any]],
+    total_questions: int,
+    attempts: int,
+    calls: int,
+    duplicates_dropped: int = 0
+) -> Dict[str, Any]:
+    """Metadata block of a generation response."""
+    return {
+        "total_questions": total_questions,
+        "requested_questions": normalized_request["number_of_questions"],
+        "generation_attempts": attempts,
+        "generation_calls": calls,
+        "duplicates_dropped": duplicates_dropped,
+        "generation_timestamp": datetime.now().isoformat(),
+        "ai_model": LLM_MODEL,
+        "skill_id": skill_data.get("skill_id") if skill_data else None,
+        "skill_name": skill_data.get("skill_name") if skill_data else None,
+        "language": normalized_request["language"]
+    }
+
+
+async def generate_question_chunk(
+    request: Dict[str, Any],
+    skill_data: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Generate the questions of one sub-request with a single LLM call.
+
+    Valid questions are kept even when the JSON is malformed or truncated;
+    items that are broken, off-schema or of an unrequested type go to one
+    small repair call (see output_repair.py) instead of a regeneration.
+
+    Returns:
+        Valid questions of the allowed types (may be fewer than requested)
+
+    Raises:
+        ValueError: If the response contains no questions array
+    """
+    remaining = request["number_of_questions"]
+
+    response = await chat_completion("generate_questions", units=remaining, **chunk_completion_args(request, skill_data))
+    truncated = response.choices[0].finish_reason == "length"
+
+    response_text = response.choices[0].message.content or ""
+    logger.debug(f"Response length: {len(response_text)} characters")
+
+    items, broken = salvage_questions(response_text)
+    if not truncated and not broken:
+        get_token_planner().record_questions(
+            "generate_questions", items, getattr(response.usage, "completion_tokens", None)
+        )
+
+    allowed_types = set(request["question_type"])
+    valid_questions, invalid = check_questions(items, allowed_types)
+    broken += invalid
+    if broken:
+        valid_questions += await repair_questions(broken, request)
+
+    logger.info(f"Chunk {sorted(allowed_types)}: got {len(valid_questions)} valid questions (needed {remaining})")
+    return valid_questions
+
+
+async def stream_question_chunk(
+    request: Dict[str, Any],
+    skill_data: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of generate_question_chunk(): yields each valid
+    question as soon as its JSON object is complete, then the repaired ones.
+
+    Raises:
+        ValueError: If the response contains no questions array
+    """
+    parser = JsonArrayStreamParser("questions")
+    allowed_types = set(request["question_type"])
+    count = 0
+    streamed = []
+    broken = []
+
+    args = chunk_completion_args(request, skill_data, "generate_questions_stream")
+    async for delta in chat_completion_stream("generate_questions_stream", request["number_of_questions"], **args):
+        for item in parser.feed(delta):
+            streamed.append(item)
+            valid, invalid = check_questions([item], allowed_types)
+            broken += invalid
+            for question in valid:
+                count += 1
+                yield question
+
+    if parser.finished and not parser.errors:
+        get_token_planner().record_questions("generate_questions_stream", streamed)
+
+    if not parser.started:
+        raise ValueError("Response does not contain 'questions' array")
+    if not parser.finished:
+        logger.warning("Stream ended before the questions array was closed (truncated response)")
+    broken += parser_broken_items(parser)
+    if broken:
+        for question in await repair_questions(broken, request):
+            count += 1
+            yield question
+    logger.info(f"Chunk {sorted(allowed_types)}: streamed {count} valid questions (needed {request['number_of_questions']})")
+
+
+async def generate_questions_v2(
+    normalized_request: Dict[str, Any],
+    skill_data: Optional[Dict[str, Any]] = None,
+    concurrency: int = GENERATION_CONCURRENCY,
+    chunk_size: int = GENERATION_CHUNK_SIZE
 ) -> Dict[str, Any]:
     """
     Generate questions using Azure OpenAI with V2 schema.
-    Implements retry logic to ensure exact question count.
+
+    Requests larger than chunk_size are split per question type into chunks
+    that are generated concurrently (at most `concurrency` calls at once) and
+    merged; near-duplicates (see near_duplicates.py) are dropped. Shortfalls
+    (duplicates, failed chunks, short or filtered answers) are requested again
+    in up to 3 rounds; replacement requests list the questions already
+    accepted so the model does not repeat them.
 
     Args:
         normalized_request: Validated request from request_validator
         skill_data: Optional skill data from database
+        concurrency: Maximum LLM calls in flight
+        chunk_size: Maximum questions per LLM call
 
     Returns:
         Dict with 'questions' and 'metadata' matching output_question_schema_v2
@@ -286,112 +675,59 @@ async def generate_questions_v2(
     logger.info(f"Starting AI question generation: {requested_count} questions requested")
     logger.debug(f"Request: {normalized_request}")
 
-    all_questions = []
+    all_questions: List[Dict[str, Any]] = []
+    duplicates = NearDuplicateDetector()
     max_attempts = 3
     attempt = 0
+    calls = 0
+    last_error: Optional[Exception] = None
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_chunk(chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await generate_question_chunk(chunk, skill_data)
 
     try:
-        while len(all_questions) < requested_count and attempt < max_attempts:
+        # Per-type targets once the request is split by type (None: one mixed chunk)
+        chunks, targets = plan_initial_chunks(normalized_request, chunk_size)
+
+        while chunks and attempt < max_attempts:
             attempt += 1
-            remaining = requested_count - len(all_questions)
-
-            # Adjust request for remaining questions
-            adjusted_request = normalized_request.copy()
-            adjusted_request["number_of_questions"] = remaining
-
-            logger.info(f"Attempt {attempt}/{max_attempts}: Generating {remaining} questions")
-
-            # Build prompt
-            prompt = build_prompt_v2(adjusted_request, skill_data)
-            logger.debug(f"Prompt built: {len(prompt)} characters")
-
-            # Calculate max_tokens - be generous
-            # SJT questions are ~600-1000 tokens each
-            estimated_tokens = remaining * 1000 + 1000  # 1000 per question + buffer
-            max_tokens = min(max(estimated_tokens, 8192), 16000)
-
-            client = get_client()
-            response = await client.chat.completions.create(
-                model=LLM_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are an expert assessment question generator. Return valid JSON only. CRITICAL: Generate EXACTLY {remaining} questions - count them before responding."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=max_tokens,
-                response_format={"type": "json_object"}
+            calls += len(chunks)
+            logger.info(
+                f"Attempt {attempt}/{max_attempts}: generating "
+                f"{sum(c['number_of_questions'] for c in chunks)} questions in {len(chunks)} chunk(s)"
             )
 
-            logger.info("Received response from Azure OpenAI")
-
-            # Parse response
-            response_text = response.choices[0].message.content.strip()
-            logger.debug(f"Response length: {len(response_text)} characters")
-
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                logger.debug("Removing markdown code blocks")
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
-
-            # Parse JSON
-            try:
-                result = json.loads(response_text)
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON parse error: {e}")
-                logger.error(f"Response text: {response_text[:500]}...")
-                if attempt < max_attempts:
-                    logger.info("Retrying due to JSON parse error...")
+            results = await asyncio.gather(*(run_chunk(chunk) for chunk in chunks), return_exceptions=True)
+
+            # Merge in plan order, dropping near-duplicates
+            for chunk, result in zip(chunks, results):
+                if isinstance(result, Exception):
+                    last_error = result
+                    logger.error(f"Chunk of {chunk['number_of_questions']} {chunk['question_type']} failed: {result}")
                     continue
-                raise ValueError(f"Failed to parse AI response as JSON: {str(e)}")
-
-            # Validate structure
-            if "questions" not in result:
-                logger.warning("Response missing 'questions' key, attempting to wrap")
-                if isinstance(result, list):
-                    result = {"questions": result}
-                else:
-                    if attempt < max_attempts:
-                        logger.info("Retrying due to invalid structure...")
-                        continue
-                    raise ValueError("Response does not contain 'questions' array")
-
-            batch_questions = result["questions"]
-            logger.info(f"Attempt {attempt}: Got {len(batch_questions)} questions (needed {remaining})")
-
-            # Filter out questions with invalid types
-            allowed_types = set(adjusted_request["question_type"])
-            valid_questions = []
-            invalid_count = 0
-            for q in batch_questions:
-                q_type = q.get("type", "")
-                if q_type in allowed_types:
-                    valid_questions.append(q)
-                else:
-                    invalid_count += 1
-                    logger.warning(f"Filtered out question with invalid type: '{q_type}' (allowed: {allowed_types})")
-
-            if invalid_count > 0:
-                logger.info(f"Filtered {invalid_count} questions with wrong types, kept {len(valid_questions)}")
-
-            # Add to collection
-            all_questions.extend(valid_questions)
-
-            # If we got enough, break
-            if len(all_questions) >= requested_count:
-                break
-
-        # Trim if we got too many
+                for question in result:
+                    if duplicates.add(question):
+                        all_questions.append(question)
+
+            # Plan replacements for the shortfall (duplicates, failed or short chunks)
+            chunks = plan_shortfall(normalized_request, targets, all_questions, chunk_size)
+
+        if not all_questions and last_error is not None:
+            raise last_error
+
+        # Trim if we got too many (per type first, so the distribution holds)
         if len(all_questions) > requested_count:
             logger.info(f"Trimming from {len(all_questions)} to {requested_count} questions")
+            if targets is not None:
+                kept, used = [], {}
+                for question in all_questions:
+                    qtype = question.get("type")
+                    if used.get(qtype, 0) < targets.get(qtype, 0):
+                        used[qtype] = used.get(qtype, 0) + 1
+                        kept.append(question)
+                all_questions = kept
             all_questions = all_questions[:requested_count]
 
         logger.info(f"Final result: {len(all_questions)} questions (requested: {requested_count})")
@@ -400,30 +736,14 @@ async def generate_questions_v2(
             logger.warning(f"Could not generate enough questions after {max_attempts} attempts")
 
         # Ensure each question has skill_id from request
-        skill_id_from_request = None
-        if skill_data and "skill_id" in skill_data:
-            skill_id_from_request = skill_data["skill_id"]
-        elif normalized_request.get("skills") and len(normalized_request["skills"]) > 0:
-            skill_id_from_request = normalized_request["skills"][0].get("skill_id")
-
-        # Inject skill_id into each question if not already present or if null
-        if skill_id_from_request:
-            for question in all_questions:
-                if not question.get("skill_id") or question.get("skill_id") == "null":
-                    question["skill_id"] = skill_id_from_request
-                    logger.debug(f"Injected skill_id {skill_id_from_request} into question")
+        skill_id_from_request = request_skill_id(normalized_request, skill_data)
+        for question in all_questions:
+            inject_skill_id(question, skill_id_from_request)
 
         # Add metadata
-        metadata = {
-            "total_questions": len(all_questions),
-            "requested_questions": requested_count,
-            "generation_attempts": attempt,
-            "generation_timestamp": datetime.now().isoformat(),
-            "ai_model": LLM_MODEL,
-            "skill_id": skill_data.get("skill_id") if skill_data else None,
-            "skill_name": skill_data.get("skill_name") if skill_data else None,
-            "language": normalized_request["language"]
-        }
+        metadata = generation_metadata(
+            normalized_request, skill_data, len(all_questions), attempt, calls, duplicates.duplicates
+        )
 
         # Return V2 format
         output = {
@@ -439,6 +759,109 @@ async def generate_questions_v2(
         raise ValueError(f"Failed to generate questions: {str(e)}")
 
 
+async def stream_questions_v2(
+    normalized_request: Dict[str, Any],
+    skill_data: Optional[Dict[str, Any]] = None,
+    concurrency: int = GENERATION_CONCURRENCY,
+    chunk_size: int = GENERATION_CHUNK_SIZE
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streaming variant of generate_questions_v2().
+
+    Chunks are planned and retried the same way, but every chunk is streamed
+    and each question is yielded the moment its object is complete, has an
+    allowed type and is not a near-duplicate. Per-type targets are enforced as
+    questions arrive (there is no trimming afterwards).
+
+    Yields:
+        ("question", question) for each accepted question, then
+        ("metadata", metadata) with the generate_questions_v2 metadata plus
+        time_to_first_question_ms
+
+    Raises:
+        ValueError: If no question could be generated
+    """
+    requested_count = normalized_request["number_of_questions"]
+    logger.info(f"Starting streamed question generation: {requested_count} questions requested")
+
+    start = time.perf_counter()
+    first_question_ms: Optional[float] = None
+    emitted: List[Dict[str, Any]] = []
+    used: Dict[str, int] = {}
+    duplicates = NearDuplicateDetector()
+    max_attempts = 3
+    attempt = 0
+    calls = 0
+    last_error: Optional[Exception] = None
+    skill_id = request_skill_id(normalized_request, skill_data)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    queue: asyncio.Queue = asyncio.Queue()
+    tasks: List[asyncio.Task] = []
+
+    async def run_chunk(chunk: Dict[str, Any]):
+        try:
+            async with semaphore:
+                async for question in stream_question_chunk(chunk, skill_data):
+                    queue.put_nowait(question)
+        except Exception as e:
+            logger.error(f"Chunk of {chunk['number_of_questions']} {chunk['question_type']} failed: {e}")
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(None)
+
+    chunks, targets = plan_initial_chunks(normalized_request, chunk_size)
+    try:
+        while chunks and attempt < max_attempts:
+            attempt += 1
+            calls += len(chunks)
+            logger.info(
+                f"Attempt {attempt}/{max_attempts}: streaming "
+                f"{sum(c['number_of_questions'] for c in chunks)} questions in {len(chunks)} chunk(s)"
+            )
+            tasks = [asyncio.create_task(run_chunk(chunk)) for chunk in chunks]
+            running = len(tasks)
+            while running:
+                item = await queue.get()
+                if item is None:
+                    running -= 1
+                    continue
+                if isinstance(item, Exception):
+                    last_error = item
+                    continue
+
+                qtype = item.get("type")
+                if targets is not None and used.get(qtype, 0) >= targets.get(qtype, 0):
+                    continue
+                if len(emitted) >= requested_count:
+                    continue
+                if not duplicates.add(item):
+                    continue
+                used[qtype] = used.get(qtype, 0) + 1
+                inject_skill_id(item, skill_id)
+                emitted.append(item)
+                if first_question_ms is None:
+                    first_question_ms = round((time.perf_counter() - start) * 1000, 1)
+                yield "question", item
+
+            chunks = plan_shortfall(normalized_request, targets, emitted, chunk_size)
+
+        if not emitted and last_error is not None:
+            raise ValueError(f"Failed to generate questions: {str(last_error)}")
+        if len(emitted) < requested_count:
+            logger.warning(f"Could not generate enough questions after {max_attempts} attempts")
+
+        metadata = generation_metadata(
+            normalized_request, skill_data, len(emitted), attempt, calls, duplicates.duplicates
+        )
+        metadata["time_to_first_question_ms"] = first_question_ms
+        logger.info(f"Streamed {len(emitted)} questions (requested: {requested_count}), first after {first_question_ms} ms")
+        yield "metadata", metadata
+    finally:
+        # Client went away or generation failed: stop the outstanding LLM streams
+        for task in tasks:
+            task.cancel()
+
+
 async def test_generator():
     """Test the generator with sample data."""
     test_request = {
@@ -468,6 +891,5 @@ async def test_generator():
 
 
 if __name__ == "__main__":
-    import asyncio
     logging.basicConfig(level=logging.DEBUG)
     asyncio.run(test_generator())
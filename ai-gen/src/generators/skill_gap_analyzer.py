@@ -4,27 +4,112 @@ Analyzes skill gaps and provides AI-generated insights and recommendations
 """
 
 import json
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
-from openai import AsyncOpenAI
 
-from config.settings import OPENAI_API_KEY, OPENAI_BASE_URL, LLM_MODEL
+from config.settings import (
+    LLM_MODEL,
+    GAP_ANALYSIS_CONCURRENCY,
+    GAP_ANALYSIS_TIMEOUT,
+    GAP_ANALYSIS_BATCH_MODE,
+    GAP_ANALYSIS_BATCH_SIZE
+)
+from .llm_gateway import chat_completion
+from .token_planner import get_token_planner
 
 logger = logging.getLogger(__name__)
 
-# Azure OpenAI client (lazy-loaded)
-_client = None
+# SFIA level names
+LEVEL_NAMES = {
+    0: "None",
+    1: "Follow",
+    2: "Assist",
+    3: "Apply",
+    4: "Enable",
+    5: "Ensure/Advise",
+    6: "Initiate",
+    7: "Set Strategy"
+}
+
+# Fields of one gap analysis returned by the model, with their types
+ANALYSIS_FIELDS = {
+    "ai_analysis": str,
+    "ai_recommendation": str,
+    "priority_rationale": str,
+    "estimated_effort": str,
+    "key_actions": list,
+    "potential_blockers": list
+}
+
+
+# Instructions and output schemas shared by every gap; sent unchanged as the
+# system message so they form a cacheable prompt prefix
+GAP_ANALYSIS_SYSTEM_PROMPT = """You are an expert HR consultant specializing in skill development and competency frameworks (SFIA). Provide practical, actionable insights. Always return valid JSON.
+
+The user message gives the employee, the role, one skill gap and the RESPONSE LANGUAGE.
 
+TASK:
+Analyze this skill gap and provide insights. Consider:
+1. Why this gap matters for the role
+2. Business impact of not closing the gap
+3. Realistic strategies to close the gap
+4. Priority and urgency assessment
 
-def get_client():
-    """Get or create Azure OpenAI client."""
-    global _client
-    if _client is None:
-        _client = AsyncOpenAI(
-            api_key=OPENAI_API_KEY,
-            base_url=OPENAI_BASE_URL
-        )
-    return _client
+OUTPUT REQUIREMENTS:
+Return ONLY valid JSON matching this exact schema (no markdown, no explanations):
+
+{
+  "ai_analysis": "Detailed analysis of why this gap matters and its impact (2-4 sentences in the response language)",
+  "ai_recommendation": "Specific, actionable recommendation to close this gap (2-4 sentences in the response language)",
+  "priority_rationale": "Brief explanation of priority level in the response language",
+  "estimated_effort": "Estimated effort to close gap (e.g., '3-6 months with focused training')",
+  "key_actions": ["Action 1", "Action 2", "Action 3"],
+  "potential_blockers": ["Blocker 1", "Blocker 2"]
+}
+
+IMPORTANT:
+- Be specific and actionable
+- Consider the gap size when recommending approach
+- Write all text fields in the response language
+- Return ONLY valid JSON
+"""
+
+BATCH_GAP_ANALYSIS_SYSTEM_PROMPT = """You are an expert HR consultant specializing in skill development and competency frameworks (SFIA). Provide practical, actionable insights. Always return valid JSON.
+
+The user message gives the employee, the role, several numbered skill gaps and the RESPONSE LANGUAGE.
+
+TASK:
+Analyze EACH skill gap independently and provide insights. For each gap consider:
+1. Why this gap matters for the role
+2. Business impact of not closing the gap
+3. Realistic strategies to close the gap
+4. Priority and urgency assessment
+
+OUTPUT REQUIREMENTS:
+Return ONLY valid JSON matching this exact schema (no markdown, no explanations),
+with exactly one entry per gap_id listed in the user message:
+
+{
+  "analyses": [
+    {
+      "gap_id": 1,
+      "ai_analysis": "Detailed analysis of why this gap matters and its impact (2-4 sentences in the response language)",
+      "ai_recommendation": "Specific, actionable recommendation to close this gap (2-4 sentences in the response language)",
+      "priority_rationale": "Brief explanation of priority level in the response language",
+      "estimated_effort": "Estimated effort to close gap (e.g., '3-6 months with focused training')",
+      "key_actions": ["Action 1", "Action 2", "Action 3"],
+      "potential_blockers": ["Blocker 1", "Blocker 2"]
+    }
+  ]
+}
+
+IMPORTANT:
+- Be specific and actionable
+- Consider each gap size when recommending approach
+- Write all text fields in the response language
+- Return ONLY valid JSON
+"""
 
 
 def build_gap_analysis_prompt(
@@ -40,29 +125,16 @@ def build_gap_analysis_prompt(
     language: str = "en"
 ) -> str:
     """
-    Build prompt for analyzing a skill gap.
+    Build the gap-specific prompt (the user message; instructions are in
+    GAP_ANALYSIS_SYSTEM_PROMPT).
     """
     lang_name = "English" if language == "en" else "Vietnamese"
     gap_size = required_level - current_level
 
-    # SFIA level names
-    level_names = {
-        0: "None",
-        1: "Follow",
-        2: "Assist",
-        3: "Apply",
-        4: "Enable",
-        5: "Ensure/Advise",
-        6: "Initiate",
-        7: "Set Strategy"
-    }
-
-    current_level_name = level_names.get(current_level, f"Level {current_level}")
-    required_level_name = level_names.get(required_level, f"Level {required_level}")
-
-    prompt = f"""You are an expert HR consultant specializing in skill development and competency frameworks (SFIA).
+    current_level_name = LEVEL_NAMES.get(current_level, f"Level {current_level}")
+    required_level_name = LEVEL_NAMES.get(required_level, f"Level {required_level}")
 
-CONTEXT:
+    prompt = f"""CONTEXT:
 - Employee: {employee_name}
 - Current Role: {job_role}
 - Skill: {skill_name} ({skill_code})
@@ -74,30 +146,7 @@ CONTEXT:
 {f'CURRENT LEVEL DESCRIPTION: {current_level_description}' if current_level_description else ''}
 {f'REQUIRED LEVEL DESCRIPTION: {required_level_description}' if required_level_description else ''}
 
-TASK:
-Analyze this skill gap and provide insights. Consider:
-1. Why this gap matters for the role
-2. Business impact of not closing the gap
-3. Realistic strategies to close the gap
-4. Priority and urgency assessment
-
-OUTPUT REQUIREMENTS:
-Return ONLY valid JSON matching this exact schema (no markdown, no explanations):
-
-{{
-  "ai_analysis": "Detailed analysis of why this gap matters and its impact (2-4 sentences in {lang_name})",
-  "ai_recommendation": "Specific, actionable recommendation to close this gap (2-4 sentences in {lang_name})",
-  "priority_rationale": "Brief explanation of priority level in {lang_name}",
-  "estimated_effort": "Estimated effort to close gap (e.g., '3-6 months with focused training')",
-  "key_actions": ["Action 1", "Action 2", "Action 3"],
-  "potential_blockers": ["Blocker 1", "Blocker 2"]
-}}
-
-IMPORTANT:
-- Be specific and actionable
-- Consider the gap size when recommending approach
-- Write all text fields in {lang_name}
-- Return ONLY valid JSON
+RESPONSE LANGUAGE: {lang_name}
 """
     return prompt
 
@@ -153,13 +202,13 @@ async def analyze_skill_gap(
         logger.debug(f"Gap analysis prompt built: {len(prompt)} characters")
 
         # Call Azure OpenAI
-        client = get_client()
-        response = await client.chat.completions.create(
+        response = await chat_completion(
+            "analyze_skill_gap",
             model=LLM_MODEL,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are an expert HR consultant specializing in skill development. Provide practical, actionable insights. Always return valid JSON."
+                    "content": GAP_ANALYSIS_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -167,7 +216,7 @@ async def analyze_skill_gap(
                 }
             ],
             temperature=0.4,
-            max_tokens=1024,
+            max_tokens=get_token_planner().max_tokens("analyze_skill_gap", prompt=GAP_ANALYSIS_SYSTEM_PROMPT + prompt),
             response_format={"type": "json_object"}
         )
 
@@ -200,20 +249,158 @@ async def analyze_skill_gap(
         raise ValueError(f"Failed to analyze skill gap: {str(e)}")
 
 
-async def analyze_multiple_gaps(
+def build_batch_gap_analysis_prompt(
+    employee_name: str,
+    job_role: str,
+    gaps: List[Dict[str, Any]],
+    language: str = "en"
+) -> str:
+    """
+    Build one prompt analyzing several skill gaps of the same employee and role
+    (the user message; instructions are in BATCH_GAP_ANALYSIS_SYSTEM_PROMPT).
+    Gaps are numbered from 1; the model answers with one entry per gap_id.
+    """
+    lang_name = "English" if language == "en" else "Vietnamese"
+
+    gap_lines = []
+    for number, gap in enumerate(gaps, start=1):
+        current_level = gap.get("current_level", 0)
+        required_level = gap.get("required_level", 1)
+        lines = [
+            f"[gap_id {number}] {gap.get('skill_name', 'Unknown')} ({gap.get('skill_code', '')})",
+            f"- Current Level: {current_level} ({LEVEL_NAMES.get(current_level, f'Level {current_level}')})",
+            f"- Required Level: {required_level} ({LEVEL_NAMES.get(required_level, f'Level {required_level}')})",
+            f"- Gap Size: {required_level - current_level} levels"
+        ]
+        if gap.get("skill_description"):
+            lines.append(f"- Skill Description: {gap['skill_description']}")
+        gap_lines.append("\n".join(lines))
+    gaps_block = "\n\n".join(gap_lines)
+
+    prompt = f"""CONTEXT:
+- Employee: {employee_name}
+- Current Role: {job_role}
+
+SKILL GAPS ({len(gaps)}):
+
+{gaps_block}
+
+RESPONSE LANGUAGE: {lang_name}
+"""
+    return prompt
+
+
+async def analyze_gap_batch(
     employee_name: str,
     job_role: str,
     gaps: List[Dict[str, Any]],
     language: str = "en"
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Analyze several skill gaps with a single LLM call.
+
+    Args:
+        employee_name: Employee name
+        job_role: Job role name
+        gaps: Gap dicts (all with current_level < required_level)
+        language: Response language
+
+    Returns:
+        Dict mapping the position of each gap in `gaps` to its analysis (same
+        shape as analyze_skill_gap()). Gaps the model dropped or answered
+        incompletely are missing from the result.
+    """
+    logger.info(f"Analyzing {len(gaps)} gaps for {employee_name} in one prompt")
+
+    prompt = build_batch_gap_analysis_prompt(employee_name, job_role, gaps, language)
+    logger.debug(f"Batch gap analysis prompt built: {len(prompt)} characters")
+
+    response = await chat_completion(
+        "analyze_gap_batch",
+        units=len(gaps),
+        model=LLM_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": BATCH_GAP_ANALYSIS_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        temperature=0.4,
+        max_tokens=get_token_planner().max_tokens("analyze_gap_batch", units=len(gaps), prompt=BATCH_GAP_ANALYSIS_SYSTEM_PROMPT + prompt),
+        response_format={"type": "json_object"}
+    )
+
+    response_text = response.choices[0].message.content.strip()
+
+    # Remove markdown if present
+    if response_text.startswith("```"):
+        response_text = response_text.split("```")[1]
+        if response_text.startswith("json"):
+            response_text = response_text[4:]
+        response_text = response_text.strip()
+
+    try:
+        result = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to parse batch gap analysis response: {str(e)}")
+
+    entries = result.get("analyses", []) if isinstance(result, dict) else result
+    analyses: Dict[int, Dict[str, Any]] = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(str(entry.get("gap_id")).strip().lstrip("#")) - 1
+        except ValueError:
+            continue
+        if not 0 <= index < len(gaps) or index in analyses:
+            continue
+        if not all(isinstance(entry.get(field), str) and entry[field].strip()
+                   for field in ("ai_analysis", "ai_recommendation")):
+            continue
+        # Keep only the analysis fields; missing or mistyped ones become empty
+        analysis = {"success": True}
+        for field, kind in ANALYSIS_FIELDS.items():
+            value = entry.get(field)
+            analysis[field] = value if isinstance(value, kind) else kind()
+        analyses[index] = analysis
+
+    if len(analyses) < len(gaps):
+        logger.warning(f"Batch gap analysis returned {len(analyses)}/{len(gaps)} gaps")
+    return analyses
+
+
+async def analyze_multiple_gaps(
+    employee_name: str,
+    job_role: str,
+    gaps: List[Dict[str, Any]],
+    language: str = "en",
+    concurrency: int = GAP_ANALYSIS_CONCURRENCY,
+    timeout: float = GAP_ANALYSIS_TIMEOUT,
+    batch_mode: Optional[bool] = None,
+    batch_size: int = GAP_ANALYSIS_BATCH_SIZE
 ) -> Dict[str, Any]:
     """
     Analyze multiple skill gaps and provide overall assessment.
+    Gaps are analyzed concurrently; a gap that fails or times out is reported
+    with success=False without failing the others. In batch mode gaps are
+    packed batch_size at a time into one prompt, and any gap missing from a
+    batch answer is analyzed on its own.
 
     Args:
         employee_name: Employee name
         job_role: Job role name
         gaps: List of gap dicts with skill_name, skill_code, current_level, required_level
         language: Response language
+        concurrency: Maximum gap analyses in flight at once
+        timeout: Seconds allowed per gap (0 disables); a batch gets this
+                 times its number of gaps
+        batch_mode: Analyze several gaps per LLM call (None: GAP_ANALYSIS_BATCH_MODE)
+        batch_size: Gaps per LLM call in batch mode
 
     Returns:
         Dict with individual gap analyses and overall summary
@@ -230,34 +417,84 @@ async def analyze_multiple_gaps(
             "recommended_focus_areas": []
         }
 
-    # Analyze each gap
-    gap_analyses = []
-    for gap in gaps:
-        try:
-            analysis = await analyze_skill_gap(
-                employee_name=employee_name,
-                job_role=job_role,
-                skill_name=gap.get("skill_name", "Unknown"),
-                skill_code=gap.get("skill_code", ""),
-                current_level=gap.get("current_level", 0),
-                required_level=gap.get("required_level", 1),
-                skill_description=gap.get("skill_description"),
-                language=language
-            )
-            gap_analyses.append({
-                "skill_id": gap.get("skill_id"),
-                "skill_name": gap.get("skill_name"),
-                "gap_size": gap.get("required_level", 1) - gap.get("current_level", 0),
-                **analysis
-            })
-        except Exception as e:
-            logger.error(f"Failed to analyze gap for {gap.get('skill_name')}: {e}")
-            gap_analyses.append({
+    # Analyze gaps concurrently, results in input order
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def analyze(gap: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                analysis = await asyncio.wait_for(
+                    analyze_skill_gap(
+                        employee_name=employee_name,
+                        job_role=job_role,
+                        skill_name=gap.get("skill_name", "Unknown"),
+                        skill_code=gap.get("skill_code", ""),
+                        current_level=gap.get("current_level", 0),
+                        required_level=gap.get("required_level", 1),
+                        skill_description=gap.get("skill_description"),
+                        language=language
+                    ),
+                    timeout=timeout or None
+                )
+                return {
+                    "skill_id": gap.get("skill_id"),
+                    "skill_name": gap.get("skill_name"),
+                    "gap_size": gap.get("required_level", 1) - gap.get("current_level", 0),
+                    **analysis
+                }
+            except asyncio.TimeoutError:
+                error = f"Gap analysis timed out after {timeout:.0f}s"
+            except Exception as e:
+                error = str(e)
+            logger.error(f"Failed to analyze gap for {gap.get('skill_name')}: {error}")
+            return {
                 "skill_id": gap.get("skill_id"),
                 "skill_name": gap.get("skill_name"),
                 "success": False,
-                "error": str(e)
-            })
+                "error": error
+            }
+
+    if batch_mode is None:
+        batch_mode = GAP_ANALYSIS_BATCH_MODE
+
+    batched: Dict[int, Dict[str, Any]] = {}
+    if batch_mode:
+        # Gaps already met are answered locally by analyze_skill_gap()
+        open_gaps = [
+            i for i, gap in enumerate(gaps)
+            if gap.get("current_level", 0) < gap.get("required_level", 1)
+        ]
+        size = max(1, batch_size)
+        chunks = [open_gaps[i:i + size] for i in range(0, len(open_gaps), size)]
+
+        async def analyze_chunk(chunk: List[int]) -> Dict[int, Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    # A batch writes one analysis per gap: scale the per-gap timeout
+                    analyses = await asyncio.wait_for(
+                        analyze_gap_batch(employee_name, job_role, [gaps[i] for i in chunk], language),
+                        timeout=timeout * len(chunk) if timeout else None
+                    )
+                except Exception as e:
+                    logger.warning(f"Batch gap analysis failed, analyzing {len(chunk)} gaps individually: {e!r}")
+                    return {}
+            return {chunk[position]: analysis for position, analysis in analyses.items()}
+
+        for chunk_result in await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks)):
+            batched.update(chunk_result)
+
+    async def resolve(index: int, gap: Dict[str, Any]) -> Dict[str, Any]:
+        analysis = batched.get(index)
+        if analysis is None:
+            return await analyze(gap)
+        return {
+            "skill_id": gap.get("skill_id"),
+            "skill_name": gap.get("skill_name"),
+            "gap_size": gap.get("required_level", 1) - gap.get("current_level", 0),
+            **analysis
+        }
+
+    gap_analyses = list(await asyncio.gather(*(resolve(i, gap) for i, gap in enumerate(gaps))))
 
     # Generate overall summary
     successful_analyses = [g for g in gap_analyses if g.get("success")]
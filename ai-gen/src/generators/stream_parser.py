@@ -0,0 +1,122 @@
+"""
+Incremental JSON array parser
+Extracts the items of a JSON array (by default the "questions" array of the
+generator output) from a response that arrives in arbitrary text chunks,
+returning each item as soon as its closing brace has been received.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayStreamParser:
+    """
+    Streaming extractor for the objects of one JSON array.
+
+    The array is either the value of `array_key` in the top-level object
+    ({"questions": [{...}, {...}]}) or the top-level value itself
+    ([{...}, {...}]). Text is scanned once; only the unfinished item is kept
+    in memory. Items that are not valid JSON are counted in `errors` and kept
+    in `invalid_items`.
+    """
+
+    def __init__(self, array_key: str = "questions"):
+        self.array_key = array_key
+        self.errors = 0
+        self.invalid_items: List[str] = []
+        self.items_parsed = 0
+        self.finished = False
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start: Optional[int] = None
+        self._last_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Add a chunk of response text.
+
+        Returns:
+            Items completed by this chunk, in order
+        """
+        items: List[Dict[str, Any]] = []
+        if self.finished or not chunk:
+            return items
+
+        text = self._text + chunk
+        i = self._pos
+        stack = self._stack
+        while i < len(text):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(stack) == 1 and stack[0] == "{":
+                        self._last_key = text[self._string_start + 1:i]
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == "{" or c == "[":
+                stack.append(c)
+                if self._array_depth is None:
+                    if c == "[" and (len(stack) == 1 or (
+                        len(stack) == 2 and stack[0] == "{" and self._last_key == self.array_key
+                    )):
+                        self._array_depth = len(stack)
+                elif c == "{" and len(stack) == self._array_depth + 1:
+                    self._item_start = i
+            elif c == "}" or c == "]":
+                if self._array_depth is not None:
+                    if c == "}" and self._item_start is not None and len(stack) == self._array_depth + 1:
+                        raw = text[self._item_start:i + 1]
+                        self._item_start = None
+                        try:
+                            items.append(json.loads(raw))
+                            self.items_parsed += 1
+                        except ValueError:
+                            self.errors += 1
+                            self.invalid_items.append(raw)
+                    elif c == "]" and len(stack) == self._array_depth:
+                        self.finished = True
+                if stack:
+                    stack.pop()
+                if self.finished:
+                    i += 1
+                    break
+            i += 1
+
+        # Keep only the text still needed: the open item or the open key string
+        if self._item_start is not None:
+            keep = self._item_start
+        elif self._in_string and self._string_start is not None:
+            keep = self._string_start
+        else:
+            keep = i
+        self._text = text[keep:]
+        self._pos = i - keep
+        if self._item_start is not None:
+            self._item_start -= keep
+        if self._string_start is not None:
+            self._string_start -= keep
+        return items
+
+    @property
+    def pending(self) -> str:
+        """Text of the item currently being received (truncated output if the stream ended)."""
+        return self._text if self._item_start is not None else ""
+
+    @property
+    def started(self) -> bool:
+        """True once the opening bracket of the array has been seen."""
+        return self._array_depth is not None
@@ -0,0 +1,266 @@
+"""
+Token Planner
+Sets max_tokens for LLM calls from output sizes observed in earlier
+responses instead of fixed reservations. Output tokens are learned per
+endpoint (per unit, e.g. per gap in a batch) and per question type (each
+returned question is measured with the tokenizer and calibrated against the
+reported completion tokens). Until enough samples exist the previous fixed
+reservations are used as priors.
+
+A per-endpoint margin grows whenever a response is cut off at max_tokens
+and decays slowly while responses fit, so truncations and unused
+reservations both trend towards zero.
+"""
+
+import json
+import math
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from config.settings import (
+    LLM_CONTEXT_TOKENS,
+    LLM_MAX_OUTPUT_TOKENS,
+    TOKEN_PLANNER_ENABLED,
+    TOKEN_PLANNER_MARGIN,
+    TOKEN_PLANNER_MIN_SAMPLES,
+    TOKEN_PLANNER_WINDOW
+)
+from .tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Output tokens per unit used until an endpoint has learned its own
+# (the fixed max_tokens the generators reserved before)
+ENDPOINT_PRIORS = {
+    "grade_answer": 2048,
+    "analyze_skill_gap": 1024,
+    "analyze_gap_batch": 700,
+    "generate_learning_path": 2048,
+    "rank_learning_resources": 1024,
+    "generate_questions_v1": 4000,
+    "repair_questions": 1000
+}
+DEFAULT_ENDPOINT_PRIOR = 2048
+
+# Output tokens per question until a type has learned its own
+QUESTION_PRIOR = 1000
+
+# Tokens outside the per-unit content (JSON envelope, batch wrapper)
+RESPONSE_OVERHEAD = {"analyze_gap_batch": 256}
+QUESTION_RESPONSE_OVERHEAD = 64
+
+MIN_MAX_TOKENS = 256
+PLAN_QUANTILE = 0.95
+TRUNCATION_MARGIN_STEP = 0.25
+MAX_MARGIN = 2.0
+MARGIN_DECAY = 0.98
+
+
+def question_type_key(question_type: str) -> str:
+    return f"question:{question_type}"
+
+
+class TokenPlanner:
+    """Learned output-token sizes plus reservation / truncation counters."""
+
+    def __init__(
+        self,
+        enabled: bool = TOKEN_PLANNER_ENABLED,
+        margin: float = TOKEN_PLANNER_MARGIN,
+        min_samples: int = TOKEN_PLANNER_MIN_SAMPLES,
+        window: int = TOKEN_PLANNER_WINDOW,
+        max_output_tokens: int = LLM_MAX_OUTPUT_TOKENS,
+        context_tokens: int = LLM_CONTEXT_TOKENS
+    ):
+        self.enabled = enabled
+        self.base_margin = margin
+        self.min_samples = min_samples
+        self.window = window
+        self.max_output_tokens = max_output_tokens
+        self.context_tokens = context_tokens
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._margins: Dict[str, float] = {}
+        self._calibration: Dict[str, float] = {}
+        self._calls: Dict[str, Dict[str, int]] = {}
+
+    # Learned sizes
+
+    def _observe(self, key: str, tokens: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(tokens)
+
+    def _quantile(self, key: str, q: float = PLAN_QUANTILE) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def unit_tokens(self, endpoint: str) -> float:
+        """Planned output tokens per unit of an endpoint (learned p95 or prior)."""
+        learned = self._quantile(endpoint) if self.enabled else None
+        return learned if learned is not None else ENDPOINT_PRIORS.get(endpoint, DEFAULT_ENDPOINT_PRIOR)
+
+    def question_tokens(self, question_type: str) -> float:
+        """Planned output tokens per question of a type (learned p95 or prior)."""
+        learned = self._quantile(question_type_key(question_type)) if self.enabled else None
+        return learned if learned is not None else QUESTION_PRIOR
+
+    def margin(self, endpoint: str) -> float:
+        with self._lock:
+            return self._margins.get(endpoint, self.base_margin)
+
+    # Planning
+
+    def _clamp(self, tokens: float, prompt_tokens: int = 0) -> int:
+        limit = self.max_output_tokens
+        if prompt_tokens:
+            limit = min(limit, max(MIN_MAX_TOKENS, self.context_tokens - prompt_tokens))
+        return int(min(max(math.ceil(tokens), MIN_MAX_TOKENS), limit))
+
+    def max_tokens(self, endpoint: str, units: int = 1, prompt: Optional[str] = None) -> int:
+        """
+        max_tokens for a call producing `units` results (1 for single-result endpoints).
+
+        Args:
+            endpoint: Endpoint name as reported to the gateway
+            units: Number of results in the response (e.g. gaps in a batch)
+            prompt: Prompt text; caps the reservation at the remaining context
+        """
+        if not self.enabled:
+            return self._clamp(ENDPOINT_PRIORS.get(endpoint, DEFAULT_ENDPOINT_PRIOR) * units
+                               + RESPONSE_OVERHEAD.get(endpoint, 0))
+        planned = self.unit_tokens(endpoint) * units * (1 + self.margin(endpoint)) + RESPONSE_OVERHEAD.get(endpoint, 0)
+        return self._clamp(planned, count_tokens(prompt) if prompt else 0)
+
+    def question_max_tokens(self, endpoint: str, counts: Dict[str, int], prompt: Optional[str] = None) -> int:
+        """
+        max_tokens for a generation call.
+
+        Args:
+            endpoint: Endpoint name ("generate_questions", "generate_questions_stream")
+            counts: Questions requested per type
+            prompt: Prompt text; caps the reservation at the remaining context
+        """
+        total = sum(counts.values())
+        if not self.enabled:
+            # Fixed reservation: 1000 per question + buffer, at least 8192
+            return min(max(total * 1000 + 1000, 8192), self.max_output_tokens)
+        planned = sum(self.question_tokens(qtype) * n for qtype, n in counts.items())
+        planned = planned * (1 + self.margin(endpoint)) + QUESTION_RESPONSE_OVERHEAD
+        return self._clamp(planned, count_tokens(prompt) if prompt else 0)
+
+    def max_questions_per_call(self, endpoint: str, question_type: str) -> int:
+        """Most questions of a type whose planned output fits in one call."""
+        per_question = self.question_tokens(question_type) * (1 + self.margin(endpoint))
+        return max(1, int((self.max_output_tokens - QUESTION_RESPONSE_OVERHEAD) // per_question))
+
+    # Learning
+
+    def record_call(
+        self,
+        endpoint: str,
+        usage=None,
+        finish_reason: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        units: int = 1
+    ):
+        """Learn from one completed call (reported by the LLM gateway)."""
+        completion_tokens = getattr(usage, "completion_tokens", None) if usage is not None else None
+        truncated = finish_reason == "length"
+        with self._lock:
+            calls = self._calls.setdefault(endpoint, {
+                "calls": 0,
+                "truncated": 0,
+                "reserved_tokens": 0,
+                "used_tokens": 0
+            })
+            calls["calls"] += 1
+            if max_tokens and completion_tokens is not None:
+                calls["reserved_tokens"] += max_tokens
+                calls["used_tokens"] += completion_tokens
+            margin = self._margins.get(endpoint, self.base_margin)
+            if truncated:
+                calls["truncated"] += 1
+                self._margins[endpoint] = min(margin + TRUNCATION_MARGIN_STEP, MAX_MARGIN)
+            else:
+                self._margins[endpoint] = max(self.base_margin, margin * MARGIN_DECAY)
+
+        if truncated:
+            logger.warning(f"{endpoint}: response truncated at max_tokens={max_tokens}, margin raised")
+        elif completion_tokens and units > 0:
+            overhead = RESPONSE_OVERHEAD.get(endpoint, 0)
+            self._observe(endpoint, max(completion_tokens - overhead, 1) / units)
+
+    def record_questions(
+        self,
+        endpoint: str,
+        questions: List[Dict[str, Any]],
+        completion_tokens: Optional[int] = None
+    ):
+        """
+        Learn per-type output sizes from the questions of one response.
+
+        Each question is measured with the tokenizer; with completion_tokens
+        the measurements are calibrated to what the model reported (JSON
+        whitespace, tokenizer estimate error), otherwise the last calibration
+        is applied.
+        """
+        measured = [(q.get("type"), count_tokens(json.dumps(q, ensure_ascii=False)))
+                    for q in questions if isinstance(q, dict) and q.get("type")]
+        if not measured:
+            return
+        total = sum(tokens for _, tokens in measured)
+        with self._lock:
+            if completion_tokens and total:
+                ratio = max(completion_tokens - QUESTION_RESPONSE_OVERHEAD, 1) / total
+                self._calibration[endpoint] = min(max(ratio, 0.5), 3.0)
+            ratio = self._calibration.get(endpoint, 1.0)
+        for qtype, tokens in measured:
+            self._observe(question_type_key(qtype), tokens * ratio)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            keys = sorted(self._samples)
+            calls = {endpoint: dict(counters) for endpoint, counters in sorted(self._calls.items())}
+            margins = dict(self._margins)
+            calibration = dict(self._calibration)
+        for endpoint, counters in calls.items():
+            reserved = counters["reserved_tokens"]
+            counters["reservation_used_ratio"] = round(counters["used_tokens"] / reserved, 4) if reserved else None
+            counters["margin"] = round(margins.get(endpoint, self.base_margin), 3)
+            if endpoint in calibration:
+                counters["tokenizer_calibration"] = round(calibration[endpoint], 3)
+        learned = {}
+        for key in keys:
+            with self._lock:
+                samples = len(self._samples[key])
+            p50 = self._quantile(key, 0.5)
+            p95 = self._quantile(key)
+            learned[key] = {
+                "samples": samples,
+                "p50_tokens": round(p50) if p50 is not None else None,
+                "p95_tokens": round(p95) if p95 is not None else None
+            }
+        return {
+            "enabled": self.enabled,
+            "min_samples": self.min_samples,
+            "max_output_tokens": self.max_output_tokens,
+            "learned": learned,
+            "calls": calls
+        }
+
+
+# Process-wide planner (lazy-loaded)
+_token_planner: Optional[TokenPlanner] = None
+
+
+def get_token_planner() -> TokenPlanner:
+    """Get or create the process-wide token planner."""
+    global _token_planner
+    if _token_planner is None:
+        _token_planner = TokenPlanner()
+    return _token_planner
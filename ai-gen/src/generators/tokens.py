@@ -0,0 +1,45 @@
+"""
+Token counting
+Uses tiktoken when it is installed and an estimate from the UTF-8 size
+otherwise (about 4 bytes per token for English; Vietnamese diacritics take
+more bytes, which keeps the estimate on the safe side).
+"""
+
+import math
+import logging
+from functools import lru_cache
+
+from config.settings import LLM_MODEL
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken  # optional: exact token counts
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+BYTES_PER_TOKEN = 4.0
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = LLM_MODEL) -> int:
+    """Number of tokens in `text` (exact with tiktoken, estimated otherwise)."""
+    global TIKTOKEN_AVAILABLE
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        try:
+            return len(_encoding(model).encode(text, disallowed_special=()))
+        except Exception as e:
+            # e.g. the encoding file cannot be downloaded: estimate from now on
+            logger.warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+            TIKTOKEN_AVAILABLE = False
+    return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
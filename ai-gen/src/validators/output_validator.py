@@ -9,9 +9,27 @@ with open(OUTPUT_SCHEMA_PATH, "r", encoding="utf-8") as f:
 
 validator = Draft202012Validator(OUTPUT_SCHEMA)
 
+
 def validate_output_questions(data: list) -> None:
     try:
         for item in data:
             validator.validate(item)
     except ValidationError as e:
-        raise ValueError(f"Output validation failed: {e.message}") from e
\ No newline at end of file
+        raise ValueError(f"Output validation failed: {e.message}") from e
+
+
+OUTPUT_SCHEMA_V2_PATH = Path(__file__).parent.parent / "schemas" / "output_question_schema_v2.json"
+
+with open(OUTPUT_SCHEMA_V2_PATH, "r", encoding="utf-8") as f:
+    OUTPUT_SCHEMA_V2 = json.load(f)
+
+# Validates one question against $defs/question of the V2 schema
+question_validator_v2 = Draft202012Validator({"$ref": "#/$defs/question", "$defs": OUTPUT_SCHEMA_V2["$defs"]})
+
+
+def question_errors_v2(question) -> list:
+    """Schema violations of one V2 question (empty if valid)."""
+    return [
+        f"{'/'.join(str(p) for p in error.absolute_path) or '<root>'}: {error.message}"
+        for error in question_validator_v2.iter_errors(question)
+    ]
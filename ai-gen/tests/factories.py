@@ -0,0 +1,15 @@
+"""Test data shared by the test modules."""
+
+
+def make_question(qtype, i):
+    """A V2 question that passes the schema check."""
+    return {"type": qtype, "content": f"{qtype} question {i}", "target_level": 3,
+            "difficulty": "Medium", "points": 5, "grading_rubric": "r",
+            "options": [{"content": "A", "is_correct": True, "display_order": 1},
+                        {"content": "B", "is_correct": False, "display_order": 2}]}
+
+
+def make_catalog_row(skill_id, name, code, level, updated_at=None, influence="inf", knowledge="kn"):
+    """A getSkillCatalogRows() row for one skill level."""
+    return (skill_id, name, code, level, f"{name} L{level}", "aut", influence, "cx",
+            "bs", knowledge, "[]", "[]", updated_at)
@@ -0,0 +1,64 @@
+import asyncio
+
+from src.generators import answer_grader
+from src.generators.answer_grader import grade_objective_answer, grade_submission
+
+
+def _options(correct, levels=()):
+    return [
+        {"content": f"Option {i}", "is_correct": i in correct, "display_order": i,
+         "effectiveness_level": levels[i - 1] if levels else None}
+        for i in range(1, 5)
+    ]
+
+
+def test_objective_grading():
+    assert grade_objective_answer("MultipleChoice", _options({2}), ["2"], 5)["points_awarded"] == 5
+    assert grade_objective_answer("MultipleChoice", _options({2}), ["3"], 5)["points_awarded"] == 0
+    assert grade_objective_answer("MultipleAnswer", _options({1, 3}), ["3", "1"], 4)["points_awarded"] == 4
+    assert grade_objective_answer("MultipleAnswer", _options({1, 3}), ["1"], 4)["points_awarded"] == 0
+    assert grade_objective_answer("MultipleChoice", _options({2}), [], 5)["feedback"] == "No option was selected."
+    assert grade_objective_answer("Rating", _options({1, 2, 3, 4}), ["4"], 3)["points_awarded"] == 3
+
+    sjt = _options(set(), ["MostEffective", "Effective", "Ineffective", "CounterProductive"])
+    assert grade_objective_answer("SituationalJudgment", sjt, ["1"], 3)["points_awarded"] == 3
+    assert grade_objective_answer("SituationalJudgment", sjt, ["2"], 3)["points_awarded"] == 2
+    assert grade_objective_answer("SituationalJudgment", sjt, ["4"], 3)["points_awarded"] == 0
+
+
+def test_grade_submission_mixes_local_and_ai_grading(monkeypatch):
+    calls = []
+
+    async def fake_grade_answer(**kwargs):
+        calls.append(kwargs["question_content"])
+        if kwargs["question_content"] == "broken":
+            raise ValueError("model error")
+        return {"success": True, "points_awarded": 7, "max_points": kwargs["max_points"], "percentage": 70.0,
+                "feedback": "ok", "strength_points": [], "improvement_areas": [], "detailed_analysis": None}
+
+    monkeypatch.setattr(answer_grader, "grade_answer", fake_grade_answer)
+    items = [
+        {"question_id": "q1", "question_type": "MultipleChoice", "max_points": 5,
+         "options": _options({2}), "selected_options": [2]},
+        {"question_id": "q2", "question_type": "ShortAnswer", "max_points": 10,
+         "question_content": "Explain tuples", "student_answer": "immutable"},
+        {"question_id": "q3", "question_type": "LongAnswer", "max_points": 10,
+         "question_content": "broken", "student_answer": "x"},
+        {"question_id": "q4", "question_type": "TrueFalse", "max_points": 1, "options": None},
+    ]
+    result = asyncio.run(grade_submission(items))
+
+    assert [r["question_id"] for r in result["results"]] == ["q1", "q2", "q3", "q4"]
+    assert [r["graded_by"] for r in result["results"]] == ["rule", "ai", "ai", "rule"]
+    assert sorted(calls) == ["Explain tuples", "broken"]
+    assert result["results"][2]["success"] is False
+    assert result["aggregate"] == {
+        "total_points_awarded": 12,
+        "total_max_points": 26,
+        "percentage": 46.15,
+        "graded_count": 2,
+        "failed_count": 2,
+        "ai_graded_count": 1,
+        "rule_graded_count": 1,
+        "complete": False
+    }
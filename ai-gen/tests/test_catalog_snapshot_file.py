@@ -0,0 +1,83 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from src.catalog.skill_catalog import build_snapshot
+from src.catalog.snapshot_file import (
+    HEADER,
+    SnapshotFileError,
+    decode_snapshot,
+    encode_snapshot,
+    read_snapshot_file,
+    write_snapshot_file
+)
+from tests.factories import make_catalog_row
+
+
+def _row(skill_id, name, code, level, updated_at=None):
+    return make_catalog_row(skill_id, name, code, level, updated_at, influence=None, knowledge="kiến thức")
+
+
+def _snapshot():
+    rows = [
+        _row("a", "Alpha", "ALP", 2),
+        _row("a", "Alpha", "ALP", 3, datetime(2026, 1, 2, tzinfo=timezone.utc)),
+        _row("b", "Beta", None, 1),
+    ]
+    return build_snapshot(rows)
+
+
+def test_snapshot_file_round_trip(tmp_path):
+    snapshot = _snapshot()
+    path = tmp_path / "catalog.snapshot"
+    write_snapshot_file(snapshot, str(path))
+
+    loaded = read_snapshot_file(str(path))
+
+    assert loaded.source == "file"
+    assert loaded.version == snapshot.version
+    assert loaded.skills == snapshot.skills
+    assert loaded.levels == snapshot.levels
+    assert loaded.level_etags == snapshot.level_etags
+    assert loaded.last_updated_at == snapshot.last_updated_at
+    assert loaded.levels["a"][0].influence is None
+    assert loaded.skills_json == snapshot.skills_json
+
+
+def test_snapshot_file_stores_repeated_strings_once():
+    data = encode_snapshot(_snapshot())
+    assert data.count("kiến thức".encode("utf-8")) == 1
+
+
+def test_snapshot_file_rejects_corruption():
+    data = bytearray(encode_snapshot(_snapshot()))
+
+    flipped = bytearray(data)
+    flipped[-1] ^= 0xFF
+    with pytest.raises(SnapshotFileError, match="checksum"):
+        decode_snapshot(bytes(flipped))
+
+    with pytest.raises(SnapshotFileError, match="not a catalog snapshot"):
+        decode_snapshot(b"X" + bytes(data[1:]))
+
+    with pytest.raises(SnapshotFileError, match="truncated"):
+        decode_snapshot(bytes(data[:HEADER.size - 1]))
+
+
+def test_missing_snapshot_file(tmp_path):
+    with pytest.raises(SnapshotFileError):
+        read_snapshot_file(str(tmp_path / "missing.snapshot"))
+
+
+def test_concurrent_snapshot_writes_stay_readable(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    snapshot = _snapshot()
+    path = str(tmp_path / "catalog.snapshot")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        sizes = list(pool.map(lambda _: write_snapshot_file(snapshot, path), range(32)))
+
+    assert read_snapshot_file(path).version == snapshot.version
+    assert set(sizes) == {os.path.getsize(path)}
+    assert os.listdir(tmp_path) == ["catalog.snapshot"]
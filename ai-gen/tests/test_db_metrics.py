@@ -0,0 +1,57 @@
+import asyncio
+
+from src.db.metrics import (
+    LatencyHistogram,
+    LatencyRegistry,
+    QUERY_LATENCY,
+    infer_query_name,
+    named_query,
+    params_shape,
+    record_query
+)
+
+
+def test_params_shape_hides_values():
+    assert params_shape(("30000000-0000-0000-0000-000000000001", ["a", "b"], 3)) == ("str(36)", "list[2]", "int")
+    assert params_shape({"level": 4}) == {"level": "int"}
+    assert params_shape(None) is None
+
+
+def test_histogram_buckets_and_percentiles():
+    histogram = LatencyHistogram()
+    for ms in (0.5, 3, 3, 40, 20000):
+        histogram.observe(ms)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["buckets_ms"]["1"] == 1
+    assert snapshot["buckets_ms"]["5"] == 3
+    assert snapshot["buckets_ms"]["+Inf"] == 5
+    assert snapshot["p50_ms"] == 5
+    assert snapshot["p99_ms"] == 20000
+
+
+def test_named_query_tags_sync_and_async_functions():
+    QUERY_LATENCY.reset()
+
+    @named_query
+    def getThing():
+        record_query('SELECT 1 FROM public."Skills"', None, 1.0)
+
+    @named_query
+    async def getThingAsync():
+        record_query('SELECT 1 FROM public."Skills"', None, 2.0)
+
+    getThing()
+    asyncio.run(getThingAsync())
+    record_query('SELECT "Id" FROM public."Skills"', None, 3.0, error=True)
+
+    snapshot = QUERY_LATENCY.snapshot()
+    assert snapshot["getThing"]["count"] == 1
+    assert snapshot["getThingAsync"]["count"] == 1
+    assert snapshot["SELECT Skills"]["errors"] == 1
+
+
+def test_infer_query_name():
+    assert infer_query_name('\n    SELECT COUNT(*)\n    FROM public."SkillLevelDefinitions"') == "SELECT SkillLevelDefinitions"
+    assert infer_query_name("LISTEN foo") == "LISTEN"
+    assert LatencyRegistry().snapshot() == {}
@@ -0,0 +1,64 @@
+import threading
+import pytest
+import psycopg2.extensions
+
+from src.db import pool as pool_module
+from src.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeInfo:
+    transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = False
+        self.cursor_factory = None
+        self.info = FakeInfo()
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def fake_connect(monkeypatch):
+    monkeypatch.setattr(pool_module.psycopg2, "connect", lambda **kwargs: FakeConn())
+
+
+def test_pool_reuses_connections(fake_connect):
+    pool = ConnectionPool(minconn=1, maxconn=2, health_check_after=0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    stats = pool.get_stats()
+    assert stats["connections_opened"] == 1
+    assert stats["in_use"] == 1
+
+
+def test_pool_acquire_timeout(fake_connect):
+    pool = ConnectionPool(minconn=0, maxconn=1, health_check_after=0)
+    pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn(timeout=0.05)
+    assert pool.get_stats()["acquire_timeouts"] == 1
+
+
+def test_pool_waiter_gets_released_connection(fake_connect):
+    pool = ConnectionPool(minconn=0, maxconn=1, health_check_after=0)
+    conn = pool.getconn()
+    threading.Timer(0.05, pool.putconn, args=(conn,)).start()
+    assert pool.getconn(timeout=2) is conn
+    assert pool.get_stats()["wait_count"] == 1
+
+
+def test_pool_discards_closed_connection(fake_connect):
+    pool = ConnectionPool(minconn=0, maxconn=1, health_check_after=0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.closed = 1
+    assert pool.getconn() is not conn
+    assert pool.get_stats()["pool_size"] == 1
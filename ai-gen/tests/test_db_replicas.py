@@ -0,0 +1,45 @@
+from src.db.db_config import parse_replica_config
+from src.db.replicas import Replica, ReplicaSet
+
+PRIMARY = {
+    "host": "db-primary",
+    "database": "skills",
+    "user": "postgres",
+    "password": "secret",
+    "port": 5432,
+    "max_pool_size": 20
+}
+
+
+def test_replica_object_inherits_primary_settings():
+    config = parse_replica_config({"ServerName": "db-replica-1"}, PRIMARY)
+    assert config["host"] == "db-replica-1"
+    assert config["database"] == "skills"
+    assert config["password"] == "secret"
+    assert config["port"] == 5432
+
+
+def test_replica_dsn_string():
+    config = parse_replica_config("host=db-replica-2 port=5433 user=reader", PRIMARY)
+    assert (config["host"], config["port"], config["user"]) == ("db-replica-2", 5433, "reader")
+
+
+def test_lagging_replica_is_skipped_until_rechecked():
+    replica = Replica(parse_replica_config({"ServerName": "r1"}, PRIMARY))
+    assert replica.is_candidate()
+    assert replica.record_lag(0.2)
+    assert replica.is_candidate()
+
+    assert not replica.record_lag(3600)
+    assert not replica.is_candidate()
+    assert not replica.record_lag(None)
+
+    replica.checked_at -= 3600
+    assert replica.is_candidate()
+
+
+def test_down_replica_is_not_a_candidate():
+    replica_set = ReplicaSet([parse_replica_config({"ServerName": name}, PRIMARY) for name in ("r1", "r2")])
+    replica_set.replicas[0].mark_down(RuntimeError("connection refused"))
+    assert [r.name for r in replica_set.candidates()] == ["r2:5432"]
+    assert [r.name for r in replica_set.candidates()] == ["r2:5432"]
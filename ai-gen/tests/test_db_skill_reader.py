@@ -0,0 +1,21 @@
+from db_skill_reader import buildSkillLevelDefinitionsPageQuery
+
+
+def test_first_page_query_has_no_keyset_predicate():
+    query, params = buildSkillLevelDefinitionsPageQuery(limit=10)
+    assert '(sld."SkillId", sld."Level") >' not in query
+    assert query.rstrip().endswith('ORDER BY sld."SkillId", sld."Level" LIMIT %s')
+    assert params == [10]
+
+
+def test_next_page_query_resumes_after_key():
+    skill_id = "30000000-0000-0000-0000-000000000001"
+    query, params = buildSkillLevelDefinitionsPageQuery(skill_id, 3, 50)
+    assert '(sld."SkillId", sld."Level") > (%s::uuid, %s)' in query
+    assert params == [skill_id, 3, 50]
+
+
+def test_page_query_after_skill_only():
+    query, params = buildSkillLevelDefinitionsPageQuery("30000000-0000-0000-0000-000000000001", None, 5)
+    assert 'sld."SkillId" > %s::uuid' in query
+    assert len(params) == 2
@@ -0,0 +1,80 @@
+import time
+import asyncio
+
+from src.generators.grading_cache import GradingCache, grading_cache_key
+
+
+def _key(answer, rubric='{"criteria": [{"points": 5, "description": "x"}]}'):
+    return grading_cache_key("What is a tuple?", answer, 5, rubric, "Immutable list", "ShortAnswer", "en")
+
+
+def test_key_ignores_trivial_differences():
+    assert _key("A tuple is  immutable.") == _key("  a TUPLE is\nimmutable. ")
+    assert _key("x", '{"criteria":[{"description":"x","points":5}]}') == _key("x")
+    assert _key("A tuple is immutable.") != _key("A tuple is mutable.")
+    assert grading_cache_key("q", "a", 5) != grading_cache_key("q", "a", 10)
+
+
+def test_code_answers_are_keyed_verbatim():
+    def code_key(answer):
+        return grading_cache_key("Sum a list", answer, 5, None, None, "CodingChallenge", "en")
+
+    assert code_key("if x:\n    return 1\nreturn 2") != code_key("if x:\n    return 1\n    return 2")
+    assert code_key("total = Total") != code_key("total = total")
+    assert code_key("x = 1") == code_key("x = 1")
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = GradingCache(max_entries=2, ttl=60, path="", enabled=True)
+    cache.put("a", {"points_awarded": 1})
+    cache.put("b", {"points_awarded": 2})
+    assert cache.get("a") == {"points_awarded": 1}
+    cache.put("c", {"points_awarded": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.evictions == 1
+
+    now = time.time()
+    monkeypatch.setattr("src.generators.grading_cache.time.time", lambda: now + 120)
+    assert cache.get("c") is None
+    assert cache.expirations == 1
+
+
+def test_cached_results_are_copies():
+    cache = GradingCache(max_entries=10, ttl=0, path="", enabled=True)
+    cache.put("k", {"strength_points": ["clear"]})
+    cache.get("k")["strength_points"].append("mutated")
+    assert cache.get("k") == {"strength_points": ["clear"]}
+
+
+def test_persistence_round_trip(tmp_path):
+    path = str(tmp_path / "grading.sqlite")
+    cache = GradingCache(max_entries=10, ttl=3600, path=path, enabled=True)
+    cache.put("k", {"points_awarded": 4, "feedback": "tốt"})
+    cache.close()
+
+    reloaded = GradingCache(max_entries=10, ttl=3600, path=path, enabled=True)
+    assert reloaded.get_stats()["persistent"]
+    assert reloaded.get("k") == {"points_awarded": 4, "feedback": "tốt"}
+    reloaded.close()
+
+
+def test_concurrent_misses_share_one_grading_call():
+    cache = GradingCache(max_entries=10, ttl=0, path="", enabled=True)
+    calls = []
+
+    async def grade():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"points_awarded": 3}
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_grade("k", grade) for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert results == [{"points_awarded": 3}] * 5
+    assert len(calls) == 1
+    assert cache.coalesced == 4
+    assert asyncio.run(cache.get_or_grade("k", grade)) == {"points_awarded": 3}
+    assert len(calls) == 1
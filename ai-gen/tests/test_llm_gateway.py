@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from src.generators import llm_gateway
+from src.generators.llm_gateway import ConnectionStats, EndpointUsage
+
+
+def test_connection_stats_reuse_ratio():
+    stats = ConnectionStats()
+    stats.record(opened=True, http_version="HTTP/1.1")
+    stats.record(opened=False, http_version="HTTP/1.1")
+    stats.record(opened=False, http_version="HTTP/1.1")
+    stats.record(opened=False, error=True)
+
+    snapshot = stats.snapshot()
+    assert snapshot["http_requests"] == 4
+    assert snapshot["new_connections"] == 1
+    assert snapshot["reused_connections"] == 3
+    assert snapshot["reuse_ratio"] == 0.75
+    assert snapshot["errors"] == 1
+    assert snapshot["http_versions"] == {"HTTP/1.1": 3}
+
+
+def test_endpoint_usage_accumulates_tokens():
+    usage = EndpointUsage()
+    usage.record("grade_answer", SimpleNamespace(prompt_tokens=100, completion_tokens=20))
+    usage.record("grade_answer", SimpleNamespace(prompt_tokens=50, completion_tokens=None))
+    usage.record("grade_answer", error=True)
+
+    assert usage.snapshot()["grade_answer"] == {
+        "calls": 3,
+        "errors": 1,
+        "prompt_tokens": 150,
+        "cached_tokens": 0,
+        "completion_tokens": 20,
+        "cached_ratio": 0.0
+    }
+
+
+def test_endpoint_usage_reports_cached_prompt_tokens():
+    usage = EndpointUsage()
+    usage.record("generate_questions", SimpleNamespace(
+        prompt_tokens=3000, completion_tokens=900,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=2048)
+    ))
+    usage.record("generate_questions", SimpleNamespace(
+        prompt_tokens=1000, completion_tokens=300, prompt_tokens_details=None
+    ))
+
+    snapshot = usage.snapshot()["generate_questions"]
+    assert snapshot["cached_tokens"] == 2048
+    assert snapshot["cached_ratio"] == 0.512
+
+
+def test_generators_share_one_client(monkeypatch):
+    from src.generators import answer_grader, skill_gap_analyzer, question_generator_v2
+
+    # No real credentials needed: the client is created but never called
+    monkeypatch.setattr(llm_gateway, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm_gateway, "_client", None)
+
+    assert answer_grader.chat_completion is llm_gateway.chat_completion
+    assert skill_gap_analyzer.chat_completion is llm_gateway.chat_completion
+    assert question_generator_v2.chat_completion is llm_gateway.chat_completion
+    assert llm_gateway.get_client() is llm_gateway.get_client()
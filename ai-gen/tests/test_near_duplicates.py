@@ -0,0 +1,30 @@
+from src.generators.near_duplicates import NearDuplicateDetector
+
+
+BUG = {
+    "content": "Your team lead is unavailable and a critical production bug appears two hours before the release deadline. What do you do?",
+    "options": [{"content": "Fix it yourself"}, {"content": "Escalate to the manager"}]
+}
+
+
+def test_paraphrase_with_reordered_clauses_is_duplicate():
+    detector = NearDuplicateDetector(threshold=0.7)
+    assert detector.add(BUG)
+    paraphrase = {
+        "content": "A critical production bug appears two hours before the release deadline and your team lead is unavailable. What would you do?",
+        "options": [{"content": "fix it  yourself"}, {"content": "Escalate to the manager."}]
+    }
+    assert detector.find(paraphrase)[0] == 0
+    assert not detector.add(paraphrase)
+    assert detector.duplicates == 1
+
+
+def test_same_template_different_situation_is_kept():
+    detector = NearDuplicateDetector(threshold=0.7)
+    assert detector.add(BUG)
+    assert detector.add({
+        "content": "Your team lead is unavailable and a stakeholder asks for a new feature one week before the release deadline. What do you do?",
+        "options": [{"content": "Accept it"}, {"content": "Negotiate scope"}]
+    })
+    assert detector.add({"content": "Which HTTP status code means the resource was not found?"})
+    assert detector.accepted == 3
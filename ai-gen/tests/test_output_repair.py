@@ -0,0 +1,97 @@
+import json
+import asyncio
+from types import SimpleNamespace
+
+from src.generators import output_repair, question_generator_v2
+from src.generators.output_repair import salvage_questions, check_questions
+from tests.factories import make_question
+
+
+def _response(content, finish_reason="stop"):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+        usage=SimpleNamespace(prompt_tokens=100, completion_tokens=len(content) // 4)
+    )
+
+
+def test_salvage_keeps_complete_objects_of_truncated_json():
+    full = json.dumps({"questions": [make_question("MultipleChoice", 1), make_question("MultipleChoice", 2)]})
+    assert salvage_questions("```json\n" + full + "\n```") == (json.loads(full)["questions"], [])
+
+    text = '{"questions": [' + json.dumps(make_question("MultipleChoice", 1)) + ', {"type": "MultipleChoice", bad}, ' \
+        + json.dumps(make_question("MultipleChoice", 3))[:60]
+    items, broken = salvage_questions(text)
+
+    assert items == [make_question("MultipleChoice", 1)]
+    assert [b.errors for b in broken] == [["invalid JSON"], ["truncated: the object is incomplete"]]
+    assert broken[1].item == json.dumps(make_question("MultipleChoice", 3))[:60]
+
+
+def test_check_questions_flags_schema_and_type_errors():
+    missing_order = make_question("MultipleChoice", 2)
+    del missing_order["options"][0]["display_order"]
+    valid, broken = check_questions(
+        [make_question("MultipleChoice", 1), missing_order, make_question("Rating", 3), "text"], {"MultipleChoice"}
+    )
+
+    assert valid == [make_question("MultipleChoice", 1)]
+    assert any("display_order" in error for error in broken[0].errors)
+    assert broken[1].errors[0].startswith("type: 'Rating' is not one of the requested types")
+    assert broken[2].errors == ["not a question object"]
+
+
+def test_chunk_repairs_only_broken_items(monkeypatch):
+    calls = []
+    generated = '{"questions": [' + json.dumps(make_question("MultipleChoice", 1)) + ", " \
+        + json.dumps(make_question("Rating", 2)) + ", " + json.dumps(make_question("MultipleChoice", 3))[:80]
+
+    async def fake_generate(endpoint, **kwargs):
+        calls.append(endpoint)
+        return _response(generated, finish_reason="length")
+
+    async def fake_repair(endpoint, **kwargs):
+        calls.append((endpoint, kwargs["units"], kwargs["messages"][1]["content"]))
+        return _response(json.dumps({"questions": [make_question("MultipleChoice", 2), make_question("MultipleChoice", 3)]}))
+
+    monkeypatch.setattr(question_generator_v2, "chat_completion", fake_generate)
+    monkeypatch.setattr(output_repair, "chat_completion", fake_repair)
+    request = {"question_type": ["MultipleChoice"], "language": "en", "number_of_questions": 3, "difficulty": "medium"}
+    questions = asyncio.run(question_generator_v2.generate_question_chunk(request))
+
+    assert [q["content"] for q in questions] == [f"MultipleChoice question {i}" for i in (1, 2, 3)]
+    assert calls[0] == "generate_questions"
+    endpoint, units, prompt = calls[1]
+    assert (endpoint, units) == ("repair_questions", 2)
+    assert "BROKEN ITEMS (2)" in prompt and "MultipleChoice question 1" not in prompt
+
+
+def test_repair_counts_only_requested_items(monkeypatch):
+    async def fake_repair(endpoint, **kwargs):
+        return _response(json.dumps({"questions": [make_question("MultipleChoice", i) for i in range(3)]}))
+
+    monkeypatch.setattr(output_repair, "chat_completion", fake_repair)
+    monkeypatch.setattr(output_repair, "REPAIR_STATS", output_repair.RepairStats())
+    broken = [output_repair.BrokenQuestion("{", ["invalid JSON"])]
+    request = {"question_type": ["MultipleChoice"], "language": "en"}
+    repaired = asyncio.run(output_repair.repair_questions(broken, request, enabled=True, max_items=5))
+
+    assert len(repaired) == 1
+    stats = output_repair.get_repair_stats()
+    assert (stats["items_repaired"], stats["repaired_ratio"]) == (1, 1.0)
+
+
+def test_chunk_without_skill_accepts_null_skill_id(monkeypatch):
+    calls = []
+    questions = [dict(make_question("ShortAnswer", i), skill_id=None) for i in range(4)]
+
+    async def fake_generate(endpoint, **kwargs):
+        calls.append(endpoint)
+        return _response(json.dumps({"questions": questions}))
+
+    monkeypatch.setattr(question_generator_v2, "chat_completion", fake_generate)
+    monkeypatch.setattr(output_repair, "chat_completion", fake_generate)
+    request = {"question_type": ["ShortAnswer"], "language": "en", "number_of_questions": 4, "difficulty": "medium"}
+    generated = asyncio.run(question_generator_v2.generate_question_chunk(request))
+
+    assert len(generated) == 4 and all("skill_id" not in q for q in generated)
+    assert calls == ["generate_questions"]
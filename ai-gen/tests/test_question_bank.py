@@ -0,0 +1,116 @@
+import asyncio
+
+from src.generators import question_bank
+from src.generators.question_bank import BankCombination, QuestionBank, plan_bank_request
+from tests.factories import make_question
+
+
+def _request(n=4, types=("MultipleChoice", "ShortAnswer"), **extra):
+    request = {
+        "question_type": list(types),
+        "language": "en",
+        "number_of_questions": n,
+        "skills": [{"skill_id": "s-1", "skill_name": "Skill", "skill_code": "SK"}],
+        "target_proficiency_level": [4, 3],
+        "difficulty": "medium",
+        "additional_context": None
+    }
+    request.update(extra)
+    return request
+
+
+def test_plan_bank_request():
+    plan = plan_bank_request(_request(5))
+    assert [(combo.key, count) for combo, count in plan] == [
+        ("s-1|3,4|MultipleChoice|en|medium", 3),
+        ("s-1|3,4|ShortAnswer|en|medium", 2)
+    ]
+    combo = plan[0][0]
+    assert combo.to_request(7)["target_proficiency_level"] == [3, 4]
+    assert plan_bank_request(_request(additional_context="Focus on X")) is None
+
+
+def test_take_serves_whole_request_or_nothing(monkeypatch):
+    stock = {"s-1|3,4|MultipleChoice|en|medium": 12, "s-1|3,4|ShortAnswer|en|medium": 1}
+
+    async def take(counts):
+        if any(stock[key] < count for key, count in counts.items()):
+            return None
+        return {key: [make_question(key.split("|")[2], i) for i in range(count)] for key, count in counts.items()}
+
+    async def get_stock(keys):
+        return {key: stock[key] for key in keys}
+
+    monkeypatch.setattr(question_bank, "takeBankQuestions", take)
+    monkeypatch.setattr(question_bank, "getBankStock", get_stock)
+
+    async def run():
+        bank = QuestionBank(target_stock=20, low_water=5, enabled=True)
+        bank._queue = asyncio.Queue()
+        missed = await bank.take(_request(4), {"skill_id": "s-1", "skill_name": "Skill"})
+        stock["s-1|3,4|ShortAnswer|en|medium"] = 10
+        served = await bank.take(_request(4), {"skill_id": "s-1", "skill_name": "Skill"})
+        return bank, missed, served
+
+    bank, missed, served = asyncio.run(run())
+    assert missed is None
+    assert list(bank._pending) == ["s-1|3,4|ShortAnswer|en|medium"]
+    assert len(served["questions"]) == 4
+    assert all(q["skill_id"] == "s-1" for q in served["questions"])
+    assert served["metadata"]["source"] == "question_bank"
+    assert bank.get_stats()["hits"] == 1 and bank.get_stats()["misses"] == 1
+
+
+def test_refill_stocks_only_valid_questions(monkeypatch):
+    generated = {}
+    stored = []
+
+    async def get_stock(keys):
+        return {key: 8 for key in keys}
+
+    async def generate(request, skill_data=None):
+        generated["request"] = request
+        questions = [make_question("MultipleChoice", i) for i in range(request["number_of_questions"])]
+        questions[0]["target_level"] = 9
+        return {"questions": questions, "metadata": {}}
+
+    async def insert(rows):
+        stored.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(question_bank, "getBankStock", get_stock)
+    monkeypatch.setattr(question_bank, "generate_questions_v2", generate)
+    monkeypatch.setattr(question_bank, "insertBankQuestions", insert)
+
+    combo = BankCombination(None, None, None, "", "MultipleChoice", "en", "")
+    bank = QuestionBank(target_stock=12, low_water=5, enabled=True)
+    assert asyncio.run(bank.refill(combo)) == 3
+    assert generated["request"]["number_of_questions"] == 4
+    assert generated["request"]["skills"] is None
+    assert bank.questions_rejected == 1
+    assert stored[0][0] == "||MultipleChoice|en|"
+
+
+def test_refill_without_skill_stocks_null_skill_id_questions(monkeypatch):
+    stored = []
+
+    async def get_stock(keys):
+        return {key: 0 for key in keys}
+
+    async def generate(request, skill_data=None):
+        questions = [dict(make_question("ShortAnswer", i), skill_id=None) for i in range(request["number_of_questions"])]
+        return {"questions": questions, "metadata": {}}
+
+    async def insert(rows):
+        stored.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(question_bank, "getBankStock", get_stock)
+    monkeypatch.setattr(question_bank, "generate_questions_v2", generate)
+    monkeypatch.setattr(question_bank, "insertBankQuestions", insert)
+
+    combo = BankCombination(None, None, None, "3", "ShortAnswer", "en", "medium")
+    bank = QuestionBank(target_stock=3, low_water=1, enabled=True)
+    assert asyncio.run(bank.refill(combo)) == 3
+    assert bank.questions_rejected == 0
+    assert all("skill_id" not in row[-1] for row in stored)
@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+from src.generators import question_generator_v2
+from src.generators.question_generator_v2 import (
+    generate_questions_v2,
+    plan_generation_chunks,
+    split_count
+)
+
+
+def _request(n, types=("MultipleChoice", "ShortAnswer")):
+    return {"question_type": list(types), "language": "en", "number_of_questions": n, "difficulty": "medium"}
+
+
+def test_split_count_and_plan():
+    assert split_count(25, 10) == [9, 8, 8]
+    assert split_count(10, 10) == [10]
+
+    single = plan_generation_chunks(_request(8), chunk_size=10)
+    assert len(single) == 1 and single[0]["question_type"] == ["MultipleChoice", "ShortAnswer"]
+
+    chunks = plan_generation_chunks(_request(45, ("MultipleChoice", "ShortAnswer", "Rating")), chunk_size=10)
+    assert [(c["question_type"][0], c["number_of_questions"]) for c in chunks] == [
+        ("MultipleChoice", 8), ("MultipleChoice", 7),
+        ("ShortAnswer", 8), ("ShortAnswer", 7),
+        ("Rating", 8), ("Rating", 7)
+    ]
+
+
+def _fake_chunks(monkeypatch, short_first=False, fail_types=()):
+    counter = {"calls": 0, "in_flight": 0, "peak": 0}
+
+    async def fake_chunk(request, skill_data=None):
+        counter["calls"] += 1
+        counter["in_flight"] += 1
+        counter["peak"] = max(counter["peak"], counter["in_flight"])
+        await asyncio.sleep(0.02)
+        counter["in_flight"] -= 1
+        qtype = request["question_type"][0]
+        if qtype in fail_types:
+            raise ValueError("bad JSON")
+        n = request["number_of_questions"]
+        if short_first and counter["calls"] == 1:
+            n -= 2
+        start = counter["calls"] * 100
+        return [{"type": qtype, "content": f"{qtype} question {start + i}"} for i in range(n)]
+
+    monkeypatch.setattr(question_generator_v2, "generate_question_chunk", fake_chunk)
+    return counter
+
+
+def test_large_request_runs_chunks_concurrently_and_tops_up(monkeypatch):
+    counter = _fake_chunks(monkeypatch, short_first=True)
+    result = asyncio.run(generate_questions_v2(_request(40), concurrency=3, chunk_size=10))
+
+    questions = result["questions"]
+    assert len(questions) == 40
+    assert sum(q["type"] == "MultipleChoice" for q in questions) == 20
+    assert counter["peak"] == 3
+    assert result["metadata"]["generation_attempts"] == 2
+    assert result["metadata"]["generation_calls"] == 5
+
+
+def test_duplicates_are_dropped(monkeypatch):
+    async def fake_chunk(request, skill_data=None):
+        return [{"type": "MultipleChoice", "content": "Same  question"}, {"type": "MultipleChoice", "content": "same question"}]
+
+    monkeypatch.setattr(question_generator_v2, "generate_question_chunk", fake_chunk)
+    result = asyncio.run(generate_questions_v2(_request(2, ("MultipleChoice",))))
+    assert len(result["questions"]) == 1
+
+
+def test_all_chunks_failing_raises(monkeypatch):
+    _fake_chunks(monkeypatch, fail_types=("MultipleChoice", "ShortAnswer"))
+    with pytest.raises(ValueError, match="bad JSON"):
+        asyncio.run(generate_questions_v2(_request(4)))
+
+
+def test_stream_yields_questions_then_metadata(monkeypatch):
+    async def fake_stream(request, skill_data=None):
+        qtype = request["question_type"][0]
+        for i in range(request["number_of_questions"] + 1):
+            await asyncio.sleep(0)
+            yield {"type": qtype, "content": f"{qtype} {i % 3}"}
+
+    monkeypatch.setattr(question_generator_v2, "stream_question_chunk", fake_stream)
+
+    async def collect():
+        return [event async for event in question_generator_v2.stream_questions_v2(
+            _request(6), skill_data={"skill_id": "s-1", "skill_name": "S"}, chunk_size=3
+        )]
+
+    events = asyncio.run(collect())
+    questions = [payload for kind, payload in events if kind == "question"]
+    kind, metadata = events[-1]
+
+    assert kind == "metadata"
+    assert len(questions) == 6
+    assert sum(q["type"] == "ShortAnswer" for q in questions) == 3
+    assert all(q["skill_id"] == "s-1" for q in questions)
+    assert metadata["total_questions"] == 6
+    assert metadata["time_to_first_question_ms"] is not None
+
+
+def test_near_duplicates_are_replaced_with_avoid_list(monkeypatch):
+    requests = []
+
+    async def fake_chunk(request, skill_data=None):
+        requests.append(request)
+        if len(requests) == 1:
+            return [
+                {"type": "MultipleChoice", "content": "How should a team prioritise the product backlog items?"},
+                {"type": "MultipleChoice", "content": "How should the team prioritise product backlog items?"}
+            ]
+        return [{"type": "MultipleChoice", "content": "Which metric best shows sprint delivery predictability?"}]
+
+    monkeypatch.setattr(question_generator_v2, "generate_question_chunk", fake_chunk)
+    result = asyncio.run(generate_questions_v2(_request(2, ("MultipleChoice",))))
+
+    assert len(result["questions"]) == 2
+    assert result["metadata"]["duplicates_dropped"] == 1
+    assert requests[1]["number_of_questions"] == 1
+    assert requests[1]["avoid_questions"] == ["How should a team prioritise the product backlog items?"]
+    assert "do NOT repeat or paraphrase" in question_generator_v2.build_prompt_v2(requests[1])
+
+
+def _skill(text_size=1):
+    filler = "Plans and coordinates work across teams while balancing risk and stakeholder needs. " * text_size
+    return {
+        "skill_id": "s-1", "skill_name": "Planning", "skill_code": "PLAN",
+        "levels": [
+            {"level": i, "description": f"Level {i} description. {filler}", "autonomy": filler,
+             "influence": filler, "complexity": filler, "business_skills": filler, "knowledge": filler,
+             "behavioral_indicators": f'["{filler}"]', "evidence_examples": f'["{filler}"]'}
+            for i in range(1, 8)
+        ]
+    }
+
+
+def test_skill_context_scopes_levels_to_targets():
+    context = question_generator_v2.build_skill_context(_skill(), [3], budget_tokens=0)
+
+    assert "TARGET LEVEL(S): L3" in context
+    assert [f"=== Level {i} ===" in context for i in range(1, 8)] == [False, True, True, True, False, False, False]
+    assert "- Level 6 (summary): Level 6 description" in context
+    assert context.count("Evidence Examples:") == 3
+
+
+def test_skill_context_is_compacted_to_budget():
+    skill = _skill(text_size=4)
+    full = question_generator_v2.build_skill_context(skill, [3], budget_tokens=0)
+    compact = question_generator_v2.build_skill_context(skill, [3], budget_tokens=600)
+
+    assert question_generator_v2.count_tokens(compact) <= 600 < question_generator_v2.count_tokens(full)
+    assert "=== Level 3 ===" in compact and "=== Level 2 ===" not in compact
+    assert "- Level 2 (summary)" in compact
+    assert question_generator_v2.build_skill_context(None) == "SKILL: General technical skill assessment\n"
+
+
+def test_prompt_static_prefix_is_identical_across_requests():
+    first = question_generator_v2.chunk_completion_args(_request(3), _skill())
+    second = question_generator_v2.chunk_completion_args(
+        dict(_request(7, ("SituationalJudgment",)), language="vi", avoid_questions=["Earlier question"]), None
+    )
+
+    assert first["messages"][0] == second["messages"][0]
+    assert first["messages"][0]["content"] == question_generator_v2.QUESTION_SYSTEM_PROMPT_V2
+    assert first["messages"][1]["content"].startswith("SKILL: Planning\n")
+    assert "Generate EXACTLY 7 assessment questions in Vietnamese" in second["messages"][1]["content"]
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime
+from src.catalog.skill_catalog import build_snapshot, patch_snapshot
+from src.catalog import listener
+from src.catalog.listener import CatalogChangeListener, parse_notification
+from tests.factories import make_catalog_row
+
+
+def test_build_snapshot_groups_levels_per_skill():
+    rows = [
+        make_catalog_row("AAAA-1", "Alpha", "ALP", 2),
+        make_catalog_row("AAAA-1", "Alpha", "ALP", 3, datetime(2026, 1, 2)),
+        make_catalog_row("bbbb-2", "Beta", "BET", 1, datetime(2026, 1, 1)),
+    ]
+    snapshot = build_snapshot(rows)
+
+    assert snapshot.skills == [("aaaa-1", "Alpha", "ALP", 2), ("bbbb-2", "Beta", "BET", 1)]
+    assert [l[0] for l in snapshot.levels["aaaa-1"]] == [2, 3]
+    assert len(snapshot.levels["aaaa-1"][0]) == 9
+    assert snapshot.skills_by_code["BET"][0] == "bbbb-2"
+    assert snapshot.last_updated_at == datetime(2026, 1, 2)
+    assert snapshot.total_definitions == 3
+
+
+def test_patch_snapshot_replaces_only_changed_skills():
+    rows = [
+        make_catalog_row("a", "Alpha", "ALP", 1),
+        make_catalog_row("b", "Beta", "BET", 1),
+        make_catalog_row("c", "Gamma", "GAM", 1),
+    ]
+    snapshot = build_snapshot(rows)
+    patched = patch_snapshot(
+        snapshot,
+        ["b", "d"],
+        [make_catalog_row("d", "Delta", "DEL", 1), make_catalog_row("d", "Delta", "DEL", 2)]
+    )
+
+    assert [s[1] for s in patched.skills] == ["Alpha", "Delta", "Gamma"]
+    assert "b" not in patched.levels
+    assert patched.levels["a"] is snapshot.levels["a"]
+    assert patched.skills_by_code["DEL"][3] == 2
+    assert patched.total_definitions == 4
+
+
+def test_parse_notification():
+    assert parse_notification('{"table": "Skills", "op": "UPDATE", "skill_id": "abc"}') == "abc"
+    assert parse_notification("not json") is None
+    assert parse_notification('{"table": "Skills"}') is None
+
+
+def test_listener_refreshes_summary_before_patching(monkeypatch):
+    calls = []
+
+    async def refresh():
+        calls.append("refresh")
+        return True
+
+    class Catalog:
+        async def refresh_skills(self, skill_ids):
+            calls.append(("patch", skill_ids))
+
+    monkeypatch.setattr(listener, "refreshSkillSummary", refresh)
+    changes = CatalogChangeListener(Catalog(), refresh_summary=True)
+    asyncio.run(changes.apply_changes({"b", "a"}, full_reload=False))
+    asyncio.run(changes.apply_changes(set(), full_reload=False))
+    assert calls == ["refresh", ("patch", ["a", "b"])]
+    assert changes.get_stats()["summary_refreshes"] == 1
+
+
+def test_snapshot_etags_track_content():
+    rows = [make_catalog_row("a", "Alpha", "ALP", 1), make_catalog_row("b", "Beta", "BET", 1)]
+    snapshot = build_snapshot(rows)
+    assert build_snapshot(rows).version == snapshot.version
+
+    changed_b = list(make_catalog_row("b", "Beta", "BET", 1))
+    changed_b[4] = "Edited description"
+    patched = patch_snapshot(snapshot, ["b"], [tuple(changed_b)])
+
+    assert patched.level_etags["a"] == snapshot.level_etags["a"]
+    assert patched.level_etags["b"] != snapshot.level_etags["b"]
+    assert patched.skills_etag == snapshot.skills_etag
+    assert patched.version != snapshot.version
+
+
+def test_group_skill_level_rows():
+    from db_skill_reader import groupSkillLevelRows
+    rows = [
+        ("AAAA", "Alpha", "ALP", 2, "d2", "a", "i", "c", "b", "k", "bi", "ee"),
+        ("AAAA", "Alpha", "ALP", 3, "d3", "a", "i", "c", "b", "k", "bi", "ee"),
+        ("bbbb", "Beta", "BET", 1, "d1", "a", "i", "c", "b", "k", "bi", "ee"),
+    ]
+    grouped = groupSkillLevelRows(rows)
+    assert list(grouped) == ["aaaa", "bbbb"]
+    assert grouped["aaaa"]["skill_code"] == "ALP"
+    assert [l[0] for l in grouped["aaaa"]["levels"]] == [2, 3]
+    assert len(grouped["bbbb"]["levels"][0]) == 9
+
+
+def test_snapshot_records_and_cached_json():
+    import json
+    snapshot = build_snapshot([make_catalog_row("A", "Alpha", "ALP", 2), make_catalog_row("A", "Alpha", "ALP", 3)])
+    skill = snapshot.skills[0]
+    assert skill.skill_code == "ALP" and skill.level_count == 2
+    assert snapshot.levels["a"][1].level == 3
+
+    body = snapshot.levels_json("a")
+    assert snapshot.levels_json("a") is body
+    assert [l["level"] for l in json.loads(body)] == [2, 3]
+    assert snapshot.levels_json("missing") is None
+    assert json.loads(snapshot.skills_json)[0]["skill_id"] == "a"
+
+    patched = patch_snapshot(snapshot, ["b"], [make_catalog_row("B", "Beta", "BET", 1)])
+    assert patched.levels_json("a") is body
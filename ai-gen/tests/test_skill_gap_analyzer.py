@@ -0,0 +1,119 @@
+import json
+import time
+import asyncio
+from types import SimpleNamespace
+
+from src.generators import skill_gap_analyzer
+
+
+def _gaps(n):
+    return [
+        {"skill_id": f"s{i}", "skill_name": f"Skill {i}", "skill_code": f"SK{i}", "current_level": 1, "required_level": 2 + i % 3}
+        for i in range(n)
+    ]
+
+
+def test_gaps_are_analyzed_concurrently_in_order(monkeypatch):
+    in_flight = []
+    peak = []
+
+    async def fake_analyze(**kwargs):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.05)
+        in_flight.pop()
+        return {"success": True, "ai_analysis": kwargs["skill_name"]}
+
+    monkeypatch.setattr(skill_gap_analyzer, "analyze_skill_gap", fake_analyze)
+    start = time.perf_counter()
+    result = asyncio.run(skill_gap_analyzer.analyze_multiple_gaps("An", "Dev", _gaps(8), concurrency=4))
+    elapsed = time.perf_counter() - start
+
+    assert [g["ai_analysis"] for g in result["gap_analyses"]] == [f"Skill {i}" for i in range(8)]
+    assert max(peak) == 4
+    assert elapsed < 0.3
+    assert set(result) == {"success", "gap_analyses", "overall_summary", "priority_order", "recommended_focus_areas"}
+
+
+def test_failed_and_slow_gaps_do_not_fail_the_batch(monkeypatch):
+    async def fake_analyze(**kwargs):
+        if kwargs["skill_name"] == "Skill 1":
+            raise ValueError("model error")
+        if kwargs["skill_name"] == "Skill 2":
+            await asyncio.sleep(1)
+        return {"success": True, "ai_analysis": "ok"}
+
+    monkeypatch.setattr(skill_gap_analyzer, "analyze_skill_gap", fake_analyze)
+    result = asyncio.run(skill_gap_analyzer.analyze_multiple_gaps("An", "Dev", _gaps(3), timeout=0.1))
+
+    analyses = result["gap_analyses"]
+    assert analyses[0]["success"] is True
+    assert analyses[1] == {"skill_id": "s1", "skill_name": "Skill 1", "success": False, "error": "model error"}
+    assert analyses[2]["success"] is False and "timed out" in analyses[2]["error"]
+    assert result["priority_order"] == ["Skill 0"]
+
+
+def _completion(payload):
+    message = SimpleNamespace(content=json.dumps(payload))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_batch_mode_packs_gaps_and_falls_back_for_dropped_ones(monkeypatch):
+    prompts = []
+    single_calls = []
+
+    async def fake_chat_completion(endpoint, **kwargs):
+        prompts.append(kwargs["messages"][1]["content"])
+        return _completion({"analyses": [
+            {"gap_id": 1, "ai_analysis": "a1", "ai_recommendation": "r1", "key_actions": ["x"]},
+            {"gap_id": "3", "ai_analysis": "a3", "ai_recommendation": "r3"},
+            {"gap_id": 9, "ai_analysis": "bogus", "ai_recommendation": "bogus"},
+        ]})
+
+    async def fake_analyze(**kwargs):
+        single_calls.append(kwargs["skill_name"])
+        return {"success": True, "ai_analysis": "single"}
+
+    monkeypatch.setattr(skill_gap_analyzer, "chat_completion", fake_chat_completion)
+    monkeypatch.setattr(skill_gap_analyzer, "analyze_skill_gap", fake_analyze)
+    gaps = _gaps(3)
+    result = asyncio.run(skill_gap_analyzer.analyze_multiple_gaps("An", "Dev", gaps, batch_mode=True, batch_size=8))
+
+    assert len(prompts) == 1
+    assert "[gap_id 3] Skill 2 (SK2)" in prompts[0]
+    assert single_calls == ["Skill 1"]
+    analyses = result["gap_analyses"]
+    assert [a["ai_analysis"] for a in analyses] == ["a1", "single", "a3"]
+    assert analyses[0]["key_actions"] == ["x"]
+    assert analyses[0]["gap_size"] == 1 and analyses[0]["skill_id"] == "s0"
+
+
+def test_batch_timeout_scales_with_size_and_falls_back_per_gap(monkeypatch):
+    single_calls = []
+    delay = {"batch": 0.25}
+
+    async def fake_chat_completion(endpoint, **kwargs):
+        await asyncio.sleep(delay["batch"])
+        return _completion({"analyses": [
+            {"gap_id": i, "ai_analysis": f"a{i}", "ai_recommendation": "r", "key_actions": "not a list", "extra": 1}
+            for i in (1, 2, 3)
+        ]})
+
+    async def fake_analyze(**kwargs):
+        single_calls.append(kwargs["skill_name"])
+        return {"success": True, "ai_analysis": "single"}
+
+    monkeypatch.setattr(skill_gap_analyzer, "chat_completion", fake_chat_completion)
+    monkeypatch.setattr(skill_gap_analyzer, "analyze_skill_gap", fake_analyze)
+
+    # 0.25s fits the 3 x 0.1s a batch of three gets
+    result = asyncio.run(skill_gap_analyzer.analyze_multiple_gaps("An", "Dev", _gaps(3), timeout=0.1, batch_mode=True))
+    assert single_calls == []
+    first = result["gap_analyses"][0]
+    assert first["ai_analysis"] == "a1" and first["key_actions"] == [] and "extra" not in first
+
+    # A batch that times out is analyzed gap by gap
+    delay["batch"] = 0.5
+    result = asyncio.run(skill_gap_analyzer.analyze_multiple_gaps("An", "Dev", _gaps(3), timeout=0.1, batch_mode=True))
+    assert sorted(single_calls) == ["Skill 0", "Skill 1", "Skill 2"]
+    assert [a["ai_analysis"] for a in result["gap_analyses"]] == ["single"] * 3
@@ -0,0 +1,45 @@
+import json
+
+from src.generators.stream_parser import JsonArrayStreamParser
+
+
+QUESTIONS = [
+    {"type": "MultipleChoice", "content": "Which brace closes {this}? [x]", "options": [{"text": "\"}\""}]},
+    {"type": "ShortAnswer", "content": "Escaped \\ backslash and \"quotes\"", "nested": {"a": [1, {"b": 2}]}},
+]
+
+
+def _feed_all(text, size):
+    parser = JsonArrayStreamParser()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return parser, items
+
+
+def test_items_are_returned_for_any_chunking():
+    text = json.dumps({"meta": {"questions": "no"}, "questions": QUESTIONS, "extra": [{"x": 1}]})
+    for size in (1, 2, 3, 7, 40, len(text)):
+        parser, items = _feed_all(text, size)
+        assert items == QUESTIONS
+        assert parser.finished and parser.errors == 0
+
+
+def test_item_is_returned_as_soon_as_it_closes():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('{"questions": [{"type": "Rating", "content": "a"}, {"type": "Rat') == [
+        {"type": "Rating", "content": "a"}
+    ]
+    assert parser.started and not parser.finished
+    assert parser.pending == '{"type": "Rat'
+
+
+def test_top_level_array_and_malformed_items():
+    parser, items = _feed_all('[{"a": 1}, {"b": tru}, {"c": 3}]', 5)
+    assert items == [{"a": 1}, {"c": 3}]
+    assert parser.errors == 1 and parser.invalid_items == ['{"b": tru}']
+
+
+def test_no_array():
+    parser, items = _feed_all('{"error": "refused"}', 4)
+    assert items == [] and not parser.started
@@ -0,0 +1,71 @@
+import json
+from types import SimpleNamespace
+
+from src.generators.tokens import count_tokens
+from src.generators.token_planner import TokenPlanner, QUESTION_PRIOR
+
+
+def usage(completion_tokens):
+    return SimpleNamespace(prompt_tokens=100, completion_tokens=completion_tokens)
+
+
+def planner(**kwargs):
+    kwargs.setdefault("margin", 0.1)
+    kwargs.setdefault("min_samples", 5)
+    kwargs.setdefault("max_output_tokens", 16000)
+    return TokenPlanner(**kwargs)
+
+
+def test_prior_until_enough_samples():
+    p = planner()
+    for _ in range(4):
+        p.record_call("grade_answer", usage(300), "stop", 2048)
+    assert p.max_tokens("grade_answer") == round(2048 * 1.1)
+    p.record_call("grade_answer", usage(300), "stop", 2048)
+    assert p.max_tokens("grade_answer") == round(300 * 1.1)
+
+
+def test_batch_learns_per_unit_size():
+    p = planner()
+    for _ in range(5):
+        p.record_call("analyze_gap_batch", usage(4 * 400 + 256), "stop", 4000, units=4)
+    assert p.unit_tokens("analyze_gap_batch") == 400
+    assert p.max_tokens("analyze_gap_batch", units=2) == round(2 * 400 * 1.1 + 256)
+
+
+def test_truncation_raises_margin_and_is_not_learned():
+    p = planner()
+    p.record_call("grade_answer", usage(2048), "length", 2048)
+    assert p.margin("grade_answer") == 0.35
+    assert p.get_stats()["calls"]["grade_answer"]["truncated"] == 1
+    assert "grade_answer" not in p.get_stats()["learned"]
+    for _ in range(200):
+        p.record_call("grade_answer", usage(300), "stop", 2048)
+    assert p.margin("grade_answer") == 0.1
+
+
+def test_questions_calibrated_by_completion_tokens():
+    p = planner(min_samples=2)
+    questions = [{"type": "MultipleChoice", "content": "x" * 400}, {"type": "MultipleChoice", "content": "y" * 400}]
+    assert p.question_tokens("MultipleChoice") == QUESTION_PRIOR
+    size = count_tokens(json.dumps(questions[0]))
+    # The model reported twice the measured size
+    p.record_questions("generate_questions", questions, completion_tokens=2 * 2 * size + 64)
+    assert p.question_tokens("MultipleChoice") == 2 * size
+    assert p.question_max_tokens("generate_questions", {"MultipleChoice": 3}) < 1000
+
+
+def test_chunk_size_follows_learned_question_size():
+    p = planner(max_output_tokens=4096)
+    assert p.max_questions_per_call("generate_questions", "SituationalJudgment") == 3
+    for _ in range(5):
+        p.record_questions("generate_questions", [{"type": "SituationalJudgment", "content": "z" * 1600}])
+    assert p.max_questions_per_call("generate_questions", "SituationalJudgment") > 3
+
+
+def test_disabled_keeps_fixed_reservations():
+    p = planner(enabled=False)
+    for _ in range(10):
+        p.record_call("grade_answer", usage(300), "stop", 2048)
+    assert p.max_tokens("grade_answer") == 2048
+    assert p.question_max_tokens("generate_questions", {"MultipleChoice": 3}) == 8192